@@ -0,0 +1,119 @@
+"""
+Maintenance commands, meant to run from cron or a one-off container:
+
+    python -m app.cli partitions           # create upcoming asset_snapshots partitions
+    python -m app.cli archive [--months N]  # compact cold asset_snapshots months
+    python -m app.cli import EMAIL FILE     # import weight/food history (CSV or JSON Lines)
+"""
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+import aiofiles
+from fastapi import HTTPException
+from sqlalchemy import select, text
+
+from app.database import AsyncSessionLocal, engine
+from app.models.user import User
+from app.services import import_service, partition_service
+
+READ_CHUNK_BYTES = 64 * 1024
+
+
+async def _partitions(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        created = await partition_service.ensure_partitions(db)
+        await db.commit()
+    for name in created:
+        print(f"created {name}")
+
+
+async def _archive(args: argparse.Namespace) -> None:
+    async with AsyncSessionLocal() as db:
+        archived = await partition_service.archive_partitions(db, months=args.months)
+        await db.commit()
+
+    # VACUUM cannot run inside a transaction block
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for name, removed in archived.items():
+            await conn.execute(text(f"VACUUM (ANALYZE) {name}"))
+            print(f"archived {name}: {removed} rows compacted")
+
+
+async def _read_chunks(path: str) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(READ_CHUNK_BYTES):
+            yield chunk
+
+
+async def _import(args: argparse.Namespace) -> None:
+    file_format = args.format or ("csv" if args.file.lower().endswith(".csv") else "jsonl")
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.id).where(User.email == args.email))
+        user_id = result.scalar_one_or_none()
+        if user_id is None:
+            raise SystemExit(f"no user with email {args.email}")
+        try:
+            imported = await import_service.import_records(
+                user_id, _read_chunks(args.file), file_format, db
+            )
+        except HTTPException as exc:
+            errors = exc.detail if isinstance(exc.detail, list) else [{"error": exc.detail}]
+            for error in errors:
+                print(f"line {error.get('line', '?')}: {error['error']}")
+            raise SystemExit(1)
+    print(
+        f"imported {imported.weight_records} weight records, {imported.food_records} food "
+        f"records ({imported.food_items} items) from {imported.first_date} to {imported.last_date}"
+    )
+
+
+def _months(value: str) -> int:
+    months = int(value)
+    if months < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return months
+
+
+async def _run(handler: Callable[[argparse.Namespace], Awaitable[None]], args: argparse.Namespace) -> None:
+    try:
+        await handler(args)
+    finally:
+        await engine.dispose()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Fitconomy maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    partitions = commands.add_parser("partitions", help="create upcoming snapshot partitions")
+    partitions.set_defaults(handler=_partitions)
+
+    archive = commands.add_parser("archive", help="compact snapshot partitions older than N months")
+    archive.add_argument(
+        "--months",
+        type=_months,
+        default=None,
+        help="full months to keep uncompacted (default: ASSET_ARCHIVE_AFTER_MONTHS)",
+    )
+    archive.set_defaults(handler=_archive)
+
+    import_ = commands.add_parser("import", help="import weight and food history for a user")
+    import_.add_argument("email", help="email of the user to import into")
+    import_.add_argument("file", help="CSV or JSON Lines file")
+    import_.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        default=None,
+        help="file format (default: from the file extension)",
+    )
+    import_.set_defaults(handler=_import)
+
+    args = parser.parse_args(argv)
+    asyncio.run(_run(args.handler, args))
+
+
+if __name__ == "__main__":
+    main()
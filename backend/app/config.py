@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import field_validator
+from pydantic import Field, field_validator
 import json
 
 
@@ -16,6 +16,21 @@ class Settings(BaseSettings):
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    # Upper bound on how long a cached dashboard/asset view can live
+    CACHE_TTL_SECONDS: int = 300
+    # Authenticated users each worker keeps in memory, and for how long
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    # Dashboard events buffered per stream before a slow client is told to resync
+    EVENT_QUEUE_SIZE: int = 64
+    # Comment sent on idle dashboard streams so proxies keep them open
+    EVENT_KEEPALIVE_SECONDS: int = 15
+
+    # Offline sync: how long an idempotency key is remembered
+    SYNC_KEY_RETENTION_DAYS: int = 30
+
+    # How often each worker merges learned food names into the catalog and reloads changes
+    CATALOG_REFRESH_SECONDS: int = 30
 
     # JWT
     SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -40,6 +55,13 @@ class Settings(BaseSettings):
     # Game Settings
     INITIAL_ASSET_VALUE: float = 1000.0
     ASSET_FLOOR: float = 100.0
+    # "event": one snapshot per trigger; "daily": one row per (user, day, trigger type)
+    ASSET_SNAPSHOT_MODE: Literal["event", "daily"] = "event"
+    # "raw": weigh-ins are scored on the change in readings; "trend": on the change in the
+    # smoothed weight (see trend_service), so day-to-day noise neither pays nor costs
+    ASSET_WEIGHT_SIGNAL: Literal["raw", "trend"] = "raw"
+    # Snapshot partitions older than this many months are compacted by `python -m app.cli archive`
+    ASSET_ARCHIVE_AFTER_MONTHS: int = Field(12, ge=1)
 
     @field_validator("CORS_ORIGINS", mode="before")
     @classmethod
@@ -0,0 +1,188 @@
+"""
+Per-user response cache in Redis.
+
+All cached views of one user are fields of a single hash, cache:user:{id},
+so invalidating a user is one DEL. Each user also has a generation counter,
+cache:gen:{id}, which invalidation increments. A reader notes the generation
+before it queries the database, and its fill is only stored if the
+generation is unchanged, so a fill that raced a write never puts the
+pre-write data back. Invalidations are also published on cache:invalidate,
+where each worker's in-process user cache (see user_cache) listens.
+
+Concurrent misses are collapsed: inside a worker they share one load, and
+across workers the one holding a short fill lock loads while the others
+poll the hash briefly before loading themselves. A worker only shares a
+load between readers of the same data version (the one their ETag carries),
+so a reader arriving after a write never gets a load that started before
+it.
+
+Redis is an accelerator only. A Redis error is counted, opens the shared
+circuit breaker (see redis_client) and the request is answered from the
+database. Entries cached before an outage can outlive a write made during
+it by at most CACHE_TTL_SECONDS.
+"""
+
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.core import redis_client
+
+T = TypeVar("T")
+
+FILL_LOCK_MS = 3000
+FILL_POLLS = 10
+FILL_POLL_SECONDS = 0.05
+GENERATION_TTL_SECONDS = 86400
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Store the value only if the generation is still the one the reader saw
+_FILL_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+return 1
+"""
+
+_MISSING = object()
+
+_inflight: dict[tuple[uuid.UUID, str, int | None], asyncio.Future] = {}
+_metrics = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0, "bypassed": 0}
+
+
+def metrics() -> dict[str, int]:
+    """Counters for this worker since start-up."""
+    return dict(_metrics)
+
+
+def _keys(user_id: uuid.UUID) -> tuple[str, str]:
+    return f"cache:user:{user_id}", f"cache:gen:{user_id}"
+
+
+def _trip(exc: Exception) -> None:
+    _metrics["errors"] += 1
+    redis_client.mark_down(exc)
+
+
+async def cached(
+    user_id: uuid.UUID,
+    view: str,
+    adapter: TypeAdapter[T],
+    load: Callable[[], Awaitable[T]],
+    version: int | None = None,
+) -> T:
+    """
+    Return ``view`` for the user from the cache, calling ``load`` on a miss.
+
+    ``version`` is the user's data version as the caller read it; concurrent
+    misses share a load only when it matches.
+    """
+    key = (user_id, view, version)
+    pending = _inflight.get(key)
+    if pending is not None:
+        value = await asyncio.shield(pending)
+        if value is not _MISSING:
+            _metrics["coalesced"] += 1
+            return value
+        # The load we waited on failed; try on our own
+        return await load()
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    value = _MISSING
+    try:
+        value = await _read_through(user_id, view, adapter, load)
+        return value
+    finally:
+        del _inflight[key]
+        future.set_result(value)
+
+
+async def _read_through(
+    user_id: uuid.UUID,
+    view: str,
+    adapter: TypeAdapter[T],
+    load: Callable[[], Awaitable[T]],
+) -> T:
+    client = redis_client.get_client()
+    if client is None:
+        _metrics["bypassed"] += 1
+        return await load()
+
+    data_key, gen_key = _keys(user_id)
+    lock_key = f"cache:fill:{user_id}:{view}"
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.hget(data_key, view)
+            pipe.get(gen_key)
+            raw, generation = await pipe.execute()
+        value = _decode(adapter, raw)
+        if value is not _MISSING:
+            _metrics["hits"] += 1
+            return value
+        _metrics["misses"] += 1
+
+        locked = await client.set(lock_key, b"1", nx=True, px=FILL_LOCK_MS)
+        if not locked:
+            # Another worker is loading this view; give it a moment
+            for _ in range(FILL_POLLS):
+                await asyncio.sleep(FILL_POLL_SECONDS)
+                value = _decode(adapter, await client.hget(data_key, view))
+                if value is not _MISSING:
+                    _metrics["coalesced"] += 1
+                    return value
+    except RedisError as exc:
+        _trip(exc)
+        return await load()
+
+    value = await load()
+    try:
+        await client.eval(
+            _FILL_SCRIPT,
+            2,
+            gen_key,
+            data_key,
+            generation or b"0",
+            view,
+            adapter.dump_json(value),
+            settings.CACHE_TTL_SECONDS,
+        )
+        if locked:
+            await client.delete(lock_key)
+    except RedisError as exc:
+        _trip(exc)
+    return value
+
+
+def _decode(adapter: TypeAdapter[T], raw: bytes | None) -> T | object:
+    if raw is None:
+        return _MISSING
+    try:
+        return adapter.validate_json(raw)
+    except ValueError:
+        # Written by an older schema; treat as a miss and overwrite
+        return _MISSING
+
+
+async def invalidate_user(user_id: uuid.UUID) -> None:
+    """Drop every cached view of the user and reject fills started before now."""
+    client = redis_client.get_client()
+    if client is None:
+        return
+    data_key, gen_key = _keys(user_id)
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.incr(gen_key)
+            pipe.expire(gen_key, GENERATION_TTL_SECONDS)
+            pipe.delete(data_key)
+            pipe.publish(INVALIDATION_CHANNEL, str(user_id))
+            await pipe.execute()
+    except RedisError as exc:
+        _trip(exc)
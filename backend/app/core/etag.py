@@ -0,0 +1,67 @@
+"""
+Conditional GETs from a per-user data version.
+
+Every write bumps ``users.data_version`` in its own transaction. A read's
+weak ETag combines that version with the server date (views such as the
+streak or "today's" calories roll over at midnight without a write) and a
+hash of the URL. The check runs as a route dependency on the already-loaded
+current user, so a matching ``If-None-Match`` is answered with 304 before
+the endpoint touches the database again (without touching it at all when
+the user is cached, see user_cache).
+
+Responses are "private, no-cache", past days included: a back-dated record,
+an item edit or a /sync batch can still change any day, so clients
+revalidate every time and the 304 keeps that cheap.
+"""
+
+import hashlib
+import uuid
+from datetime import date
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import Update, update
+
+from app.core.dependencies import get_current_user
+from app.models.user import User
+from app.schemas.user import CachedUser
+
+
+def data_version_bump(user_id: uuid.UUID) -> Update:
+    """UPDATE incrementing the user's data version, for composing."""
+    return update(User).where(User.id == user_id).values(data_version=User.data_version + 1)
+
+
+def _etag(user: CachedUser, request: Request, today: date) -> str:
+    url = hashlib.blake2b(
+        f"{request.url.path}?{request.url.query}".encode(), digest_size=6
+    ).hexdigest()
+    return f'W/"{user.data_version}.{today.isoformat()}.{url}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: the W/ prefix is ignored on both sides
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+_CACHE_CONTROL = "private, no-cache"
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    current_user: CachedUser = Depends(get_current_user),
+) -> None:
+    """Route dependency adding ETag and Cache-Control to a per-user GET."""
+    etag = _etag(current_user, request, date.today())
+    if _matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": _CACHE_CONTROL},
+        )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = _CACHE_CONTROL
@@ -0,0 +1,238 @@
+"""
+Dashboard change events pushed to clients over Server-Sent Events.
+
+Writers stage small deltas (new snapshot, calorie total, streak) on the
+session while they hold the user's write lock; once the transaction has
+committed they are sent as one Redis PUBLISH on events:user:{id}. Each
+worker keeps a single pub/sub connection, subscribed to the channels of
+the users it currently streams to, and fans messages out to their
+connections. Without Redis, events still reach streams on the writing
+worker.
+
+Every stream has a bounded queue. A client that falls EVENT_QUEUE_SIZE
+events behind, or whose worker lost its Redis subscription, gets a single
+"resync" event instead and refetches the dashboard.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core import redis_client
+
+logger = logging.getLogger(__name__)
+
+READ_TIMEOUT_SECONDS = 1.0
+RECONNECT_SECONDS = 1.0
+
+_STAGED_KEY = "staged_events"
+_CHANNEL_PREFIX = "events:user:"
+
+
+def _frame(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+RESYNC = _frame("resync", {})
+KEEPALIVE = b": keepalive\n\n"
+
+
+def _channel(user_id: uuid.UUID) -> str:
+    return f"{_CHANNEL_PREFIX}{user_id}"
+
+
+def stage(db: AsyncSession, user_id: uuid.UUID, event: str, data: Any) -> None:
+    """Queue an event to be published when the user's write lock is released."""
+    db.info.setdefault(_STAGED_KEY, []).append((user_id, _frame(event, data)))
+
+
+def discard_staged(db: AsyncSession) -> None:
+    db.info.pop(_STAGED_KEY, None)
+
+
+async def publish_staged(db: AsyncSession) -> None:
+    """Publish the session's staged events, one message per user."""
+    by_user: dict[uuid.UUID, list[bytes]] = {}
+    for user_id, frame in db.info.pop(_STAGED_KEY, []):
+        by_user.setdefault(user_id, []).append(frame)
+
+    client = redis_client.get_client()
+    for user_id, frames in by_user.items():
+        payload = b"".join(frames)
+        if client is not None:
+            try:
+                await client.publish(_channel(user_id), payload)
+                continue
+            except RedisError as exc:
+                redis_client.mark_down(exc)
+                client = None
+        broker.deliver(user_id, payload)
+
+
+class EventBroker:
+    """Per-worker fan-out from Redis pub/sub to local stream queues."""
+
+    def __init__(self) -> None:
+        self._listeners: dict[uuid.UUID, set[asyncio.Queue[bytes]]] = {}
+        self._redis: Redis | None = None
+        self._pubsub: PubSub | None = None
+        self._lock = asyncio.Lock()
+        self._wanted = asyncio.Event()
+        self._reader: asyncio.Task | None = None
+        self._pending: set[asyncio.Task] = set()
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._listeners.values())
+
+    async def subscribe(self, user_id: uuid.UUID) -> asyncio.Queue[bytes]:
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=settings.EVENT_QUEUE_SIZE)
+        queues = self._listeners.setdefault(user_id, set())
+        queues.add(queue)
+        if len(queues) == 1:
+            async with self._lock:
+                if self._pubsub is not None:
+                    try:
+                        await self._pubsub.subscribe(_channel(user_id))
+                    except RedisError as exc:
+                        logger.warning("Event subscribe failed: %s", exc)
+        self._wanted.set()
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._run())
+        return queue
+
+    def release(self, user_id: uuid.UUID, queue: asyncio.Queue[bytes]) -> None:
+        """
+        Drop a stream's queue. Synchronous so it also runs from a cancelled
+        stream; the channel is unsubscribed in the background.
+        """
+        queues = self._listeners.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if queues:
+            return
+        del self._listeners[user_id]
+        task = asyncio.create_task(self._unsubscribe(user_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _unsubscribe(self, user_id: uuid.UUID) -> None:
+        async with self._lock:
+            # A new stream for the user may have arrived in the meantime
+            if self._pubsub is None or user_id in self._listeners:
+                return
+            try:
+                await self._pubsub.unsubscribe(_channel(user_id))
+            except RedisError as exc:
+                logger.warning("Event unsubscribe failed: %s", exc)
+
+    def deliver(self, user_id: uuid.UUID, payload: bytes) -> None:
+        for queue in self._listeners.get(user_id, ()):
+            _offer(queue, payload)
+
+    def _resync_all(self) -> None:
+        for queues in self._listeners.values():
+            for queue in queues:
+                _offer(queue, RESYNC)
+
+    async def _connect(self) -> None:
+        async with self._lock:
+            if self._redis is None:
+                # No socket timeout: the reader waits on this connection indefinitely
+                self._redis = Redis.from_url(
+                    settings.REDIS_URL,
+                    socket_connect_timeout=redis_client.SOCKET_TIMEOUT_SECONDS,
+                )
+            channels = [_channel(user_id) for user_id in self._listeners]
+            if not channels:
+                return
+            pubsub = self._redis.pubsub()
+            await pubsub.subscribe(*channels)
+            self._pubsub = pubsub
+
+    async def _disconnect(self) -> None:
+        async with self._lock:
+            pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except RedisError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            if not self._listeners:
+                self._wanted.clear()
+                await self._wanted.wait()
+            try:
+                if self._pubsub is None:
+                    await self._connect()
+                    if self._pubsub is None:
+                        continue
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=READ_TIMEOUT_SECONDS
+                )
+            except (RedisError, OSError) as exc:
+                logger.warning("Event subscription lost, reconnecting: %s", exc)
+                await self._disconnect()
+                # Anything published meanwhile is gone; clients refetch
+                self._resync_all()
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            channel = message["channel"].decode()
+            user_id = uuid.UUID(channel.removeprefix(_CHANNEL_PREFIX))
+            self.deliver(user_id, message["data"])
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        await self._disconnect()
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def _offer(queue: asyncio.Queue[bytes], payload: bytes) -> None:
+    """Enqueue without blocking; a full queue is replaced by a single resync."""
+    try:
+        queue.put_nowait(payload)
+    except asyncio.QueueFull:
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC)
+
+
+broker = EventBroker()
+
+
+async def stream(user_id: uuid.UUID, data_version: int) -> AsyncIterator[bytes]:
+    """SSE body for one dashboard connection."""
+    queue = await broker.subscribe(user_id)
+    try:
+        # Lets the client tell whether it missed writes since its last fetch
+        yield _frame("ready", {"data_version": data_version})
+        while True:
+            try:
+                async with asyncio.timeout(settings.EVENT_KEEPALIVE_SECONDS):
+                    frame = await queue.get()
+            except TimeoutError:
+                frame = KEEPALIVE
+            yield frame
+    finally:
+        broker.release(user_id, queue)
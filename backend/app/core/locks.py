@@ -0,0 +1,67 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator, Hashable
+from contextlib import asynccontextmanager
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import events, user_cache
+from app.core.etag import data_version_bump
+
+
+class KeyedLock:
+    """A set of asyncio locks keyed by value, created on demand and dropped when idle."""
+
+    def __init__(self) -> None:
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self._users: dict[Hashable, int] = {}
+
+    @asynccontextmanager
+    async def acquire(self, key: Hashable) -> AsyncIterator[None]:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if not self._users[key]:
+                del self._users[key]
+                del self._locks[key]
+
+
+_user_locks = KeyedLock()
+
+
+def advisory_key(user_id: uuid.UUID) -> int:
+    """Signed 64-bit Postgres advisory lock key for a user."""
+    return int.from_bytes(user_id.bytes[:8], "big", signed=True)
+
+
+@asynccontextmanager
+async def user_write_lock(user_id: uuid.UUID, db: AsyncSession) -> AsyncIterator[None]:
+    """
+    Serialize asset-affecting writes for one user.
+
+    Requests in this worker queue on an in-process lock, and workers are
+    ordered by a transaction-scoped advisory lock, which Postgres releases
+    on commit or rollback. Writes for different users never wait on each
+    other. The block must include the commit. The user's data version is
+    bumped in the same transaction. Once the block completes the user's
+    cached identity and views are invalidated and the dashboard events
+    staged inside it are published, both before the next writer gets the
+    lock; a failed block publishes nothing.
+    """
+    async with _user_locks.acquire(user_id):
+        # One round trip: the lock is a one-time filter of the bump, taken
+        # before the user row is read
+        locked = select(func.pg_advisory_xact_lock(advisory_key(user_id))).scalar_subquery()
+        await db.execute(data_version_bump(user_id).where(locked.is_not(None)))
+        try:
+            yield
+        except BaseException:
+            events.discard_staged(db)
+            raise
+        await user_cache.invalidate(user_id)
+        await events.publish_staged(db)
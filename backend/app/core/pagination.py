@@ -0,0 +1,35 @@
+"""
+Opaque cursors for keyset pagination.
+
+A cursor carries the sort key of the last row on a page; the next page
+starts strictly after it, so pages stay stable while rows are added and a
+deep page costs the same as the first one.
+"""
+
+import base64
+import binascii
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException
+
+_SEPARATOR = "|"
+
+
+def encode_cursor(*parts: Any) -> str:
+    raw = _SEPARATOR.join(
+        part.isoformat() if hasattr(part, "isoformat") else str(part) for part in parts
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> tuple:
+    """Split a cursor back into its parts, parsing each with the matching parser."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = raw.split(_SEPARATOR)
+        if len(parts) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(part) for parse, part in zip(parsers, parts))
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,49 @@
+"""
+Shared Redis client with a circuit breaker.
+
+Redis only accelerates things here (response cache, event fan-out), so
+after an error callers skip it for BREAKER_SECONDS and fall back instead of
+paying a connection timeout on every request.
+"""
+
+import logging
+import time
+
+from redis.asyncio import Redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SOCKET_TIMEOUT_SECONDS = 0.25
+BREAKER_SECONDS = 5.0
+
+_client: Redis | None = None
+_down_until = 0.0
+
+
+def get_client() -> Redis | None:
+    """The shared client, or None while the circuit breaker is open."""
+    global _client
+    if time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        _client = Redis.from_url(
+            settings.REDIS_URL,
+            socket_connect_timeout=SOCKET_TIMEOUT_SECONDS,
+            socket_timeout=SOCKET_TIMEOUT_SECONDS,
+        )
+    return _client
+
+
+def mark_down(exc: Exception) -> None:
+    global _down_until
+    _down_until = time.monotonic() + BREAKER_SECONDS
+    logger.warning("Redis unavailable, falling back for %ss: %s", BREAKER_SECONDS, exc)
+
+
+async def close() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,191 @@
+"""
+Two-tier cache of the authenticated user.
+
+get_current_user needs the user row on every request. It is looked up by
+user id in an LRU of each worker first, then in the user's Redis hash of
+cached views (see cache), shared by all workers, and only then loaded from
+the database. A request whose user is in either tier sends no query for
+its identity. What it gets is a frozen CachedUser, not a row of any session.
+
+The row carries data_version, which the ETags are computed from and every
+write bumps, so an entry must not outlive a write (or a profile change).
+Invalidating a user drops the Redis entry with the rest of their views,
+and the cache:invalidate message it publishes drops the LRU entries of
+every worker. A fill that raced an invalidation is not stored. Each worker
+keeps one subscription to the channel; while it is not subscribed the LRU
+is skipped, and it is cleared on reconnect since messages may have been
+missed. Entries also expire after USER_CACHE_TTL_SECONDS.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError, TimeoutError as RedisTimeoutError
+
+from app.config import settings
+from app.core import cache, redis_client
+from app.schemas.user import CachedUser
+
+logger = logging.getLogger(__name__)
+
+READ_TIMEOUT_SECONDS = 1.0
+RECONNECT_SECONDS = 1.0
+
+_VIEW = "identity"
+_CACHED_USER = TypeAdapter(CachedUser)
+
+
+class UserLRU:
+    """Per-worker LRU of users, kept coherent by the invalidation channel."""
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[uuid.UUID, tuple[float, CachedUser]] = OrderedDict()
+        # One token per fill in progress; invalidation removes it so the fill is not stored
+        self._filling: dict[uuid.UUID, object] = {}
+        self._subscribed = False
+        self._redis: Redis | None = None
+        self._pubsub: PubSub | None = None
+        self._task: asyncio.Task | None = None
+        self._metrics = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def metrics(self) -> dict[str, int]:
+        return {**self._metrics, "size": len(self._entries)}
+
+    def _lookup(self, user_id: uuid.UUID) -> CachedUser | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires, user = entry
+        if expires < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return user
+
+    def _store(self, user_id: uuid.UUID, user: CachedUser) -> None:
+        self._entries[user_id] = (time.monotonic() + settings.USER_CACHE_TTL_SECONDS, user)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > settings.USER_CACHE_SIZE:
+            self._entries.popitem(last=False)
+
+    async def get(
+        self, user_id: uuid.UUID, load: Callable[[], Awaitable[CachedUser]]
+    ) -> CachedUser:
+        """Return the user from the LRU, calling ``load`` on a miss."""
+        if not self._subscribed:
+            return await load()
+        user = self._lookup(user_id)
+        if user is not None:
+            self._metrics["hits"] += 1
+            return user
+        self._metrics["misses"] += 1
+
+        token = object()
+        self._filling[user_id] = token
+        try:
+            user = await load()
+        finally:
+            current = self._filling.get(user_id) is token
+            if current:
+                del self._filling[user_id]
+        if current and self._subscribed:
+            self._store(user_id, user)
+        return user
+
+    def forget(self, user_id: uuid.UUID) -> None:
+        self._entries.pop(user_id, None)
+        self._filling.pop(user_id, None)
+
+    def _reset(self) -> None:
+        self._entries.clear()
+        self._filling.clear()
+
+    async def _connect(self) -> None:
+        if self._redis is None:
+            # No socket timeout: the reader waits on this connection indefinitely
+            self._redis = Redis.from_url(
+                settings.REDIS_URL,
+                socket_connect_timeout=redis_client.SOCKET_TIMEOUT_SECONDS,
+            )
+        pubsub = self._redis.pubsub()
+        self._pubsub = pubsub
+        await pubsub.subscribe(cache.INVALIDATION_CHANNEL)
+        # Messages are delivered from the confirmation on; any before it are lost
+        if await pubsub.get_message(timeout=READ_TIMEOUT_SECONDS) is None:
+            raise RedisTimeoutError("No confirmation of the invalidation subscription")
+        self._reset()
+        self._subscribed = True
+
+    async def _disconnect(self) -> None:
+        self._subscribed = False
+        self._reset()
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            try:
+                await pubsub.aclose()
+            except RedisError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._pubsub is None:
+                    await self._connect()
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=READ_TIMEOUT_SECONDS
+                )
+            except (RedisError, OSError) as exc:
+                logger.warning("User cache invalidations lost, reconnecting: %s", exc)
+                await self._disconnect()
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            self._metrics["invalidations"] += 1
+            self.forget(uuid.UUID(message["data"].decode()))
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._disconnect()
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+lru = UserLRU()
+
+
+async def get_user(
+    user_id: uuid.UUID, load: Callable[[], Awaitable[CachedUser]]
+) -> CachedUser:
+    """
+    The user from this worker's LRU, Redis or ``load``, in that order.
+
+    The result is a frozen copy of the user's columns, not a row: a handler
+    that changes the user loads the User in its own session and invalidates
+    after committing.
+    """
+    return await lru.get(user_id, lambda: cache.cached(user_id, _VIEW, _CACHED_USER, load))
+
+
+async def invalidate(user_id: uuid.UUID) -> None:
+    """Drop the user's cached identity and views in every worker; call after the commit."""
+    lru.forget(user_id)
+    await cache.invalidate_user(user_id)
@@ -5,8 +5,10 @@ from contextlib import asynccontextmanager
 import os
 
 from app.config import settings
+from app.core import cache, events, redis_client, user_cache
 from app.database import engine, Base
-from app.routers import auth, weight, food, asset, upload, dashboard
+from app.routers import auth, weight, food, asset, upload, dashboard, data_import, sync
+from app.services import catalog_service
 
 
 @asynccontextmanager
@@ -22,8 +24,18 @@ async def lifespan(app: FastAPI):
             import app.models  # noqa: F401
             await conn.run_sync(Base.metadata.create_all)
 
+    # Autocomplete index of the food catalog, loaded in the background
+    catalog_service.index.start()
+
+    # Drops this worker's cached users when another worker writes
+    await user_cache.lru.start()
+
     yield
 
+    await user_cache.lru.close()
+    await catalog_service.index.close()
+    await events.broker.close()
+    await redis_client.close()
     await engine.dispose()
 
 
@@ -58,8 +70,15 @@ app.include_router(food.router, prefix=f"{API_PREFIX}/food", tags=["Food"])
 app.include_router(asset.router, prefix=f"{API_PREFIX}/asset", tags=["Asset"])
 app.include_router(upload.router, prefix=f"{API_PREFIX}/upload", tags=["Upload"])
 app.include_router(dashboard.router, prefix=f"{API_PREFIX}/dashboard", tags=["Dashboard"])
+app.include_router(data_import.router, prefix=f"{API_PREFIX}/import", tags=["Import"])
+app.include_router(sync.router, prefix=f"{API_PREFIX}/sync", tags=["Sync"])
 
 
 @app.get("/api/health", tags=["Health"])
 async def health_check():
     return {"status": "ok", "app": settings.APP_NAME}
+
+
+@app.get("/api/health/cache", tags=["Health"])
+async def cache_metrics():
+    return {**cache.metrics(), "users": user_cache.lru.metrics()}
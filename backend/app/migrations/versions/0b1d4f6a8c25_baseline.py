@@ -0,0 +1,108 @@
+"""baseline
+
+The schema the first migration builds on: users, weight and food records,
+and the original unpartitioned asset_snapshots. Databases created before
+this revision existed already have these tables; they are at a later
+revision and never run it.
+
+Revision ID: 0b1d4f6a8c25
+Revises:
+Create Date: 2026-10-17 08:55:13.502671
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '0b1d4f6a8c25'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('username', sa.String(length=100), nullable=False),
+        sa.Column('region', sa.String(length=50), nullable=True),
+        sa.Column('goal_weight', sa.Float(), nullable=True),
+        sa.Column('daily_calorie_target', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'weight_records',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('weight_kg', sa.Float(), nullable=False),
+        sa.Column('recorded_date', sa.Date(), nullable=False),
+        sa.Column('note', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_weight_records_user_id', 'weight_records', ['user_id'])
+
+    op.create_table(
+        'asset_snapshots',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('asset_value', sa.Float(), nullable=False),
+        sa.Column('delta', sa.Float(), nullable=False),
+        sa.Column('trigger_type', sa.String(length=50), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_asset_snapshots_user_id', 'asset_snapshots', ['user_id'])
+    op.create_index('ix_asset_snapshots_snapshot_date', 'asset_snapshots', ['snapshot_date'])
+
+    op.create_table(
+        'food_records',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('meal_type', sa.String(length=20), nullable=False),
+        sa.Column('recorded_date', sa.Date(), nullable=False),
+        sa.Column('total_calories', sa.Integer(), nullable=False),
+        sa.Column('note', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_food_records_user_id', 'food_records', ['user_id'])
+    op.create_index('ix_food_records_recorded_date', 'food_records', ['recorded_date'])
+
+    op.create_table(
+        'food_items',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('food_record_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('calories', sa.Integer(), nullable=False),
+        sa.Column('amount_g', sa.Float(), nullable=True),
+        sa.Column('image_url', sa.String(length=1000), nullable=True),
+        sa.Column('pixel_icon_type', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['food_record_id'], ['food_records.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_food_items_food_record_id', 'food_items', ['food_record_id'])
+
+
+def downgrade() -> None:
+    op.drop_table('food_items')
+    op.drop_table('food_records')
+    op.drop_table('asset_snapshots')
+    op.drop_table('weight_records')
+    op.drop_table('users')
@@ -0,0 +1,52 @@
+"""user activity days
+
+Revision ID: a1c3e5f70b21
+Revises: 0b1d4f6a8c25
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'a1c3e5f70b21'
+down_revision: Union[str, None] = '0b1d4f6a8c25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_activity_days',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('activity_date', sa.Date(), nullable=False),
+        sa.Column('weight_count', sa.Integer(), nullable=False),
+        sa.Column('food_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'activity_date', name='uq_user_activity_days_user_date'),
+    )
+
+    # Backfill from the existing record tables
+    op.execute(
+        """
+        INSERT INTO user_activity_days (id, user_id, activity_date, weight_count, food_count)
+        SELECT gen_random_uuid(), user_id, day, sum(w), sum(f)
+        FROM (
+            SELECT user_id, recorded_date AS day, 1 AS w, 0 AS f FROM weight_records
+            UNION ALL
+            SELECT user_id, recorded_date AS day, 0 AS w, 1 AS f FROM food_records
+        ) AS activity
+        GROUP BY user_id, day
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_activity_days')
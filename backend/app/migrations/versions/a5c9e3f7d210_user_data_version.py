@@ -0,0 +1,28 @@
+"""user data version
+
+Revision ID: a5c9e3f7d210
+Revises: f3b8d2a6c915
+Create Date: 2026-10-17 17:08:12.640571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'a5c9e3f7d210'
+down_revision: Union[str, None] = 'f3b8d2a6c915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('data_version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'data_version')
@@ -0,0 +1,28 @@
+"""weight history index
+
+Revision ID: a8d3f6b1c529
+Revises: f7c2a9d4e318
+Create Date: 2026-10-18 03:02:51.640193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'a8d3f6b1c529'
+down_revision: Union[str, None] = 'f7c2a9d4e318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_weight_records_user_date_id',
+        'weight_records',
+        ['user_id', 'recorded_date', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_weight_records_user_date_id', table_name='weight_records')
@@ -0,0 +1,38 @@
+"""sync keys
+
+Revision ID: b6d1f8e2a4c7
+Revises: a5c9e3f7d210
+Create Date: 2026-10-17 20:41:07.315902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'b6d1f8e2a4c7'
+down_revision: Union[str, None] = 'a5c9e3f7d210'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sync_keys',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('key', sa.String(length=100), nullable=False),
+        sa.Column('status', sa.Integer(), nullable=False),
+        sa.Column('result_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('error', sa.String(length=500), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'key', name='uq_sync_keys_user_key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sync_keys')
@@ -0,0 +1,83 @@
+"""asset ledger head
+
+Revision ID: b7d2f4a81c36
+Revises: a1c3e5f70b21
+Create Date: 2026-10-17 10:03:11.402917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'b7d2f4a81c36'
+down_revision: Union[str, None] = 'a1c3e5f70b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-user ledger sequence. Snapshots written in one transaction share
+    # created_at, so the streak bonus is ordered before the food snapshot.
+    op.add_column('asset_snapshots', sa.Column('seq', sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE asset_snapshots AS s
+        SET seq = ordered.seq
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY user_id
+                ORDER BY created_at,
+                         CASE trigger_type WHEN 'streak_bonus' THEN 0 ELSE 1 END,
+                         id
+            ) AS seq
+            FROM asset_snapshots
+        ) AS ordered
+        WHERE s.id = ordered.id
+        """
+    )
+    op.alter_column('asset_snapshots', 'seq', nullable=False)
+    op.create_unique_constraint('uq_asset_snapshots_user_seq', 'asset_snapshots', ['user_id', 'seq'])
+
+    op.create_table(
+        'asset_states',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('current_value', sa.Float(), nullable=False),
+        sa.Column('previous_value', sa.Float(), nullable=True),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('all_time_high', sa.Float(), nullable=False),
+        sa.Column('all_time_low', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+    op.execute(
+        """
+        INSERT INTO asset_states (
+            id, user_id, current_value, previous_value, seq, all_time_high, all_time_low
+        )
+        SELECT gen_random_uuid(), s.user_id, head.asset_value, prev.asset_value,
+               s.max_seq, s.ath, s.atl
+        FROM (
+            SELECT user_id, max(seq) AS max_seq,
+                   max(asset_value) AS ath, min(asset_value) AS atl
+            FROM asset_snapshots
+            GROUP BY user_id
+        ) AS s
+        JOIN asset_snapshots AS head
+            ON head.user_id = s.user_id AND head.seq = s.max_seq
+        LEFT JOIN asset_snapshots AS prev
+            ON prev.user_id = s.user_id AND prev.seq = s.max_seq - 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('asset_states')
+    op.drop_constraint('uq_asset_snapshots_user_seq', 'asset_snapshots', type_='unique')
+    op.drop_column('asset_snapshots', 'seq')
@@ -0,0 +1,50 @@
+"""composite indexes
+
+Per-user (user_id, date, ...) indexes in the sort order of the queries, in
+place of the single-column ones they make redundant; weight_records is
+served by ix_weight_records_user_date_id from a8d3f6b1c529.
+tests/test_query_plans.py checks the plans.
+
+Revision ID: c3f9e1b7d482
+Revises: a8d3f6b1c529
+Create Date: 2026-10-18 04:26:38.771045
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'c3f9e1b7d482'
+down_revision: Union[str, None] = 'a8d3f6b1c529'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_weight_records_user_id', table_name='weight_records')
+
+    op.create_index(
+        'ix_food_records_user_date',
+        'food_records',
+        ['user_id', 'recorded_date', 'created_at', 'id'],
+    )
+    op.drop_index('ix_food_records_user_id', table_name='food_records')
+    op.drop_index('ix_food_records_recorded_date', table_name='food_records')
+
+    # Created on every partition
+    op.create_index(
+        'ix_asset_snapshots_user_value',
+        'asset_snapshots',
+        ['user_id', 'asset_value', 'snapshot_date', 'seq'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_asset_snapshots_user_value', table_name='asset_snapshots')
+
+    op.create_index('ix_food_records_recorded_date', 'food_records', ['recorded_date'])
+    op.create_index('ix_food_records_user_id', 'food_records', ['user_id'])
+    op.drop_index('ix_food_records_user_date', table_name='food_records')
+
+    op.create_index('ix_weight_records_user_id', 'weight_records', ['user_id'])
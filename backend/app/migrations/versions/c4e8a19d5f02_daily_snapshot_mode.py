@@ -0,0 +1,68 @@
+"""daily snapshot mode
+
+Revision ID: c4e8a19d5f02
+Revises: b7d2f4a81c36
+Create Date: 2026-10-17 11:20:54.730115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+
+
+revision: str = 'c4e8a19d5f02'
+down_revision: Union[str, None] = 'b7d2f4a81c36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'asset_snapshots',
+        sa.Column('event_count', sa.Integer(), server_default='1', nullable=False),
+    )
+
+    if settings.ASSET_SNAPSHOT_MODE != "daily":
+        return
+
+    # Compact to one row per (user, day, trigger type). The row with the
+    # latest seq survives, carrying the group's total delta and event count.
+    op.execute(
+        """
+        WITH grouped AS (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY user_id, snapshot_date, trigger_type ORDER BY seq DESC
+                   ) AS rn,
+                   sum(delta) OVER (PARTITION BY user_id, snapshot_date, trigger_type) AS total_delta,
+                   count(*) OVER (PARTITION BY user_id, snapshot_date, trigger_type) AS events
+            FROM asset_snapshots
+        )
+        UPDATE asset_snapshots AS s
+        SET delta = round(g.total_delta::numeric, 4)::float8,
+            event_count = g.events
+        FROM grouped AS g
+        WHERE s.id = g.id AND g.rn = 1 AND g.events > 1
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM asset_snapshots AS s
+        USING (
+            SELECT id,
+                   row_number() OVER (
+                       PARTITION BY user_id, snapshot_date, trigger_type ORDER BY seq DESC
+                   ) AS rn
+            FROM asset_snapshots
+        ) AS ranked
+        WHERE s.id = ranked.id AND ranked.rn > 1
+        """
+    )
+
+
+def downgrade() -> None:
+    # Compacted rows cannot be split back into individual events
+    op.drop_column('asset_snapshots', 'event_count')
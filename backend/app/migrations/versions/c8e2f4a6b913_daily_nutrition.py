@@ -0,0 +1,53 @@
+"""daily nutrition
+
+Revision ID: c8e2f4a6b913
+Revises: b6d1f8e2a4c7
+Create Date: 2026-10-17 22:05:31.640215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'c8e2f4a6b913'
+down_revision: Union[str, None] = 'b6d1f8e2a4c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_nutrition',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('nutrition_date', sa.Date(), nullable=False),
+        sa.Column('total_calories', sa.Integer(), nullable=False),
+        sa.Column('meal_count', sa.Integer(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'nutrition_date', name='uq_daily_nutrition_user_date'),
+    )
+
+    # Backfill from the existing food records
+    op.execute(
+        """
+        INSERT INTO daily_nutrition (id, user_id, nutrition_date, total_calories, meal_count, item_count)
+        SELECT gen_random_uuid(), r.user_id, r.recorded_date, sum(r.total_calories), count(*),
+               coalesce(sum(i.items), 0)
+        FROM food_records AS r
+        LEFT JOIN (
+            SELECT food_record_id, count(*) AS items FROM food_items GROUP BY food_record_id
+        ) AS i ON i.food_record_id = r.id
+        GROUP BY r.user_id, r.recorded_date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('daily_nutrition')
@@ -0,0 +1,77 @@
+"""food catalog
+
+Revision ID: d4a7e9c2f186
+Revises: c8e2f4a6b913
+Create Date: 2026-10-17 23:18:52.402937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'd4a7e9c2f186'
+down_revision: Union[str, None] = 'c8e2f4a6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_table(
+        'food_catalog',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('normalized_name', sa.String(length=200), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('pixel_icon_type', sa.String(length=20), nullable=False),
+        sa.Column('log_count', sa.Integer(), nullable=False),
+        sa.Column('calorie_sum', sa.BigInteger(), nullable=False),
+        sa.Column('measured_calories', sa.BigInteger(), nullable=False),
+        sa.Column('measured_grams', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('normalized_name'),
+    )
+    op.create_index('ix_food_catalog_updated_at', 'food_catalog', ['updated_at'])
+    op.create_index(
+        'ix_food_catalog_name_trgm',
+        'food_catalog',
+        ['normalized_name'],
+        postgresql_using='gin',
+        postgresql_ops={'normalized_name': 'gin_trgm_ops'},
+    )
+
+    # Seed from the items logged so far
+    op.execute(
+        r"""
+        INSERT INTO food_catalog (
+            id, normalized_name, name, pixel_icon_type, log_count, calorie_sum,
+            measured_calories, measured_grams
+        )
+        SELECT gen_random_uuid(), normalized_name, min(name),
+               coalesce(mode() WITHIN GROUP (ORDER BY pixel_icon_type)
+                        FILTER (WHERE pixel_icon_type <> 'other'), 'other'),
+               count(*), sum(calories),
+               coalesce(sum(calories) FILTER (WHERE amount_g IS NOT NULL), 0),
+               coalesce(sum(amount_g), 0)
+        FROM (
+            SELECT lower(name) AS normalized_name, name, pixel_icon_type, calories, amount_g
+            FROM (
+                SELECT regexp_replace(btrim(name), '\s+', ' ', 'g') AS name,
+                       pixel_icon_type, calories, amount_g
+                FROM food_items
+            ) AS spaced
+        ) AS items
+        WHERE normalized_name <> ''
+        GROUP BY normalized_name
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_food_catalog_name_trgm', table_name='food_catalog')
+    op.drop_index('ix_food_catalog_updated_at', table_name='food_catalog')
+    op.drop_table('food_catalog')
@@ -0,0 +1,81 @@
+"""asset candles
+
+Revision ID: d9f1b3c6e47a
+Revises: c4e8a19d5f02
+Create Date: 2026-10-17 13:02:37.551460
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'd9f1b3c6e47a'
+down_revision: Union[str, None] = 'c4e8a19d5f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'asset_candles',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('granularity', sa.String(length=10), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('open', sa.Float(), nullable=False),
+        sa.Column('high', sa.Float(), nullable=False),
+        sa.Column('low', sa.Float(), nullable=False),
+        sa.Column('close', sa.Float(), nullable=False),
+        sa.Column('volume', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'granularity', 'period_start', name='uq_asset_candles_user_period'),
+    )
+
+    # Backfill from the ledger: open is the value before the period's first event
+    op.execute(
+        """
+        WITH s AS (
+            SELECT user_id, snapshot_date, seq, asset_value, event_count,
+                   coalesce(
+                       lag(asset_value) OVER (PARTITION BY user_id ORDER BY snapshot_date, seq),
+                       asset_value
+                   ) AS prev_value
+            FROM asset_snapshots
+        ),
+        periods AS (
+            SELECT 'day' AS granularity, snapshot_date AS period_start,
+                   user_id, snapshot_date, seq, asset_value, event_count, prev_value
+            FROM s
+            UNION ALL
+            SELECT 'week', date_trunc('week', snapshot_date)::date,
+                   user_id, snapshot_date, seq, asset_value, event_count, prev_value
+            FROM s
+        ),
+        agg AS (
+            SELECT user_id, granularity, period_start,
+                   (array_agg(prev_value ORDER BY snapshot_date, seq))[1] AS open,
+                   max(asset_value) AS high,
+                   min(asset_value) AS low,
+                   (array_agg(asset_value ORDER BY snapshot_date DESC, seq DESC))[1] AS close,
+                   sum(event_count) AS volume
+            FROM periods
+            GROUP BY user_id, granularity, period_start
+        )
+        INSERT INTO asset_candles (
+            id, user_id, granularity, period_start, open, high, low, close, volume
+        )
+        SELECT gen_random_uuid(), user_id, granularity, period_start,
+               open, greatest(high, open), least(low, open), close, volume
+        FROM agg
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('asset_candles')
@@ -0,0 +1,55 @@
+"""asset extreme dates
+
+Revision ID: e2a7c5d19b84
+Revises: d9f1b3c6e47a
+Create Date: 2026-10-17 14:11:05.287304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e2a7c5d19b84'
+down_revision: Union[str, None] = 'd9f1b3c6e47a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('asset_states', sa.Column('all_time_high_date', sa.Date(), nullable=True))
+    op.add_column('asset_states', sa.Column('all_time_low_date', sa.Date(), nullable=True))
+
+    # Backfill from the ledger: the extreme value and the first day it was reached
+    op.execute(
+        """
+        UPDATE asset_states AS st
+        SET all_time_high = hi.asset_value,
+            all_time_high_date = hi.snapshot_date
+        FROM (
+            SELECT DISTINCT ON (user_id) user_id, asset_value, snapshot_date
+            FROM asset_snapshots
+            ORDER BY user_id, asset_value DESC, snapshot_date, seq
+        ) AS hi
+        WHERE st.user_id = hi.user_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE asset_states AS st
+        SET all_time_low = lo.asset_value,
+            all_time_low_date = lo.snapshot_date
+        FROM (
+            SELECT DISTINCT ON (user_id) user_id, asset_value, snapshot_date
+            FROM asset_snapshots
+            ORDER BY user_id, asset_value ASC, snapshot_date, seq
+        ) AS lo
+        WHERE st.user_id = lo.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('asset_states', 'all_time_low_date')
+    op.drop_column('asset_states', 'all_time_high_date')
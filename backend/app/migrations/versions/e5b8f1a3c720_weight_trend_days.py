@@ -0,0 +1,98 @@
+"""weight trend days
+
+Revision ID: e5b8f1a3c720
+Revises: d4a7e9c2f186
+Create Date: 2026-10-18 00:41:07.318554
+
+"""
+from collections import deque
+from datetime import timedelta
+from typing import Sequence, Union
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'e5b8f1a3c720'
+down_revision: Union[str, None] = 'd4a7e9c2f186'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept in step with app.services.trend_service
+TREND_ALPHA = 0.1
+SHORT_WINDOW_DAYS = 7
+LONG_WINDOW_DAYS = 30
+BATCH_ROWS = 5000
+
+
+def upgrade() -> None:
+    trend_days = op.create_table(
+        'weight_trend_days',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('trend_date', sa.Date(), nullable=False),
+        sa.Column('weight_kg', sa.Float(), nullable=False),
+        sa.Column('ewma_kg', sa.Float(), nullable=False),
+        sa.Column('mean_7d_kg', sa.Float(), nullable=False),
+        sa.Column('mean_30d_kg', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'trend_date', name='uq_weight_trend_user_date'),
+    )
+
+    # Backfill from the last reading of each day, one pass over the weight
+    # records in keyset batches: a server-side cursor would stay open until
+    # the migration's transaction ends and block later revisions from
+    # altering weight_records
+    bind = op.get_bind()
+    query = (
+        "SELECT DISTINCT ON (user_id, recorded_date) user_id, recorded_date, weight_kg "
+        "FROM weight_records {where} ORDER BY user_id, recorded_date, created_at DESC LIMIT :limit"
+    )
+    user_id = ewma = ewma_date = None
+    window = deque()
+    position = None
+    while True:
+        if position is None:
+            batch = bind.execute(sa.text(query.format(where="")), {"limit": BATCH_ROWS}).all()
+        else:
+            batch = bind.execute(
+                sa.text(query.format(where="WHERE (user_id, recorded_date) > (:user_id, :day)")),
+                {"limit": BATCH_ROWS, "user_id": position[0], "day": position[1]},
+            ).all()
+        rows = []
+        for reading_user, day, weight in batch:
+            if reading_user != user_id:
+                user_id, ewma, ewma_date = reading_user, None, None
+                window.clear()
+            if ewma is None:
+                ewma = weight
+            else:
+                keep = (1 - TREND_ALPHA) ** (day - ewma_date).days
+                ewma = round(weight + keep * (ewma - weight), 4)
+            ewma_date = day
+            window.append((day, weight))
+            while window[0][0] <= day - timedelta(days=LONG_WINDOW_DAYS):
+                window.popleft()
+            short = [w for d, w in window if d > day - timedelta(days=SHORT_WINDOW_DAYS)]
+            rows.append(dict(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                trend_date=day,
+                weight_kg=weight,
+                ewma_kg=ewma,
+                mean_7d_kg=round(sum(short) / len(short), 4),
+                mean_30d_kg=round(sum(w for _, w in window) / len(window), 4),
+            ))
+        if rows:
+            op.bulk_insert(trend_days, rows)
+        if len(batch) < BATCH_ROWS:
+            break
+        position = batch[-1][:2]
+
+
+def downgrade() -> None:
+    op.drop_table('weight_trend_days')
@@ -0,0 +1,100 @@
+"""partition asset snapshots
+
+Revision ID: f3b8d2a6c915
+Revises: e2a7c5d19b84
+Create Date: 2026-10-17 15:26:41.903318
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'f3b8d2a6c915'
+down_revision: Union[str, None] = 'e2a7c5d19b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+COLUMNS = 'id, user_id, asset_value, delta, event_count, trigger_type, snapshot_date, seq, created_at'
+
+
+def _columns() -> list[sa.Column]:
+    return [
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('asset_value', sa.Float(), nullable=False),
+        sa.Column('delta', sa.Float(), nullable=False),
+        sa.Column('event_count', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('trigger_type', sa.String(length=50), nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('seq', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    ]
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'asset_snapshots_partitioned',
+        *_columns(),
+        postgresql_partition_by='RANGE (snapshot_date)',
+    )
+    op.execute('CREATE TABLE asset_snapshots_default PARTITION OF asset_snapshots_partitioned DEFAULT')
+
+    # One partition per month that has data, plus the current and upcoming months
+    bind = op.get_bind()
+    months = set(
+        bind.execute(
+            sa.text("SELECT DISTINCT date_trunc('month', snapshot_date)::date FROM asset_snapshots")
+        ).scalars()
+    )
+    current = date.today().replace(day=1)
+    months.update(_add_months(current, offset) for offset in range(MONTHS_AHEAD + 1))
+    for month in sorted(months):
+        op.execute(
+            f"CREATE TABLE asset_snapshots_{month:%Y_%m} PARTITION OF asset_snapshots_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+
+    op.execute(
+        f'INSERT INTO asset_snapshots_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM asset_snapshots'
+    )
+    op.drop_table('asset_snapshots')
+    op.rename_table('asset_snapshots_partitioned', 'asset_snapshots')
+
+    # Built after the copy; each is created on every partition
+    op.create_primary_key('asset_snapshots_pkey', 'asset_snapshots', ['id', 'snapshot_date'])
+    op.create_unique_constraint(
+        'uq_asset_snapshots_user_date_seq', 'asset_snapshots', ['user_id', 'snapshot_date', 'seq']
+    )
+    op.create_foreign_key(
+        'asset_snapshots_user_id_fkey', 'asset_snapshots', 'users', ['user_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    op.create_table(
+        'asset_snapshots_unpartitioned',
+        *_columns(),
+    )
+    op.execute(
+        f'INSERT INTO asset_snapshots_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM asset_snapshots'
+    )
+    op.drop_table('asset_snapshots')
+    op.rename_table('asset_snapshots_unpartitioned', 'asset_snapshots')
+
+    op.create_primary_key('asset_snapshots_pkey', 'asset_snapshots', ['id'])
+    op.create_unique_constraint('uq_asset_snapshots_user_seq', 'asset_snapshots', ['user_id', 'seq'])
+    op.create_index('ix_asset_snapshots_user_id', 'asset_snapshots', ['user_id'])
+    op.create_index('ix_asset_snapshots_snapshot_date', 'asset_snapshots', ['snapshot_date'])
+    op.create_foreign_key(
+        'asset_snapshots_user_id_fkey', 'asset_snapshots', 'users', ['user_id'], ['id'], ondelete='CASCADE'
+    )
@@ -0,0 +1,77 @@
+"""weight forecasts
+
+Revision ID: f7c2a9d4e318
+Revises: e5b8f1a3c720
+Create Date: 2026-10-18 02:13:44.905217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'f7c2a9d4e318'
+down_revision: Union[str, None] = 'e5b8f1a3c720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'weight_forecasts',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('fitted_on', sa.Date(), nullable=True),
+        sa.Column('point_count', sa.Integer(), nullable=False),
+        sa.Column('slope_kg_per_day', sa.Float(), nullable=True),
+        sa.Column('intercept_kg', sa.Float(), nullable=True),
+        sa.Column('slope_stderr', sa.Float(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+
+    # Backfill from the trend rows; the same two-pass fit as
+    # app.services.forecast_service (60-day window, outliers beyond 2.5 spreads)
+    op.execute(
+        """
+        WITH readings AS (
+            SELECT t.user_id, l.last_day, t.trend_date - l.last_day AS x, t.weight_kg AS y
+            FROM weight_trend_days AS t
+            JOIN (
+                SELECT user_id, max(trend_date) AS last_day
+                FROM weight_trend_days GROUP BY user_id
+            ) AS l ON l.user_id = t.user_id
+            WHERE t.trend_date > l.last_day - 60
+        ),
+        first_fit AS (
+            SELECT user_id, regr_slope(y, x) AS slope, regr_intercept(y, x) AS intercept,
+                   sqrt(greatest(regr_syy(y, x) - power(regr_sxy(y, x), 2)
+                                 / nullif(regr_sxx(y, x), 0), 0)
+                        / nullif(regr_count(y, x) - 2, 0)) AS spread
+            FROM readings GROUP BY user_id
+        )
+        INSERT INTO weight_forecasts (
+            id, user_id, fitted_on, point_count, slope_kg_per_day, intercept_kg, slope_stderr
+        )
+        SELECT gen_random_uuid(), r.user_id, r.last_day, regr_count(r.y, r.x),
+               regr_slope(r.y, r.x), regr_intercept(r.y, r.x),
+               sqrt(greatest(regr_syy(r.y, r.x) - power(regr_sxy(r.y, r.x), 2)
+                             / nullif(regr_sxx(r.y, r.x), 0), 0)
+                    / nullif(regr_count(r.y, r.x) - 2, 0)
+                    / nullif(regr_sxx(r.y, r.x), 0))
+        FROM readings AS r
+        JOIN first_fit AS f ON f.user_id = r.user_id
+        WHERE coalesce(f.spread, 0) = 0
+           OR abs(r.y - (f.intercept + f.slope * r.x)) <= 2.5 * f.spread
+        GROUP BY r.user_id, r.last_day
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('weight_forecasts')
@@ -1,7 +1,29 @@
 from app.models.user import User
 from app.models.weight_record import WeightRecord
+from app.models.weight_trend_day import WeightTrendDay
+from app.models.weight_forecast import WeightForecast
 from app.models.asset_snapshot import AssetSnapshot
+from app.models.asset_state import AssetState
+from app.models.asset_candle import AssetCandle
 from app.models.food_record import FoodRecord
 from app.models.food_item import FoodItem
+from app.models.food_catalog import FoodCatalogEntry
+from app.models.user_activity_day import UserActivityDay
+from app.models.daily_nutrition import DailyNutrition
+from app.models.sync_key import SyncKey
 
-__all__ = ["User", "WeightRecord", "AssetSnapshot", "FoodRecord", "FoodItem"]
+__all__ = [
+    "User",
+    "WeightRecord",
+    "WeightTrendDay",
+    "WeightForecast",
+    "AssetSnapshot",
+    "AssetState",
+    "AssetCandle",
+    "FoodRecord",
+    "FoodItem",
+    "FoodCatalogEntry",
+    "UserActivityDay",
+    "DailyNutrition",
+    "SyncKey",
+]
@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime, date
+from enum import Enum as PyEnum
+from sqlalchemy import Float, Integer, Date, DateTime, ForeignKey, String, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class CandleGranularity(str, PyEnum):
+    day = "day"
+    week = "week"
+
+
+class AssetCandle(Base):
+    __tablename__ = "asset_candles"
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "granularity", "period_start", name="uq_asset_candles_user_period"
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    granularity: Mapped[str] = mapped_column(String(10), nullable=False)
+    # First day of the period (the Monday for weekly candles)
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    open: Mapped[float] = mapped_column(Float, nullable=False)
+    high: Mapped[float] = mapped_column(Float, nullable=False)
+    low: Mapped[float] = mapped_column(Float, nullable=False)
+    close: Mapped[float] = mapped_column(Float, nullable=False)
+    # Number of asset events in the period
+    volume: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    user: Mapped["User"] = relationship("User", back_populates="asset_candles")  # noqa: F821
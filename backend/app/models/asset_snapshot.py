@@ -1,7 +1,9 @@
 import uuid
 from datetime import datetime, date
 from enum import Enum as PyEnum
-from sqlalchemy import Float, Date, DateTime, ForeignKey, String, func
+from sqlalchemy import (
+    DDL, Float, Integer, Date, DateTime, ForeignKey, Index, String, UniqueConstraint, event, func
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
@@ -17,20 +19,46 @@ class TriggerType(str, PyEnum):
 
 
 class AssetSnapshot(Base):
+    """
+    One ledger entry. The table is range-partitioned by month on
+    snapshot_date (see partition_service), so the primary key and unique
+    constraint both carry the partition key.
+    """
+
     __tablename__ = "asset_snapshots"
+    __table_args__ = (
+        # Also serves per-user date range scans in (date, seq) order
+        UniqueConstraint("user_id", "snapshot_date", "seq", name="uq_asset_snapshots_user_date_seq"),
+        # All-time high and low of a ledger prefix, and the first time each was reached
+        Index("ix_asset_snapshots_user_value", "user_id", "asset_value", "snapshot_date", "seq"),
+        {"postgresql_partition_by": "RANGE (snapshot_date)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     asset_value: Mapped[float] = mapped_column(Float, nullable=False)
     delta: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    # Number of triggers folded into this row (always 1 in "event" snapshot mode)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     trigger_type: Mapped[str] = mapped_column(String(50), nullable=False)
-    snapshot_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    snapshot_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    # Per-user ledger position, assigned from AssetState.seq
+    seq: Mapped[int] = mapped_column(Integer, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
 
     user: Mapped["User"] = relationship("User", back_populates="asset_snapshots")  # noqa: F821
+
+
+# Catch-all partition so a freshly created table accepts any date; monthly
+# partitions are added by partition_service.ensure_partitions().
+event.listen(
+    AssetSnapshot.__table__,
+    "after_create",
+    DDL("CREATE TABLE asset_snapshots_default PARTITION OF asset_snapshots DEFAULT"),
+)
@@ -0,0 +1,46 @@
+import uuid
+from datetime import date, datetime
+from sqlalchemy import Float, Integer, Date, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class AssetState(Base):
+    """
+    Head of a user's asset ledger, updated together with every snapshot insert.
+
+    ``seq`` doubles as an optimistic version: the UPDATE of the head only
+    matches the seq it was read at, so a writer racing past the per-user
+    lock fails its flush instead of reusing ledger positions.
+    """
+
+    __tablename__ = "asset_states"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    current_value: Mapped[float] = mapped_column(Float, nullable=False)
+    previous_value: Mapped[float | None] = mapped_column(Float, nullable=True)
+    seq: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    all_time_high: Mapped[float] = mapped_column(Float, nullable=False)
+    all_time_low: Mapped[float] = mapped_column(Float, nullable=False)
+    # Snapshot date on which the high/low was first reached
+    all_time_high_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    all_time_low_date: Mapped[date | None] = mapped_column(Date, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __mapper_args__ = {"version_id_col": seq, "version_id_generator": False}
+
+    user: Mapped["User"] = relationship("User", back_populates="asset_state")  # noqa: F821
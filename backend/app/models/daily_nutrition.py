@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime, date
+from sqlalchemy import Integer, Date, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class DailyNutrition(Base):
+    __tablename__ = "daily_nutrition"
+    __table_args__ = (
+        UniqueConstraint("user_id", "nutrition_date", name="uq_daily_nutrition_user_date"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    nutrition_date: Mapped[date] = mapped_column(Date, nullable=False)
+    total_calories: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    meal_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    user: Mapped["User"] = relationship("User", back_populates="daily_nutrition")  # noqa: F821
@@ -0,0 +1,52 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import DDL, BigInteger, Float, Integer, String, DateTime, Index, event, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class FoodCatalogEntry(Base):
+    """
+    One food name in the shared catalog, learned from logged items.
+
+    Rows are keyed by the normalized (case-folded, single-spaced) name and
+    hold running sums, so merging new observations is a single upsert.
+    """
+
+    __tablename__ = "food_catalog"
+    __table_args__ = (
+        Index(
+            "ix_food_catalog_name_trgm",
+            "normalized_name",
+            postgresql_using="gin",
+            postgresql_ops={"normalized_name": "gin_trgm_ops"},
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    normalized_name: Mapped[str] = mapped_column(String(200), nullable=False, unique=True)
+    # Spelling of the first logged item with this name
+    name: Mapped[str] = mapped_column(String(200), nullable=False)
+    pixel_icon_type: Mapped[str] = mapped_column(String(20), nullable=False, default="other")
+    log_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    calorie_sum: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # Calories and grams of the logged items that had a weight
+    measured_calories: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    measured_grams: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True
+    )
+
+
+# The trigram index needs pg_trgm (shipped with the postgres image's contrib modules)
+event.listen(
+    FoodCatalogEntry.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"),
+)
@@ -19,6 +19,7 @@ class PixelIconType(str):
 
 class FoodItem(Base):
     __tablename__ = "food_items"
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
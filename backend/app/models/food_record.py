@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, func
+from sqlalchemy import String, Integer, Date, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
@@ -15,15 +15,21 @@ class MealType(str):
 
 class FoodRecord(Base):
     __tablename__ = "food_records"
+    __table_args__ = (
+        # A user's meals in logging order; also the keyset order of the range pages
+        Index("ix_food_records_user_date", "user_id", "recorded_date", "created_at", "id"),
+    )
+    # Read server-generated timestamps back with the INSERT instead of a refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     meal_type: Mapped[str] = mapped_column(String(20), nullable=False, default="lunch")
-    recorded_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    recorded_date: Mapped[date] = mapped_column(Date, nullable=False)
     total_calories: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     note: Mapped[str | None] = mapped_column(String(500), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
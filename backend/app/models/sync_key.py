@@ -0,0 +1,32 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class SyncKey(Base):
+    """Outcome of one offline-sync operation, stored under its client idempotency key."""
+
+    __tablename__ = "sync_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_sync_keys_user_key"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    key: Mapped[str] = mapped_column(String(100), nullable=False)
+    status: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Id of the record or item the operation created or changed
+    result_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    user: Mapped["User"] = relationship("User", back_populates="sync_keys")  # noqa: F821
@@ -20,6 +20,8 @@ class User(Base):
     region: Mapped[str | None] = mapped_column(String(50), nullable=True)
     goal_weight: Mapped[float | None] = mapped_column(Float, nullable=True)
     daily_calorie_target: Mapped[int] = mapped_column(Integer, default=2000, nullable=False)
+    # Bumped by every write to the user's data; source of the API's ETags
+    data_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -36,3 +38,24 @@ class User(Base):
     asset_snapshots: Mapped[list["AssetSnapshot"]] = relationship(  # noqa: F821
         "AssetSnapshot", back_populates="user", cascade="all, delete-orphan"
     )
+    asset_candles: Mapped[list["AssetCandle"]] = relationship(  # noqa: F821
+        "AssetCandle", back_populates="user", cascade="all, delete-orphan"
+    )
+    asset_state: Mapped["AssetState"] = relationship(  # noqa: F821
+        "AssetState", back_populates="user", cascade="all, delete-orphan"
+    )
+    activity_days: Mapped[list["UserActivityDay"]] = relationship(  # noqa: F821
+        "UserActivityDay", back_populates="user", cascade="all, delete-orphan"
+    )
+    daily_nutrition: Mapped[list["DailyNutrition"]] = relationship(  # noqa: F821
+        "DailyNutrition", back_populates="user", cascade="all, delete-orphan"
+    )
+    weight_trend_days: Mapped[list["WeightTrendDay"]] = relationship(  # noqa: F821
+        "WeightTrendDay", back_populates="user", cascade="all, delete-orphan"
+    )
+    weight_forecast: Mapped["WeightForecast"] = relationship(  # noqa: F821
+        "WeightForecast", back_populates="user", cascade="all, delete-orphan"
+    )
+    sync_keys: Mapped[list["SyncKey"]] = relationship(  # noqa: F821
+        "SyncKey", back_populates="user", cascade="all, delete-orphan"
+    )
@@ -0,0 +1,41 @@
+import uuid
+from datetime import date, datetime
+from sqlalchemy import Float, Integer, Date, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class WeightForecast(Base):
+    """
+    Least-squares line through a user's recent daily readings, refitted with every weigh-in.
+
+    ``x`` is days relative to ``fitted_on`` (the last day with a reading), so
+    ``intercept_kg`` is the fitted weight on that day.
+    """
+
+    __tablename__ = "weight_forecasts"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    fitted_on: Mapped[date | None] = mapped_column(Date, nullable=True)
+    # Readings the line was fitted to, after outliers were dropped
+    point_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    slope_kg_per_day: Mapped[float | None] = mapped_column(Float, nullable=True)
+    intercept_kg: Mapped[float | None] = mapped_column(Float, nullable=True)
+    slope_stderr: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    user: Mapped["User"] = relationship("User", back_populates="weight_forecast")  # noqa: F821
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date
-from sqlalchemy import String, Float, Date, DateTime, ForeignKey, func
+from sqlalchemy import String, Float, Date, DateTime, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
@@ -8,13 +8,17 @@ from app.database import Base
 
 class WeightRecord(Base):
     __tablename__ = "weight_records"
-    __table_args__: tuple = ()
+    __table_args__ = (
+        # Keyset order of the history pages; also serves the per-day reads of
+        # the trend and the dashboard
+        Index("ix_weight_records_user_date_id", "user_id", "recorded_date", "id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     weight_kg: Mapped[float] = mapped_column(Float, nullable=False)
     recorded_date: Mapped[date] = mapped_column(Date, nullable=False)
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime, date
+from sqlalchemy import Float, Date, DateTime, ForeignKey, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class WeightTrendDay(Base):
+    """
+    The smoothed weight series, one row per day with a weigh-in.
+
+    ``weight_kg`` is the day's last reading; the moving averages cover the
+    readings of the days in the window ending on ``trend_date``.
+    """
+
+    __tablename__ = "weight_trend_days"
+    __table_args__ = (
+        UniqueConstraint("user_id", "trend_date", name="uq_weight_trend_user_date"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    trend_date: Mapped[date] = mapped_column(Date, nullable=False)
+    weight_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    # Exponentially weighted moving average of the daily readings
+    ewma_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    mean_7d_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    mean_30d_kg: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+    user: Mapped["User"] = relationship("User", back_populates="weight_trend_days")  # noqa: F821
@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.schemas.user import UserRegister, UserLogin, UserOut, TokenResponse, RefreshRequest
+from app.schemas.user import (
+    UserRegister, UserLogin, UserOut, TokenResponse, RefreshRequest, CachedUser
+)
 from app.services.auth_service import register_user, authenticate_user, generate_tokens
 from app.core.security import decode_token
 from app.core.dependencies import get_current_user
-from app.models.user import User
 
 
 router = APIRouter()
@@ -42,5 +43,5 @@ async def refresh_token(body: RefreshRequest):
 
 
 @router.get("/me", response_model=UserOut)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: CachedUser = Depends(get_current_user)):
     return current_user
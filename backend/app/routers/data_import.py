@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.core.dependencies import get_current_user
+from app.schemas.user import CachedUser
+from app.schemas.data_import import ImportFormatLiteral, ImportResult
+from app.services import import_service
+
+
+router = APIRouter()
+
+
+@router.post("", response_model=ImportResult, status_code=201)
+async def import_records(
+    request: Request,
+    file_format: ImportFormatLiteral = Query("jsonl", alias="format"),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Import weight and food history sent as a CSV or JSON Lines request body."""
+    return await import_service.import_records(current_user.id, request.stream(), file_format, db)
@@ -5,20 +5,28 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.core.dependencies import get_current_user
-from app.models.user import User
+from app.core.etag import conditional_get
+from app.schemas.user import CachedUser
 from app.schemas.food import (
     FoodRecordCreate,
     FoodRecordOut,
     FoodItemAdd,
     FoodItemOut,
     DailyFoodSummary,
+    FoodRecordRange,
+    FoodSuggestion,
+    NutritionPeriodLiteral,
+    NutritionStats,
 )
 from app.services.food_service import (
     create_food_record,
     get_daily_food_records,
+    get_food_records_range,
     add_food_item,
     delete_food_item,
 )
+from app.services.catalog_service import MAX_SUGGESTIONS, suggest
+from app.services.nutrition_service import get_nutrition_stats
 
 
 router = APIRouter()
@@ -27,16 +35,20 @@ router = APIRouter()
 @router.post("/record", response_model=FoodRecordOut, status_code=201)
 async def create_record(
     data: FoodRecordCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    return await create_food_record(current_user.id, data, db)
+    return await create_food_record(current_user, data, db)
 
 
-@router.get("/records", response_model=DailyFoodSummary)
+@router.get(
+    "/records",
+    response_model=DailyFoodSummary,
+    dependencies=[Depends(conditional_get)],
+)
 async def list_records(
     target_date: date = Query(default_factory=date.today),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     records = await get_daily_food_records(current_user.id, target_date, db)
@@ -44,10 +56,53 @@ async def list_records(
     return DailyFoodSummary(date=target_date, total_calories=total, records=records)
 
 
+@router.get(
+    "/records/range",
+    response_model=FoodRecordRange,
+    dependencies=[Depends(conditional_get)],
+)
+async def list_records_range(
+    date_from: date = Query(alias="from"),
+    date_to: date = Query(alias="to"),
+    cursor: str | None = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Records and per-day calorie totals for a date range, paginated by cursor."""
+    return await get_food_records_range(current_user.id, date_from, date_to, cursor, limit, db)
+
+
+@router.get(
+    "/stats",
+    response_model=NutritionStats,
+    dependencies=[Depends(conditional_get)],
+)
+async def nutrition_stats(
+    period: NutritionPeriodLiteral = Query("week"),
+    target_date: date = Query(default_factory=date.today),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Calorie totals for the week (Monday start) or calendar month containing target_date."""
+    return await get_nutrition_stats(current_user, period, target_date, db)
+
+
+@router.get("/suggest", response_model=list[FoodSuggestion])
+async def suggest_foods(
+    q: str = Query("", max_length=200),
+    limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Autocomplete food names: the user's frequent items first, then the shared catalog."""
+    return await suggest(current_user, q, limit, db)
+
+
 @router.post("/item", response_model=FoodItemOut, status_code=201)
 async def add_item(
     data: FoodItemAdd,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     return await add_food_item(current_user.id, data, db)
@@ -56,7 +111,7 @@ async def add_item(
 @router.delete("/item/{item_id}", status_code=204)
 async def remove_item(
     item_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     await delete_food_item(current_user.id, item_id, db)
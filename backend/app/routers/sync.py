@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.core.dependencies import get_current_user
+from app.schemas.user import CachedUser
+from app.schemas.sync import SyncRequest, SyncResponse
+from app.services import sync_service
+
+
+router = APIRouter()
+
+
+@router.post("", response_model=SyncResponse)
+async def sync(
+    data: SyncRequest,
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Apply an offline queue of weight/food ops; retries with the same keys are not reapplied."""
+    results = await sync_service.apply_batch(current_user.id, data.ops, db)
+    return SyncResponse(results=results)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, UploadFile, File
 from app.core.dependencies import get_current_user
 from app.core.storage import get_storage, validate_image
-from app.models.user import User
+from app.schemas.user import CachedUser
 
 
 router = APIRouter()
@@ -11,7 +11,7 @@ router = APIRouter()
 async def upload_image(
     file: UploadFile = File(...),
     folder: str = "food",
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
 ):
     await validate_image(file)
     storage = get_storage()
@@ -1,17 +1,30 @@
 import uuid
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.core.dependencies import get_current_user
-from app.models.user import User
-from app.schemas.weight import WeightRecordCreate, WeightRecordUpdate, WeightRecordOut
+from app.core.etag import conditional_get
+from app.schemas.user import CachedUser
+from app.schemas.weight import (
+    GoalForecast,
+    WeightRecordCreate,
+    WeightRecordUpdate,
+    WeightRecordOut,
+    WeightRecordPage,
+    WeightTrend,
+)
 from app.services.weight_service import (
     create_weight_record,
     get_weight_history,
+    get_weight_page,
+    stream_weight_history,
     update_weight_record,
     delete_weight_record,
 )
+from app.services.forecast_service import get_goal_forecast
+from app.services.trend_service import get_weight_trend
 
 
 router = APIRouter()
@@ -20,26 +33,85 @@ router = APIRouter()
 @router.post("", response_model=WeightRecordOut, status_code=201)
 async def add_weight(
     data: WeightRecordCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     return await create_weight_record(current_user.id, data, db)
 
 
-@router.get("", response_model=list[WeightRecordOut])
+@router.get(
+    "",
+    response_model=list[WeightRecordOut],
+    dependencies=[Depends(conditional_get)],
+)
 async def list_weight(
     days: int = Query(30, ge=1, le=365),
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     return await get_weight_history(current_user.id, days, db)
 
 
+@router.get(
+    "/history",
+    response_model=WeightRecordPage,
+    dependencies=[Depends(conditional_get)],
+)
+async def weight_history_page(
+    cursor: str | None = Query(None),
+    limit: int = Query(200, ge=1, le=1000),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """The whole weight history, oldest first, paginated by cursor."""
+    return await get_weight_page(current_user.id, cursor, limit, db)
+
+
+@router.get("/history/stream")
+async def weight_history_stream(
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """The whole weight history as NDJSON, one record per line, oldest first."""
+    # The body reads in sessions of its own; don't hold this one while streaming
+    await db.close()
+    return StreamingResponse(
+        stream_weight_history(current_user.id), media_type="application/x-ndjson"
+    )
+
+
+@router.get(
+    "/trend",
+    response_model=WeightTrend,
+    dependencies=[Depends(conditional_get)],
+)
+async def weight_trend(
+    days: int = Query(30, ge=1, le=365),
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Smoothed weight (EWMA) and 7/30-day means for each day with a weigh-in."""
+    return await get_weight_trend(current_user.id, days, db)
+
+
+@router.get(
+    "/forecast",
+    response_model=GoalForecast,
+    dependencies=[Depends(conditional_get)],
+)
+async def goal_forecast(
+    current_user: CachedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Projected date of reaching the goal weight, from the trend of recent weigh-ins."""
+    return await get_goal_forecast(current_user, db)
+
+
 @router.put("/{record_id}", response_model=WeightRecordOut)
 async def update_weight(
     record_id: uuid.UUID,
     data: WeightRecordUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     return await update_weight_record(current_user.id, record_id, data, db)
@@ -48,7 +120,7 @@ async def update_weight(
 @router.delete("/{record_id}", status_code=204)
 async def delete_weight(
     record_id: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: CachedUser = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     await delete_weight_record(current_user.id, record_id, db)
@@ -2,13 +2,17 @@ import uuid
 from datetime import datetime, date
 from pydantic import BaseModel
 
+from app.schemas.weight import GoalForecast
+
 
 class AssetSnapshotOut(BaseModel):
     id: uuid.UUID
     asset_value: float
     delta: float
+    event_count: int
     trigger_type: str
     snapshot_date: date
+    seq: int
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -21,6 +25,8 @@ class AssetCurrentOut(BaseModel):
     change_24h_pct: float
     all_time_high: float
     all_time_low: float
+    all_time_high_date: date | None = None
+    all_time_low_date: date | None = None
 
 
 class AssetHistoryPoint(BaseModel):
@@ -28,6 +34,18 @@ class AssetHistoryPoint(BaseModel):
     value: float
     delta: float
     trigger_type: str
+    event_count: int = 1
+
+
+class AssetCandleOut(BaseModel):
+    period_start: date
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+    model_config = {"from_attributes": True}
 
 
 class DashboardOut(BaseModel):
@@ -37,7 +55,14 @@ class DashboardOut(BaseModel):
     weight_current: float | None
     weight_goal: float | None
     weight_history: list[dict]
+    goal_forecast: GoalForecast
     today_calories: int
     calorie_target: int
     calorie_pct: float
     streak_days: int
+
+
+class ActivityDayOut(BaseModel):
+    date: date
+    weight_count: int
+    food_count: int
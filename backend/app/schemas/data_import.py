@@ -0,0 +1,19 @@
+from datetime import date
+from typing import Literal
+from pydantic import BaseModel
+
+
+ImportFormatLiteral = Literal["csv", "jsonl"]
+
+
+class ImportResult(BaseModel):
+    weight_records: int = 0
+    food_records: int = 0
+    food_items: int = 0
+    first_date: date | None = None
+    last_date: date | None = None
+
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
@@ -60,3 +60,48 @@ class DailyFoodSummary(BaseModel):
     date: date
     total_calories: int
     records: list[FoodRecordOut]
+
+
+class FoodRecordRange(BaseModel):
+    # Days with records on this page, oldest first
+    days: list[DailyFoodSummary]
+    # Pass as ?cursor= for the next page; None on the last page
+    next_cursor: str | None
+
+
+NutritionPeriodLiteral = Literal["week", "month"]
+
+
+class NutritionDayOut(BaseModel):
+    nutrition_date: date
+    total_calories: int
+    meal_count: int
+    item_count: int
+
+    model_config = {"from_attributes": True}
+
+
+class NutritionStats(BaseModel):
+    period: NutritionPeriodLiteral
+    start: date
+    end: date
+    calorie_target: int
+    days_logged: int
+    # Logged days whose total earned the calorie target bonus
+    days_in_target: int
+    total_calories: int
+    # Per logged day
+    average_calories: float
+    meal_count: int
+    item_count: int
+    days: list[NutritionDayOut]
+
+
+class FoodSuggestion(BaseModel):
+    name: str
+    # Average calories of one logged portion
+    typical_calories: int
+    calories_per_100g: float | None = None
+    pixel_icon_type: str
+    # "history" for the user's own frequent items, "catalog" for the shared catalog
+    source: Literal["history", "catalog"]
@@ -0,0 +1,86 @@
+import uuid
+from typing import Annotated, Literal, Union
+from pydantic import BaseModel, Field, model_validator
+
+from app.schemas.food import FoodItemCreate, FoodRecordCreate
+from app.schemas.weight import WeightRecordCreate, WeightRecordUpdate
+
+
+MAX_SYNC_OPS = 200
+
+
+class _SyncOp(BaseModel):
+    key: str = Field(min_length=1, max_length=100, description="Client-generated idempotency key")
+
+
+class _TargetedSyncOp(_SyncOp):
+    """An op on an existing row, named by its id or by the key of the op that created it."""
+
+    target_id: uuid.UUID | None = None
+    target_key: str | None = Field(None, min_length=1, max_length=100)
+
+    @model_validator(mode="after")
+    def _one_target(self):
+        if (self.target_id is None) == (self.target_key is None):
+            raise ValueError("exactly one of target_id and target_key is required")
+        return self
+
+
+class WeightCreateOp(_SyncOp):
+    op: Literal["weight.create"]
+    data: WeightRecordCreate
+
+
+class WeightUpdateOp(_TargetedSyncOp):
+    op: Literal["weight.update"]
+    data: WeightRecordUpdate
+
+
+class WeightDeleteOp(_TargetedSyncOp):
+    op: Literal["weight.delete"]
+
+
+class FoodCreateOp(_SyncOp):
+    op: Literal["food.create"]
+    data: FoodRecordCreate
+
+
+class FoodItemAddOp(_TargetedSyncOp):
+    """Add an item to a food record."""
+
+    op: Literal["food.add_item"]
+    data: FoodItemCreate
+
+
+class FoodItemDeleteOp(_TargetedSyncOp):
+    op: Literal["food.delete_item"]
+
+
+SyncOp = Annotated[
+    Union[
+        WeightCreateOp,
+        WeightUpdateOp,
+        WeightDeleteOp,
+        FoodCreateOp,
+        FoodItemAddOp,
+        FoodItemDeleteOp,
+    ],
+    Field(discriminator="op"),
+]
+
+
+class SyncRequest(BaseModel):
+    ops: list[SyncOp] = Field(min_length=1, max_length=MAX_SYNC_OPS)
+
+
+class SyncOpResult(BaseModel):
+    key: str
+    status: int
+    id: uuid.UUID | None = None
+    error: str | None = None
+    # True when the key had already been applied and the stored outcome is returned
+    replayed: bool = False
+
+
+class SyncResponse(BaseModel):
+    results: list[SyncOpResult]
@@ -36,6 +36,20 @@ class UserOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CachedUser(BaseModel):
+    """The user columns requests read, as kept by app.core.user_cache."""
+    id: uuid.UUID
+    email: str
+    username: str
+    region: str | None
+    goal_weight: float | None
+    daily_calorie_target: int
+    data_version: int
+    created_at: datetime
+
+    model_config = {"from_attributes": True, "frozen": True}
+
+
 class TokenResponse(BaseModel):
     access_token: str
     refresh_token: str
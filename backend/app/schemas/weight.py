@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, date
 from pydantic import BaseModel, Field
+from typing import Literal
 
 
 class WeightRecordCreate(BaseModel):
@@ -24,6 +25,57 @@ class WeightRecordOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class WeightRecordPage(BaseModel):
+    # Records on this page, oldest first
+    records: list[WeightRecordOut]
+    # Pass as ?cursor= for the next page; None on the last page
+    next_cursor: str | None
+
+
 class WeightTrendPoint(BaseModel):
     date: date
     weight_kg: float
+
+
+class WeightTrendDayOut(BaseModel):
+    trend_date: date
+    # The day's last reading
+    weight_kg: float
+    ewma_kg: float
+    mean_7d_kg: float
+    mean_30d_kg: float
+
+    model_config = {"from_attributes": True}
+
+
+class WeightTrend(BaseModel):
+    # Latest day with a reading, even when it is older than the requested range
+    current: WeightTrendDayOut | None
+    days: list[WeightTrendDayOut]
+
+
+class WeightFit(BaseModel):
+    fitted_on: date | None = None
+    point_count: int = 0
+    slope_kg_per_day: float | None = None
+    intercept_kg: float | None = None
+    slope_stderr: float | None = None
+
+    model_config = {"from_attributes": True}
+
+
+GoalForecastStatusLiteral = Literal["no_goal", "insufficient_data", "reached", "on_track", "off_track"]
+
+
+class GoalForecast(BaseModel):
+    status: GoalForecastStatusLiteral
+    goal_weight: float | None
+    # Weight on the last weigh-in day according to the fitted line
+    trend_weight_kg: float | None = None
+    weekly_change_kg: float | None = None
+    eta: date | None = None
+    # ~95% band of the ETA; eta_latest is None when the slow end never reaches the goal
+    eta_earliest: date | None = None
+    eta_latest: date | None = None
+    fitted_on: date | None = None
+    point_count: int = 0
@@ -0,0 +1,130 @@
+"""
+Activity Service – per-user index of active days.
+
+``user_activity_days`` holds one row per (user, day) with the number of
+weight and food records logged on that day. Record writes keep the counts
+in sync inside the same transaction, so "did the user log anything on D?"
+is a single index lookup instead of a probe into two record tables. When
+the last record of a day is removed the row is deleted, so the presence of
+a row always means the day had activity.
+"""
+
+import uuid
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import Insert, insert
+from fastapi import HTTPException
+
+from app.models.user_activity_day import UserActivityDay
+
+
+MAX_CALENDAR_DAYS = 366
+
+
+def activity_upsert(
+    user_id: uuid.UUID,
+    activity_date: date,
+    weight: int = 0,
+    food: int = 0,
+) -> Insert:
+    """Upsert adding ``weight`` / ``food`` records to the day's counts, for composing."""
+    stmt = insert(UserActivityDay).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        activity_date=activity_date,
+        weight_count=weight,
+        food_count=food,
+    )
+    return stmt.on_conflict_do_update(
+        index_elements=[UserActivityDay.user_id, UserActivityDay.activity_date],
+        set_={
+            "weight_count": UserActivityDay.weight_count + stmt.excluded.weight_count,
+            "food_count": UserActivityDay.food_count + stmt.excluded.food_count,
+        },
+    )
+
+
+async def add_activity(
+    user_id: uuid.UUID,
+    activity_date: date,
+    db: AsyncSession,
+    weight: int = 0,
+    food: int = 0,
+) -> None:
+    """Add ``weight`` / ``food`` records to the day's counts."""
+    await db.execute(activity_upsert(user_id, activity_date, weight, food))
+
+
+async def add_activity_counts(
+    user_id: uuid.UUID,
+    counts: dict[date, tuple[int, int]],
+    db: AsyncSession,
+) -> None:
+    """Add (weight, food) record counts for many days in one executemany."""
+    if not counts:
+        return
+    stmt = insert(UserActivityDay)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserActivityDay.user_id, UserActivityDay.activity_date],
+            set_={
+                "weight_count": UserActivityDay.weight_count + stmt.excluded.weight_count,
+                "food_count": UserActivityDay.food_count + stmt.excluded.food_count,
+            },
+        ),
+        [
+            dict(user_id=user_id, activity_date=day, weight_count=weight, food_count=food)
+            for day, (weight, food) in counts.items()
+        ],
+    )
+
+
+async def remove_activity(
+    user_id: uuid.UUID,
+    activity_date: date,
+    db: AsyncSession,
+    weight: int = 0,
+    food: int = 0,
+) -> None:
+    """Subtract records from the day's counts, clearing the day once it is empty."""
+    day_filter = (
+        UserActivityDay.user_id == user_id,
+        UserActivityDay.activity_date == activity_date,
+    )
+    await db.execute(
+        update(UserActivityDay)
+        .where(*day_filter)
+        .values(
+            weight_count=UserActivityDay.weight_count - weight,
+            food_count=UserActivityDay.food_count - food,
+        )
+    )
+    await db.execute(
+        delete(UserActivityDay).where(
+            *day_filter,
+            UserActivityDay.weight_count <= 0,
+            UserActivityDay.food_count <= 0,
+        )
+    )
+
+
+async def get_activity_days(
+    user_id: uuid.UUID,
+    start: date,
+    end: date,
+    db: AsyncSession,
+) -> list[UserActivityDay]:
+    """Active days in ``[start, end]``, oldest first."""
+    if end < start or (end - start).days > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    result = await db.execute(
+        select(UserActivityDay)
+        .where(
+            UserActivityDay.user_id == user_id,
+            UserActivityDay.activity_date >= start,
+            UserActivityDay.activity_date <= end,
+        )
+        .order_by(UserActivityDay.activity_date.asc())
+    )
+    return list(result.scalars().all())
@@ -4,10 +4,27 @@ Asset Engine – Core gamification logic.
 Every time a user logs weight or food, this engine re-calculates their
 virtual asset value and writes a new AssetSnapshot to the database.
 
+Ledger head:
+  Each user has one AssetState row holding the current value, the value
+  before it, the all-time high/low with the dates they were first reached,
+  and a monotonic sequence number. Every snapshot write takes the next
+  sequence number and updates the head in the same transaction, so
+  /asset/current is a primary-key lookup and snapshot order is
+  (user_id, seq). Live snapshots are also folded into the daily/weekly OHLC
+  candles kept by candle_service.
+
+Snapshot modes (settings.ASSET_SNAPSHOT_MODE):
+  "event"  – one snapshot per trigger.
+  "daily"  – one row per (user, day, trigger type), updated in place with the
+             latest value, the accumulated delta and an event count.
+
 Algorithm (MVP):
   Weight trigger:
     Each 0.1 kg decrease  → asset +0.5%
     Each 0.1 kg increase  → asset −0.3%  (floor: ASSET_FLOOR)
+    The change is measured from the last weigh-in before the record's day,
+    on the raw readings or, with settings.ASSET_WEIGHT_SIGNAL = "trend", on
+    the smoothed weight kept by trend_service.
 
   Food trigger:
     Each food record logged → asset +0.1%
@@ -16,16 +33,36 @@ Algorithm (MVP):
   Streak bonus (applied once per day, with food trigger):
     3+ consecutive days → +1%
     7+ consecutive days → +3%
+
+Push events:
+  Live triggers stage "snapshot", "calories" and "streak" events for the
+  dashboard stream and rederive_from() stages a "resync" (see core.events);
+  they are published after the write lock's transaction commits.
+
+Replay:
+  replay_history() applies the same rules to a user's records in one pass
+  without touching the database, for backfills, audits and rule changes.
+  rederive_from() uses it to rewrite the ledger from a given day forward
+  when a past weight or food record is edited or deleted, or a new one is
+  dated before the ledger's last snapshot (see last_snapshot_date_query()).
 """
 
+import heapq
 import uuid
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from datetime import date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import Select, select, delete, insert, update, func, and_, or_
 
+from app.core import events
 from app.models.asset_snapshot import AssetSnapshot, TriggerType
+from app.models.asset_state import AssetState
 from app.models.weight_record import WeightRecord
 from app.models.food_record import FoodRecord
+from app.models.user import User
+from app.models.user_activity_day import UserActivityDay
+from app.services import streak_service, candle_service, trend_service
 from app.config import settings
 
 
@@ -37,16 +74,169 @@ CALORIE_RANGE_BONUS = 0.002  # +0.2% if in calorie target range
 STREAK_3_BONUS = 0.01      # +1%
 STREAK_7_BONUS = 0.03      # +3%
 
+# Days of records loaded per step when re-deriving the ledger
+REPLAY_CHUNK_DAYS = 90
+
+
+async def get_state(user_id: uuid.UUID, db: AsyncSession) -> AssetState | None:
+    result = await db.execute(select(AssetState).where(AssetState.user_id == user_id))
+    return result.scalar_one_or_none()
+
+
+def _new_state(user_id: uuid.UUID, db: AsyncSession) -> AssetState:
+    state = AssetState(
+        user_id=user_id,
+        current_value=settings.INITIAL_ASSET_VALUE,
+        previous_value=None,
+        seq=0,
+        all_time_high=settings.INITIAL_ASSET_VALUE,
+        all_time_low=settings.INITIAL_ASSET_VALUE,
+    )
+    db.add(state)
+    return state
+
+
+async def _load_state(user_id: uuid.UUID, db: AsyncSession) -> AssetState:
+    """Fetch the ledger head for writing, creating it on first use."""
+    state = await get_state(user_id, db)
+    return state if state is not None else _new_state(user_id, db)
+
 
-async def _get_current_asset(user_id: uuid.UUID, db: AsyncSession) -> float:
+async def load_state_with(
+    user_id: uuid.UUID, statement: Select, db: AsyncSession
+) -> tuple[AssetState, tuple]:
+    """
+    The ledger head for writing and the one row of ``statement``, read in a
+    single round trip; ``statement`` typically carries the caller's writes
+    as CTEs.
+    """
+    row = statement.subquery()
     result = await db.execute(
-        select(AssetSnapshot.asset_value)
-        .where(AssetSnapshot.user_id == user_id)
-        .order_by(AssetSnapshot.created_at.desc())
+        select(row, AssetState)
+        .select_from(row)
+        .outerjoin(AssetState, AssetState.user_id == user_id)
+    )
+    *values, state = result.one()
+    return (state if state is not None else _new_state(user_id, db)), tuple(values)
+
+
+def last_snapshot_date_query(user_id: uuid.UUID) -> Select:
+    """
+    Date of the user's latest snapshot. A new record dated before it changes
+    days the ledger already scored, so it is re-derived rather than triggered.
+    """
+    return select(func.max(AssetSnapshot.snapshot_date)).where(AssetSnapshot.user_id == user_id)
+
+
+def _advance_head(state: AssetState, asset_value: float, snapshot_date: date) -> None:
+    state.seq += 1
+    if state.seq > 1:
+        state.previous_value = state.current_value
+    state.current_value = asset_value
+    if asset_value > state.all_time_high or state.all_time_high_date is None:
+        state.all_time_high = max(state.all_time_high, asset_value)
+        state.all_time_high_date = snapshot_date
+    if asset_value < state.all_time_low or state.all_time_low_date is None:
+        state.all_time_low = min(state.all_time_low, asset_value)
+        state.all_time_low_date = snapshot_date
+
+
+def _append_snapshot(
+    state: AssetState,
+    asset_value: float,
+    delta: float,
+    trigger_type: str,
+    snapshot_date: date,
+    db: AsyncSession,
+    event_count: int = 1,
+) -> AssetSnapshot:
+    """Add a snapshot at the next ledger position and move the head onto it."""
+    _advance_head(state, asset_value, snapshot_date)
+    snapshot = AssetSnapshot(
+        user_id=state.user_id,
+        asset_value=asset_value,
+        delta=delta,
+        event_count=event_count,
+        trigger_type=trigger_type,
+        snapshot_date=snapshot_date,
+        seq=state.seq,
+    )
+    db.add(snapshot)
+    return snapshot
+
+
+async def _record_snapshot(
+    state: AssetState,
+    asset_value: float,
+    delta: float,
+    trigger_type: str,
+    snapshot_date: date,
+    db: AsyncSession,
+) -> None:
+    """
+    Write a live trigger's snapshot and fold it into the day/week candles,
+    in one statement; the head's update goes out with the next flush.
+
+    In "daily" snapshot mode the day's row for this trigger type is updated
+    in place instead: it takes the new value, accumulates the delta and the
+    event count, and moves to the head of the ledger.
+    """
+    candles = candle_service.candle_upsert(
+        state.user_id, snapshot_date, asset_value, state.current_value if state.seq else None
+    )
+    events.stage(
+        db,
+        state.user_id,
+        "snapshot",
+        {
+            "date": snapshot_date,
+            "value": asset_value,
+            "delta": delta,
+            "trigger_type": trigger_type,
+            "seq": state.seq + 1,
+        },
+    )
+    if settings.ASSET_SNAPSHOT_MODE != "daily":
+        _advance_head(state, asset_value, snapshot_date)
+        await db.execute(
+            insert(AssetSnapshot)
+            .values(
+                id=uuid.uuid4(),
+                user_id=state.user_id,
+                asset_value=asset_value,
+                delta=delta,
+                event_count=1,
+                trigger_type=trigger_type,
+                snapshot_date=snapshot_date,
+                seq=state.seq,
+            )
+            .add_cte(candles.cte("candles"))
+        )
+        return
+
+    await db.execute(candles)
+    result = await db.execute(
+        select(AssetSnapshot)
+        .where(
+            and_(
+                AssetSnapshot.user_id == state.user_id,
+                AssetSnapshot.snapshot_date == snapshot_date,
+                AssetSnapshot.trigger_type == trigger_type,
+            )
+        )
+        .order_by(AssetSnapshot.seq.desc())
         .limit(1)
     )
-    value = result.scalar_one_or_none()
-    return value if value is not None else settings.INITIAL_ASSET_VALUE
+    snapshot = result.scalar_one_or_none()
+    if snapshot is None:
+        _append_snapshot(state, asset_value, delta, trigger_type, snapshot_date, db)
+        return
+
+    _advance_head(state, asset_value, snapshot_date)
+    snapshot.asset_value = asset_value
+    snapshot.delta = round(snapshot.delta + delta, 4)
+    snapshot.event_count += 1
+    snapshot.seq = state.seq
 
 
 async def _get_previous_weight(user_id: uuid.UUID, current_date: date, db: AsyncSession) -> float | None:
@@ -58,73 +248,26 @@ async def _get_previous_weight(user_id: uuid.UUID, current_date: date, db: Async
                 WeightRecord.recorded_date < current_date,
             )
         )
-        .order_by(WeightRecord.recorded_date.desc())
+        .order_by(WeightRecord.recorded_date.desc(), WeightRecord.created_at.desc())
         .limit(1)
     )
     return result.scalar_one_or_none()
 
 
-async def _get_streak(user_id: uuid.UUID, db: AsyncSession) -> int:
-    """Count consecutive days with any activity (weight or food record)."""
-    today = date.today()
-    streak = 0
-    check_date = today - timedelta(days=1)
-
-    for _ in range(365):
-        weight_res = await db.execute(
-            select(WeightRecord.id)
-            .where(
-                and_(
-                    WeightRecord.user_id == user_id,
-                    WeightRecord.recorded_date == check_date,
-                )
-            )
-            .limit(1)
-        )
-        food_res = await db.execute(
-            select(FoodRecord.id)
-            .where(
-                and_(
-                    FoodRecord.user_id == user_id,
-                    FoodRecord.recorded_date == check_date,
-                )
-            )
-            .limit(1)
-        )
-        if weight_res.scalar_one_or_none() is not None or food_res.scalar_one_or_none() is not None:
-            streak += 1
-            check_date -= timedelta(days=1)
-        else:
-            break
-
-    return streak
-
-
 def _apply_floor(value: float) -> float:
     return max(value, settings.ASSET_FLOOR)
 
 
-async def trigger_weight(
-    user_id: uuid.UUID,
+# ── Pure rule steps (shared by the live triggers and replay) ───────────────
+def _weight_step(
+    current_value: float,
+    prev_weight: float | None,
     new_weight: float,
-    recorded_date: date,
-    db: AsyncSession,
-) -> AssetSnapshot:
-    """Called after a weight record is saved. Adjusts asset based on weight delta."""
-    current_value = await _get_current_asset(user_id, db)
-    prev_weight = await _get_previous_weight(user_id, recorded_date, db)
-
+) -> tuple[float, float, str]:
+    """Return (asset_value, delta, trigger_type) for a weigh-in."""
     if prev_weight is None:
         # First weigh-in – no asset change, just record the baseline
-        snapshot = AssetSnapshot(
-            user_id=user_id,
-            asset_value=current_value,
-            delta=0.0,
-            trigger_type=TriggerType.weight_initial,
-            snapshot_date=recorded_date,
-        )
-        db.add(snapshot)
-        return snapshot
+        return current_value, 0.0, TriggerType.weight_initial
 
     weight_diff = prev_weight - new_weight  # positive → lost weight
     units = abs(weight_diff) / 0.1  # number of 0.1 kg units
@@ -141,16 +284,83 @@ async def trigger_weight(
 
     new_value = _apply_floor(current_value * (1 + delta_pct))
     delta = new_value - current_value
+    return round(new_value, 4), round(delta, 4), trigger
 
-    snapshot = AssetSnapshot(
-        user_id=user_id,
-        asset_value=round(new_value, 4),
-        delta=round(delta, 4),
+
+def _streak_value(current_value: float, streak: int) -> float | None:
+    """Asset value after the streak bonus, or None when the streak earns nothing."""
+    if streak >= 7:
+        return _apply_floor(current_value * (1 + STREAK_7_BONUS))
+    if streak >= 3:
+        return _apply_floor(current_value * (1 + STREAK_3_BONUS))
+    return None
+
+
+async def _stage_streak(user_id: uuid.UUID, recorded_date: date, db: AsyncSession) -> None:
+    """Push the current streak when a record may have changed it."""
+    # The streak counts days before today, so records dated today never move it
+    if recorded_date >= date.today():
+        return
+    streak = await streak_service.get_streak(user_id, db)
+    events.stage(db, user_id, "streak", {"days": streak})
+
+
+def in_calorie_range(total_calories: int, daily_calorie_target: int) -> bool:
+    """Whether a day's calories earn the calorie target bonus (80%–110% of target)."""
+    return daily_calorie_target * 0.8 <= total_calories <= daily_calorie_target * 1.1
+
+
+def _food_value(current_value: float, total_calories: int, daily_calorie_target: int) -> float:
+    """Asset value after the food log bonus and the calorie target bonus."""
+    in_range = in_calorie_range(total_calories, daily_calorie_target)
+    return _apply_floor(
+        current_value * (1 + FOOD_LOG_BONUS + (CALORIE_RANGE_BONUS if in_range else 0))
+    )
+
+
+async def initialize_user(user_id: uuid.UUID, recorded_date: date, db: AsyncSession) -> None:
+    """Called on registration. Opens the ledger with the initial asset value."""
+    state = await _load_state(user_id, db)
+    await _record_snapshot(
+        state,
+        asset_value=state.current_value,
+        delta=0.0,
+        trigger_type=TriggerType.initial,
+        snapshot_date=recorded_date,
+        db=db,
+    )
+
+
+async def trigger_weight(
+    user_id: uuid.UUID,
+    new_weight: float,
+    recorded_date: date,
+    db: AsyncSession,
+    trend: tuple[float | None, float | None] | None = None,
+) -> None:
+    """
+    Called after a weight record is saved. Adjusts asset based on weight delta.
+
+    ``trend`` is the smoothed weight before and on the record's day, as
+    returned by trend_service.rederive_trend(); it is scored instead of the
+    readings when settings.ASSET_WEIGHT_SIGNAL is "trend".
+    """
+    state = await _load_state(user_id, db)
+    if settings.ASSET_WEIGHT_SIGNAL == "trend" and trend is not None:
+        prev_weight, new_weight = trend
+    else:
+        prev_weight = await _get_previous_weight(user_id, recorded_date, db)
+
+    asset_value, delta, trigger = _weight_step(state.current_value, prev_weight, new_weight)
+    await _stage_streak(user_id, recorded_date, db)
+    await _record_snapshot(
+        state,
+        asset_value=asset_value,
+        delta=delta,
         trigger_type=trigger,
         snapshot_date=recorded_date,
+        db=db,
     )
-    db.add(snapshot)
-    return snapshot
 
 
 async def trigger_food(
@@ -158,67 +368,392 @@ async def trigger_food(
     recorded_date: date,
     total_calories: int,
     daily_calorie_target: int,
+    first_meal: bool,
     db: AsyncSession,
-) -> AssetSnapshot:
-    """Called after a food record is saved. Applies food log + streak bonuses."""
-    current_value = await _get_current_asset(user_id, db)
+    state: AssetState | None = None,
+) -> None:
+    """
+    Called after a food record is saved. Applies food log + streak bonuses.
+
+    ``total_calories`` is the day's total including the new record and
+    ``first_meal`` whether it is the day's first one (both from
+    daily_nutrition), so no record or snapshot lookups are needed here.
+    ``state`` is the ledger head when the caller already loaded it with
+    load_state_with().
+    """
+    if state is None:
+        state = await _load_state(user_id, db)
+    current_value = state.current_value
+
+    # Streak bonus (only applied once – on the first food record of the day),
+    # measured as of the record's day like the replay, so a back-dated meal
+    # earns what re-deriving the ledger would give it
+    if first_meal:
+        streak = await streak_service.get_streak(user_id, db, as_of=recorded_date)
+        streak_value = _streak_value(current_value, streak)
+        if streak_value is not None:
+            # Write separate streak snapshot for transparency
+            await _record_snapshot(
+                state,
+                asset_value=round(streak_value, 4),
+                delta=round(streak_value - current_value, 4),
+                trigger_type=TriggerType.streak_bonus,
+                snapshot_date=recorded_date,
+                db=db,
+            )
+            current_value = streak_value
+    await _stage_streak(user_id, recorded_date, db)
+    events.stage(
+        db, user_id, "calories", {"date": recorded_date, "total_calories": total_calories}
+    )
 
-    # Base food log bonus
-    delta_pct = FOOD_LOG_BONUS
+    new_value = _food_value(current_value, total_calories, daily_calorie_target)
+    await _record_snapshot(
+        state,
+        asset_value=round(new_value, 4),
+        delta=round(new_value - current_value, 4),
+        trigger_type=TriggerType.food_logged,
+        snapshot_date=recorded_date,
+        db=db,
+    )
+
+
+# ── History replay ─────────────────────────────────────────────────────────
+@dataclass
+class ReplayState:
+    """Running state carried through a replay, so long histories can be replayed in chunks."""
+
+    asset_value: float = field(default_factory=lambda: settings.INITIAL_ASSET_VALUE)
+    day: date | None = None
+    weight_before: float | None = None  # last weigh-in on a day before `day`
+    weight_on_day: float | None = None  # last weigh-in on `day`
+    trend_before: float | None = None  # smoothed weight as of `trend_date`, a day before `day`
+    trend_date: date | None = None
+    trend_on_day: float | None = None  # smoothed weight after the last weigh-in on `day`
+    day_calories: int = 0
+    streak_paid: bool = False
+
+
+@dataclass
+class ReplayedSnapshot:
+    asset_value: float
+    delta: float
+    trigger_type: str
+    snapshot_date: date
+    event_count: int = 1
+
+
+def _fold_daily(snapshots: list[ReplayedSnapshot]) -> list[ReplayedSnapshot]:
+    """Fold a replayed series into one row per (day, trigger type), as "daily" mode stores it."""
+    folded: dict[tuple[date, str], ReplayedSnapshot] = {}
+    for snapshot in snapshots:
+        key = (snapshot.snapshot_date, snapshot.trigger_type)
+        row = folded.pop(key, None)
+        if row is not None:
+            snapshot = ReplayedSnapshot(
+                snapshot.asset_value,
+                round(row.delta + snapshot.delta, 4),
+                snapshot.trigger_type,
+                snapshot.snapshot_date,
+                row.event_count + 1,
+            )
+        # Re-inserting keeps rows ordered by their latest event, like the live upsert
+        folded[key] = snapshot
+    return list(folded.values())
+
+
+def _activity_runs(activity_days: Iterable[date]) -> dict[date, int]:
+    """Length of the consecutive-day run ending at each active day, in one pass."""
+    runs: dict[date, int] = {}
+    prev: date | None = None
+    for day in sorted(set(activity_days)):
+        runs[day] = runs[prev] + 1 if prev is not None and (day - prev).days == 1 else 1
+        prev = day
+    return runs
 
-    # Calorie target bonus (80%–110% of daily target)
-    lower = daily_calorie_target * 0.8
-    upper = daily_calorie_target * 1.1
-    if lower <= total_calories <= upper:
-        delta_pct += CALORIE_RANGE_BONUS
 
-    # Streak bonus (only applied once – on the first food record of the day)
-    existing_today = await db.execute(
-        select(AssetSnapshot.id)
+def replay_history(
+    weights: Iterable[WeightRecord],
+    foods: Iterable[FoodRecord],
+    activity_days: Iterable[date],
+    daily_calorie_target: int,
+    state: ReplayState | None = None,
+) -> list[ReplayedSnapshot]:
+    """
+    Rebuild the snapshot series for a set of weight and food records without
+    touching the database.
+
+    ``weights`` and ``foods`` must each be ordered by (recorded_date,
+    created_at); they are merged into a single event stream in that order.
+    ``activity_days`` must cover every active day from 365 days before the
+    first event onward, so streaks can be measured. The rules are the ones
+    the live triggers apply, with streaks measured as of each record's date.
+
+    ``state`` is updated in place, so a replay can be resumed with the next
+    chunk of records. The ledger's ``initial`` snapshot is not produced.
+    """
+    state = state or ReplayState()
+    runs = _activity_runs(activity_days)
+    events = heapq.merge(
+        ((r.recorded_date, r.created_at, 0, r) for r in weights),
+        ((r.recorded_date, r.created_at, 1, r) for r in foods),
+        key=lambda e: e[:3],
+    )
+    snapshots: list[ReplayedSnapshot] = []
+
+    for day, _, kind, record in events:
+        if day != state.day:
+            if state.weight_on_day is not None:
+                state.weight_before = state.weight_on_day
+                state.trend_before, state.trend_date = state.trend_on_day, state.day
+            state.day = day
+            state.weight_on_day = None
+            state.trend_on_day = None
+            state.day_calories = 0
+            state.streak_paid = False
+
+        if kind == 0:
+            state.trend_on_day = trend_service.ewma_step(
+                state.trend_before, state.trend_date, record.weight_kg, day
+            )
+            if settings.ASSET_WEIGHT_SIGNAL == "trend":
+                before, after = state.trend_before, state.trend_on_day
+            else:
+                before, after = state.weight_before, record.weight_kg
+            asset_value, delta, trigger = _weight_step(state.asset_value, before, after)
+            snapshots.append(ReplayedSnapshot(asset_value, delta, trigger, day))
+            state.asset_value = asset_value
+            state.weight_on_day = record.weight_kg
+            continue
+
+        current_value = state.asset_value
+        state.day_calories += record.total_calories
+        if not state.streak_paid:
+            streak = min(runs.get(day - timedelta(days=1), 0), streak_service.MAX_STREAK_DAYS)
+            streak_value = _streak_value(current_value, streak)
+            if streak_value is not None:
+                snapshots.append(ReplayedSnapshot(
+                    round(streak_value, 4),
+                    round(streak_value - current_value, 4),
+                    TriggerType.streak_bonus,
+                    day,
+                ))
+                current_value = streak_value
+                state.streak_paid = True
+
+        new_value = _food_value(current_value, state.day_calories, daily_calorie_target)
+        snapshots.append(ReplayedSnapshot(
+            round(new_value, 4),
+            round(new_value - current_value, 4),
+            TriggerType.food_logged,
+            day,
+        ))
+        state.asset_value = round(new_value, 4)
+
+    return snapshots
+
+
+async def replay_user_history(user_id: uuid.UUID, db: AsyncSession) -> list[ReplayedSnapshot]:
+    """Replay a user's full record history, e.g. for backfills and ledger audits."""
+    user_result = await db.execute(
+        select(User.daily_calorie_target).where(User.id == user_id)
+    )
+    daily_calorie_target = user_result.scalar_one()
+
+    weight_result = await db.execute(
+        select(WeightRecord)
+        .where(WeightRecord.user_id == user_id)
+        .order_by(WeightRecord.recorded_date.asc(), WeightRecord.created_at.asc())
+    )
+    food_result = await db.execute(
+        select(FoodRecord)
+        .where(FoodRecord.user_id == user_id)
+        .order_by(FoodRecord.recorded_date.asc(), FoodRecord.created_at.asc())
+    )
+    activity_result = await db.execute(
+        select(UserActivityDay.activity_date).where(UserActivityDay.user_id == user_id)
+    )
+    return replay_history(
+        weight_result.scalars().all(),
+        food_result.scalars().all(),
+        activity_result.scalars().all(),
+        daily_calorie_target,
+    )
+
+
+async def _prefix_extreme(
+    user_id: uuid.UUID,
+    from_date: date,
+    extreme,
+    db: AsyncSession,
+) -> tuple[float | None, date | None]:
+    """Extreme value of the ledger before ``from_date`` and the first date it was reached."""
+    in_prefix = and_(
+        AssetSnapshot.user_id == user_id,
+        or_(
+            AssetSnapshot.snapshot_date < from_date,
+            AssetSnapshot.trigger_type == TriggerType.initial,
+        ),
+    )
+    # Both steps walk the (user_id, asset_value, snapshot_date, seq) index
+    value = select(extreme(AssetSnapshot.asset_value)).where(in_prefix).scalar_subquery()
+    result = await db.execute(
+        select(AssetSnapshot.asset_value, AssetSnapshot.snapshot_date)
+        .where(in_prefix, AssetSnapshot.asset_value == value)
+        .order_by(AssetSnapshot.snapshot_date.asc(), AssetSnapshot.seq.asc())
+        .limit(1)
+    )
+    row = result.first()
+    return (row.asset_value, row.snapshot_date) if row else (None, None)
+
+
+async def open_ledger_at(user_id: uuid.UUID, day: date, db: AsyncSession) -> None:
+    """Move the ledger's ``initial`` snapshot back to ``day`` when history predates it."""
+    await db.execute(
+        update(AssetSnapshot)
         .where(
             and_(
                 AssetSnapshot.user_id == user_id,
-                AssetSnapshot.snapshot_date == recorded_date,
-                AssetSnapshot.trigger_type == TriggerType.streak_bonus,
+                AssetSnapshot.trigger_type == TriggerType.initial,
+                AssetSnapshot.snapshot_date > day,
             )
         )
-        .limit(1)
+        .values(snapshot_date=day)
     )
-    if existing_today.scalar_one_or_none() is None:
-        streak = await _get_streak(user_id, db)
-        if streak >= 7:
-            delta_pct += STREAK_7_BONUS
-            # Write separate streak snapshot for transparency
-            streak_value = _apply_floor(current_value * (1 + STREAK_7_BONUS))
-            db.add(AssetSnapshot(
-                user_id=user_id,
-                asset_value=round(streak_value, 4),
-                delta=round(streak_value - current_value, 4),
-                trigger_type=TriggerType.streak_bonus,
-                snapshot_date=recorded_date,
-            ))
-            current_value = streak_value
-        elif streak >= 3:
-            delta_pct += STREAK_3_BONUS
-            streak_value = _apply_floor(current_value * (1 + STREAK_3_BONUS))
-            db.add(AssetSnapshot(
-                user_id=user_id,
-                asset_value=round(streak_value, 4),
-                delta=round(streak_value - current_value, 4),
-                trigger_type=TriggerType.streak_bonus,
-                snapshot_date=recorded_date,
-            ))
-            current_value = streak_value
 
-    new_value = _apply_floor(current_value * (1 + FOOD_LOG_BONUS + (CALORIE_RANGE_BONUS if lower <= total_calories <= upper else 0)))
-    delta = new_value - current_value
 
-    snapshot = AssetSnapshot(
-        user_id=user_id,
-        asset_value=round(new_value, 4),
-        delta=round(delta, 4),
-        trigger_type=TriggerType.food_logged,
-        snapshot_date=recorded_date,
+async def rederive_from(user_id: uuid.UUID, from_date: date, db: AsyncSession) -> None:
+    """
+    Re-derive the ledger from ``from_date`` forward after a past record changed.
+
+    Only the snapshots and records dated on or after ``from_date`` are loaded,
+    REPLAY_CHUNK_DAYS at a time; the replay is seeded from the last snapshot
+    before that day, and the rewritten suffix is appended to the ledger with
+    fresh sequence numbers. The caller flushes its record changes first and
+    commits afterwards, so the whole rewrite lands in one transaction.
+    """
+    state = await _load_state(user_id, db)
+
+    prefix_result = await db.execute(
+        select(AssetSnapshot.asset_value)
+        .where(
+            and_(
+                AssetSnapshot.user_id == user_id,
+                AssetSnapshot.snapshot_date < from_date,
+            )
+        )
+        .order_by(AssetSnapshot.snapshot_date.desc(), AssetSnapshot.seq.desc())
+        .limit(2)
     )
-    db.add(snapshot)
-    return snapshot
+    prefix_values = list(prefix_result.scalars().all())
+    start_value = prefix_values[0] if prefix_values else settings.INITIAL_ASSET_VALUE
+
+    user_result = await db.execute(
+        select(User.daily_calorie_target).where(User.id == user_id)
+    )
+    daily_calorie_target = user_result.scalar_one()
+
+    last_result = await db.execute(
+        select(
+            func.greatest(
+                select(func.max(WeightRecord.recorded_date))
+                .where(WeightRecord.user_id == user_id)
+                .scalar_subquery(),
+                select(func.max(FoodRecord.recorded_date))
+                .where(FoodRecord.user_id == user_id)
+                .scalar_subquery(),
+            )
+        )
+    )
+    last_record_date = last_result.scalar_one()
+
+    replay_state = ReplayState(
+        asset_value=start_value,
+        weight_before=await _get_previous_weight(user_id, from_date, db),
+    )
+    if settings.ASSET_WEIGHT_SIGNAL == "trend":
+        trend = await trend_service.get_trend_before(user_id, from_date, db)
+        if trend is not None:
+            replay_state.trend_before, replay_state.trend_date = trend.ewma_kg, trend.trend_date
+
+    # ATH/ATL of the untouched prefix, then the rewritten suffix is folded in
+    ath, ath_date = await _prefix_extreme(user_id, from_date, func.max, db)
+    atl, atl_date = await _prefix_extreme(user_id, from_date, func.min, db)
+
+    await db.execute(
+        delete(AssetSnapshot).where(
+            and_(
+                AssetSnapshot.user_id == user_id,
+                AssetSnapshot.snapshot_date >= from_date,
+                AssetSnapshot.trigger_type != TriggerType.initial,
+            )
+        )
+    )
+
+    state.current_value = start_value
+    state.previous_value = prefix_values[1] if len(prefix_values) > 1 else None
+    state.all_time_high = ath if ath is not None else start_value
+    state.all_time_low = atl if atl is not None else start_value
+    state.all_time_high_date = ath_date
+    state.all_time_low_date = atl_date
+
+    chunk_start = from_date
+    while last_record_date is not None and chunk_start <= last_record_date:
+        chunk_end = chunk_start + timedelta(days=REPLAY_CHUNK_DAYS)
+        weight_result = await db.execute(
+            select(WeightRecord)
+            .where(
+                and_(
+                    WeightRecord.user_id == user_id,
+                    WeightRecord.recorded_date >= chunk_start,
+                    WeightRecord.recorded_date < chunk_end,
+                )
+            )
+            .order_by(WeightRecord.recorded_date.asc(), WeightRecord.created_at.asc())
+        )
+        food_result = await db.execute(
+            select(FoodRecord)
+            .where(
+                and_(
+                    FoodRecord.user_id == user_id,
+                    FoodRecord.recorded_date >= chunk_start,
+                    FoodRecord.recorded_date < chunk_end,
+                )
+            )
+            .order_by(FoodRecord.recorded_date.asc(), FoodRecord.created_at.asc())
+        )
+        activity_result = await db.execute(
+            select(UserActivityDay.activity_date).where(
+                and_(
+                    UserActivityDay.user_id == user_id,
+                    UserActivityDay.activity_date
+                    >= chunk_start - timedelta(days=streak_service.MAX_STREAK_DAYS + 1),
+                    UserActivityDay.activity_date < chunk_end,
+                )
+            )
+        )
+        replayed = replay_history(
+            weight_result.scalars().all(),
+            food_result.scalars().all(),
+            activity_result.scalars().all(),
+            daily_calorie_target,
+            state=replay_state,
+        )
+        if settings.ASSET_SNAPSHOT_MODE == "daily":
+            replayed = _fold_daily(replayed)
+        for snapshot in replayed:
+            _append_snapshot(
+                state,
+                asset_value=snapshot.asset_value,
+                delta=snapshot.delta,
+                trigger_type=snapshot.trigger_type,
+                snapshot_date=snapshot.snapshot_date,
+                db=db,
+                event_count=snapshot.event_count,
+            )
+        # Flushed snapshots and the chunk's records are only weakly held by the session
+        await db.flush()
+        chunk_start = chunk_end
+
+    await candle_service.rebuild_candles(user_id, from_date, db)
+    events.stage(db, user_id, "resync", {"from": from_date})
@@ -0,0 +1,105 @@
+import uuid
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from pydantic import TypeAdapter
+
+from app.core import cache
+from app.models.asset_snapshot import AssetSnapshot
+from app.schemas.user import CachedUser
+from app.schemas.asset import AssetCurrentOut, AssetHistoryPoint, AssetCandleOut
+from app.services import asset_engine, candle_service
+from app.config import settings
+
+
+_CURRENT = TypeAdapter(AssetCurrentOut)
+_POINTS = TypeAdapter(list[AssetHistoryPoint])
+_CANDLES = TypeAdapter(list[AssetCandleOut])
+
+
+async def get_current_asset(user: CachedUser, db: AsyncSession) -> AssetCurrentOut:
+    return await cache.cached(
+        user.id,
+        "asset:current",
+        _CURRENT,
+        lambda: _load_current_asset(user.id, db),
+        user.data_version,
+    )
+
+
+async def _load_current_asset(user_id: uuid.UUID, db: AsyncSession) -> AssetCurrentOut:
+    state = await asset_engine.get_state(user_id, db)
+    if state is None:
+        return AssetCurrentOut(
+            current_value=settings.INITIAL_ASSET_VALUE,
+            previous_value=None,
+            change_24h=0.0,
+            change_24h_pct=0.0,
+            all_time_high=settings.INITIAL_ASSET_VALUE,
+            all_time_low=settings.INITIAL_ASSET_VALUE,
+        )
+
+    current_value = state.current_value
+    previous_value = state.previous_value
+
+    change_24h = current_value - (previous_value or current_value)
+    change_24h_pct = (change_24h / previous_value) * 100 if previous_value else 0.0
+
+    return AssetCurrentOut(
+        current_value=current_value,
+        previous_value=previous_value,
+        change_24h=round(change_24h, 4),
+        change_24h_pct=round(change_24h_pct, 2),
+        all_time_high=state.all_time_high,
+        all_time_low=state.all_time_low,
+        all_time_high_date=state.all_time_high_date,
+        all_time_low_date=state.all_time_low_date,
+    )
+
+
+async def get_asset_history(
+    user: CachedUser,
+    days: int,
+    db: AsyncSession,
+    granularity: str = "raw",
+) -> list[AssetHistoryPoint] | list[AssetCandleOut]:
+    today = date.today()
+    return await cache.cached(
+        user.id,
+        f"asset:history:{granularity}:{days}:{today}",
+        _POINTS if granularity == "raw" else _CANDLES,
+        lambda: _load_asset_history(user.id, today - timedelta(days=days), granularity, db),
+        user.data_version,
+    )
+
+
+async def _load_asset_history(
+    user_id: uuid.UUID,
+    cutoff: date,
+    granularity: str,
+    db: AsyncSession,
+) -> list[AssetHistoryPoint] | list[AssetCandleOut]:
+    if granularity != "raw":
+        candles = await candle_service.get_candles(user_id, granularity, cutoff, db)
+        return [AssetCandleOut.model_validate(c) for c in candles]
+
+    result = await db.execute(
+        select(AssetSnapshot)
+        .where(
+            and_(
+                AssetSnapshot.user_id == user_id,
+                AssetSnapshot.snapshot_date >= cutoff,
+            )
+        )
+        .order_by(AssetSnapshot.snapshot_date.asc(), AssetSnapshot.seq.asc())
+    )
+    return [
+        AssetHistoryPoint(
+            date=s.snapshot_date,
+            value=s.asset_value,
+            delta=s.delta,
+            trigger_type=s.trigger_type,
+            event_count=s.event_count,
+        )
+        for s in result.scalars().all()
+    ]
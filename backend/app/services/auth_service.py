@@ -4,10 +4,9 @@ from sqlalchemy import select
 from fastapi import HTTPException, status
 
 from app.models.user import User
-from app.models.asset_snapshot import AssetSnapshot
 from app.schemas.user import UserRegister
 from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token
-from app.config import settings
+from app.services import asset_engine
 from datetime import date
 
 
@@ -31,14 +30,7 @@ async def register_user(data: UserRegister, db: AsyncSession) -> User:
     await db.flush()
 
     # Create the initial asset snapshot
-    initial_snapshot = AssetSnapshot(
-        user_id=user.id,
-        asset_value=settings.INITIAL_ASSET_VALUE,
-        delta=0.0,
-        trigger_type="initial",
-        snapshot_date=date.today(),
-    )
-    db.add(initial_snapshot)
+    await asset_engine.initialize_user(user.id, date.today(), db)
     await db.commit()
     await db.refresh(user)
     return user
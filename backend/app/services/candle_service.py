@@ -0,0 +1,183 @@
+"""
+Candle Service – daily and weekly OHLC rollups of the asset ledger.
+
+Each candle covers one day or one ISO week (Monday start) of snapshot
+dates. ``open`` is the ledger value just before the period's first event,
+``close`` the value after its last one, and ``volume`` the number of asset
+events in the period.
+
+The live triggers fold every new snapshot into its day and week candles
+with a single upsert. When the ledger is re-derived from a past day,
+the affected candles are rebuilt from the snapshots instead.
+"""
+
+import uuid
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func, and_, or_, tuple_
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from app.models.asset_candle import AssetCandle, CandleGranularity
+from app.models.asset_snapshot import AssetSnapshot
+
+REBUILD_PAGE_ROWS = 2000
+
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == CandleGranularity.week:
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def candle_upsert(
+    user_id: uuid.UUID,
+    snapshot_date: date,
+    asset_value: float,
+    previous_value: float | None,
+    events: int = 1,
+) -> Insert:
+    """Upsert folding one ledger event into the day and week candles of its date, for composing."""
+    open_value = previous_value if previous_value is not None else asset_value
+    stmt = insert(AssetCandle).values([
+        dict(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            granularity=granularity.value,
+            period_start=period_start(snapshot_date, granularity),
+            open=open_value,
+            high=max(open_value, asset_value),
+            low=min(open_value, asset_value),
+            close=asset_value,
+            volume=events,
+        )
+        for granularity in CandleGranularity
+    ])
+    return stmt.on_conflict_do_update(
+        constraint="uq_asset_candles_user_period",
+        set_={
+            "high": func.greatest(AssetCandle.high, stmt.excluded.close),
+            "low": func.least(AssetCandle.low, stmt.excluded.close),
+            "close": stmt.excluded.close,
+            "volume": AssetCandle.volume + stmt.excluded.volume,
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def rebuild_candles(user_id: uuid.UUID, from_date: date, db: AsyncSession) -> None:
+    """Rebuild every candle touching ``from_date`` or later from the flushed snapshots."""
+    week_start = period_start(from_date, CandleGranularity.week)
+
+    await db.execute(
+        delete(AssetCandle).where(
+            and_(
+                AssetCandle.user_id == user_id,
+                or_(
+                    and_(
+                        AssetCandle.granularity == CandleGranularity.day,
+                        AssetCandle.period_start >= from_date,
+                    ),
+                    and_(
+                        AssetCandle.granularity == CandleGranularity.week,
+                        AssetCandle.period_start >= week_start,
+                    ),
+                ),
+            )
+        )
+    )
+
+    prev_result = await db.execute(
+        select(AssetSnapshot.asset_value)
+        .where(
+            and_(
+                AssetSnapshot.user_id == user_id,
+                AssetSnapshot.snapshot_date < week_start,
+            )
+        )
+        .order_by(AssetSnapshot.snapshot_date.desc(), AssetSnapshot.seq.desc())
+        .limit(1)
+    )
+    previous_value = prev_result.scalar_one_or_none()
+
+    # Snapshots are read a page at a time in ledger order; a candle is
+    # written once its period is over, so only the current day and week
+    # candles are held in memory however long the rebuilt range is
+    open_candles: dict[str, dict] = {}
+    after: tuple[date, int] | None = None
+    while True:
+        query = select(
+            AssetSnapshot.snapshot_date,
+            AssetSnapshot.asset_value,
+            AssetSnapshot.event_count,
+            AssetSnapshot.seq,
+        ).where(
+            and_(
+                AssetSnapshot.user_id == user_id,
+                AssetSnapshot.snapshot_date >= week_start,
+            )
+        )
+        if after is not None:
+            query = query.where(tuple_(AssetSnapshot.snapshot_date, AssetSnapshot.seq) > after)
+        result = await db.execute(
+            query.order_by(AssetSnapshot.snapshot_date.asc(), AssetSnapshot.seq.asc())
+            .limit(REBUILD_PAGE_ROWS)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        finished: list[dict] = []
+        for snapshot_date, asset_value, event_count, _ in rows:
+            open_value = previous_value if previous_value is not None else asset_value
+            for granularity in CandleGranularity:
+                start = period_start(snapshot_date, granularity)
+                if granularity == CandleGranularity.day and start < from_date:
+                    continue
+                candle = open_candles.get(granularity.value)
+                if candle is None or candle["period_start"] != start:
+                    if candle is not None:
+                        finished.append(candle)
+                    open_candles[granularity.value] = dict(
+                        id=uuid.uuid4(),
+                        user_id=user_id,
+                        granularity=granularity.value,
+                        period_start=start,
+                        open=open_value,
+                        high=max(open_value, asset_value),
+                        low=min(open_value, asset_value),
+                        close=asset_value,
+                        volume=event_count,
+                    )
+                else:
+                    candle["high"] = max(candle["high"], asset_value)
+                    candle["low"] = min(candle["low"], asset_value)
+                    candle["close"] = asset_value
+                    candle["volume"] += event_count
+            previous_value = asset_value
+
+        if finished:
+            await db.execute(insert(AssetCandle), finished)
+        after = (rows[-1].snapshot_date, rows[-1].seq)
+
+    if open_candles:
+        await db.execute(insert(AssetCandle), list(open_candles.values()))
+
+
+async def get_candles(
+    user_id: uuid.UUID,
+    granularity: str,
+    since: date,
+    db: AsyncSession,
+) -> list[AssetCandle]:
+    result = await db.execute(
+        select(AssetCandle)
+        .where(
+            and_(
+                AssetCandle.user_id == user_id,
+                AssetCandle.granularity == granularity,
+                AssetCandle.period_start >= period_start(since, granularity),
+            )
+        )
+        .order_by(AssetCandle.period_start.asc())
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,518 @@
+"""
+Catalog Service – shared food catalog and autocomplete.
+
+Every logged food item teaches the catalog: its calories, weight and pixel
+icon are added to running sums on the food_catalog row of its name
+(case-folded and single-spaced), from which the typical portion and the
+calories per 100 g follow. Writers only tally items in memory; each worker
+merges its tally into the table every CATALOG_REFRESH_SECONDS with one
+upsert in name order, so popular names are never locked for the length of
+a user's transaction.
+
+/food/suggest is served from a prefix index that every worker loads in the
+background after startup and then refreshes with the rows changed since its
+last pass. The index is a sorted list of keys (each name, and the name from
+each of its next words on) searched with bisect. Prefixes matching many
+keys keep a top list by log count, which stays exact as counts grow. The
+user's own most frequent items come first; when the index has too few
+matches (say, for a typo, or because it is still loading) a trigram search
+on food_catalog fills in the rest.
+"""
+
+import asyncio
+import bisect
+import gc
+import heapq
+import logging
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
+from typing import NamedTuple
+import uuid
+
+from pydantic import TypeAdapter
+from sqlalchemy import case, select, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core import cache
+from app.database import AsyncSessionLocal
+from app.models.food_catalog import FoodCatalogEntry
+from app.models.food_item import FoodItem
+from app.models.food_record import FoodRecord
+from app.schemas.user import CachedUser
+from app.schemas.food import FoodSuggestion
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 20
+# Keys per name: the full name plus the name from each of its next words on
+MAX_WORD_KEYS = 3
+# Prefixes matching more keys than this keep a top list instead of being scanned
+SCAN_LIMIT = 256
+# Rows per fetch while loading; each batch is indexed without yielding to the event loop
+LOAD_BATCH_ROWS = 1_000
+# Changed rows are re-read with this overlap, for merges still committing
+REFRESH_OVERLAP = timedelta(seconds=30)
+MIN_FUZZY_LENGTH = 3
+# The user's frequent items come from this many recent days
+FAVORITE_DAYS = 180
+FAVORITES_SIZE = 50
+
+_KEY_SEPARATOR = "\x00"
+_SUM_FIELDS = ("log_count", "calorie_sum", "measured_calories", "measured_grams")
+
+_FAVORITES = TypeAdapter(list[FoodSuggestion])
+
+
+def normalize(name: str) -> str:
+    """Catalog key of a food name; matches the SQL used to seed the catalog."""
+    return " ".join(name.lower().split())
+
+
+def _keys_for(normalized: str) -> list[str]:
+    """Index keys of a name; word keys carry the name after a separator."""
+    words = normalized.split(" ")
+    return [normalized] + [
+        " ".join(words[i:]) + _KEY_SEPARATOR + normalized
+        for i in range(1, min(len(words), MAX_WORD_KEYS))
+    ]
+
+
+def _matches(normalized: str, query: str) -> bool:
+    return any(key.startswith(query) for key in _keys_for(normalized))
+
+
+class _Entry(NamedTuple):
+    normalized_name: str
+    name: str
+    pixel_icon_type: str
+    log_count: int
+    calorie_sum: int
+    measured_calories: int
+    measured_grams: float
+
+    @classmethod
+    def from_row(cls, row) -> "_Entry":
+        return cls(
+            row.normalized_name,
+            row.name,
+            row.pixel_icon_type,
+            row.log_count,
+            row.calorie_sum,
+            row.measured_calories,
+            row.measured_grams,
+        )
+
+    def suggestion(self) -> FoodSuggestion:
+        return FoodSuggestion(
+            name=self.name,
+            typical_calories=round(self.calorie_sum / self.log_count) if self.log_count else 0,
+            calories_per_100g=(
+                round(self.measured_calories * 100 / self.measured_grams, 1)
+                if self.measured_grams
+                else None
+            ),
+            pixel_icon_type=self.pixel_icon_type,
+            source="catalog",
+        )
+
+
+_LOG_COUNT = _Entry._fields.index("log_count")
+
+
+class CatalogTally:
+    """Per-name sums of observed food items, waiting to be merged into food_catalog."""
+
+    def __init__(self) -> None:
+        self._rows: dict[str, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, name: str, calories: int, amount_g: float | None, pixel_icon_type: str) -> None:
+        normalized = normalize(name)
+        if not normalized:
+            return
+        row = self._rows.get(normalized)
+        if row is None:
+            row = self._rows[normalized] = dict(
+                normalized_name=normalized,
+                name=" ".join(name.split()),
+                pixel_icon_type="other",
+                log_count=0,
+                calorie_sum=0,
+                measured_calories=0,
+                measured_grams=0.0,
+            )
+        row["log_count"] += 1
+        row["calorie_sum"] += calories
+        if amount_g:
+            row["measured_calories"] += calories
+            row["measured_grams"] += amount_g
+        if pixel_icon_type != "other":
+            row["pixel_icon_type"] = pixel_icon_type
+
+    def add_items(self, items: Iterable) -> None:
+        """Tally food item schemas (anything with name, calories, amount_g, pixel_icon_type)."""
+        for item in items:
+            self.add(item.name, item.calories, item.amount_g, item.pixel_icon_type)
+
+    def update(self, other: "CatalogTally") -> None:
+        for normalized, row in other._rows.items():
+            mine = self._rows.get(normalized)
+            if mine is None:
+                self._rows[normalized] = dict(row)
+                continue
+            for name in _SUM_FIELDS:
+                mine[name] += row[name]
+            if row["pixel_icon_type"] != "other":
+                mine["pixel_icon_type"] = row["pixel_icon_type"]
+
+    def rows(self) -> list[dict]:
+        """Rows in name order, so concurrent merges lock catalog rows in the same order."""
+        return [dict(id=uuid.uuid4(), **self._rows[name]) for name in sorted(self._rows)]
+
+
+def _merge_statement():
+    stmt = insert(FoodCatalogEntry)
+    return stmt.on_conflict_do_update(
+        index_elements=[FoodCatalogEntry.normalized_name],
+        set_={
+            **{name: getattr(FoodCatalogEntry, name) + stmt.excluded[name] for name in _SUM_FIELDS},
+            "pixel_icon_type": case(
+                (stmt.excluded.pixel_icon_type != "other", stmt.excluded.pixel_icon_type),
+                else_=FoodCatalogEntry.pixel_icon_type,
+            ),
+            "updated_at": func.now(),
+        },
+    )
+
+
+class FoodIndex:
+    """Per-worker prefix index over the catalog, plus the tally waiting to be merged."""
+
+    def __init__(self) -> None:
+        # Entries as plain tuples, which the garbage collector stops tracking
+        # (unlike _Entry instances), so full collections don't walk them all
+        self._entries: dict[str, tuple] = {}
+        self._keys: list[str] = []
+        # Top names by log count for prefixes matching more than SCAN_LIMIT keys
+        self._top: dict[str, list[str]] = {}
+        self._top_length = 0
+        self._watermark: datetime | None = None
+        self._pending = CatalogTally()
+        self._task: asyncio.Task | None = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def observe(self, tally: CatalogTally) -> None:
+        self._pending.update(tally)
+
+    # ── Search ────────────────────────────────────────────────────────────
+    def _count(self, normalized: str) -> int:
+        return self._entries[normalized][_LOG_COUNT]
+
+    def _names(self, lo: int, hi: int) -> set[str]:
+        return {key.rpartition(_KEY_SEPARATOR)[2] for key in self._keys[lo:hi]}
+
+    def _best(self, names: Iterable[str]) -> list[str]:
+        # nlargest is stable, so ties stay in name order
+        return heapq.nlargest(MAX_SUGGESTIONS, sorted(names), key=self._count)
+
+    def _keep(self, prefix: str, top: list[str]) -> None:
+        self._top[prefix] = top
+        self._top_length = max(self._top_length, len(prefix))
+
+    def _top_names(self, prefix: str) -> list[str]:
+        top = self._top.get(prefix)
+        if top is not None:
+            return top
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo)
+        top = self._best(self._names(lo, hi))
+        if hi - lo > SCAN_LIMIT:
+            self._keep(prefix, top)
+        return top
+
+    def search(self, query: str, limit: int) -> list[_Entry]:
+        """Most logged names with a key starting with ``query`` (already normalized).
+
+        Finds nothing until the first load completes.
+        """
+        if not query or not self.ready:
+            return []
+        return [_Entry._make(self._entries[name]) for name in self._top_names(query)[:limit]]
+
+    # ── Maintenance ───────────────────────────────────────────────────────
+    def _promote(self, normalized: str) -> None:
+        """Fold a new or grown entry into the kept top lists of its prefixes."""
+        count = self._count(normalized)
+        for key in _keys_for(normalized):
+            base = key.partition(_KEY_SEPARATOR)[0]
+            for length in range(1, min(len(base), self._top_length) + 1):
+                top = self._top.get(base[:length])
+                if top is None:
+                    continue
+                if normalized not in top:
+                    if len(top) >= MAX_SUGGESTIONS and count <= self._count(top[-1]):
+                        continue
+                    top.append(normalized)
+                top.sort(key=self._count, reverse=True)
+                del top[MAX_SUGGESTIONS:]
+
+    def _apply(
+        self, rows, newest: datetime | None, new_keys: list[str], changed: list[str]
+    ) -> datetime | None:
+        """Store changed rows; returns the latest updated_at seen."""
+        for row in rows:
+            if newest is None or row.updated_at > newest:
+                newest = row.updated_at
+            entry = self._entries.get(row.normalized_name)
+            if entry is None:
+                new_keys.extend(_keys_for(row.normalized_name))
+            elif entry[_LOG_COUNT] == row.log_count:
+                # Re-read through the refresh overlap
+                continue
+            self._entries[row.normalized_name] = tuple(_Entry.from_row(row))
+            changed.append(row.normalized_name)
+        return newest
+
+    async def _insert(self, new_keys: list[str], changed: list[str]) -> None:
+        if len(new_keys) > SCAN_LIMIT:
+            # Merged into a new list one first character at a time, yielding
+            # in between; searches use the old list until it is complete
+            by_first: dict[str, list[str]] = defaultdict(list)
+            for lo in range(0, len(new_keys), LOAD_BATCH_ROWS):
+                for key in new_keys[lo : lo + LOAD_BATCH_ROWS]:
+                    by_first[key[0]].append(key)
+                await asyncio.sleep(0)
+            keys: list[str] = []
+            lo = 0
+            for first in sorted(by_first):
+                start = bisect.bisect_left(self._keys, first, lo)
+                end = bisect.bisect_left(self._keys, first + "\U0010ffff", start)
+                run = self._keys[start:end] + by_first[first]
+                run.sort()
+                keys += self._keys[lo:start]
+                keys += run
+                lo = end
+                await asyncio.sleep(0)
+            keys += self._keys[lo:]
+            self._keys = keys
+        else:
+            for key in new_keys:
+                bisect.insort(self._keys, key)
+        if self._top:
+            for normalized in changed:
+                self._promote(normalized)
+
+    async def _warm(self, prefix: str = "", lo: int = 0, hi: int | None = None) -> list[str]:
+        """Keep the top list of every crowded prefix; returns the top names under ``prefix``.
+
+        A name ranks at least as high among a longer prefix's names as among
+        the prefix's own, so each list is built from the lists one character
+        longer and only the few-key prefixes scan their keys. Yields to the
+        event loop between lists, as this runs while the worker serves requests.
+        """
+        if hi is None:
+            hi = len(self._keys)
+        if hi - lo <= SCAN_LIMIT:
+            return self._best(self._names(lo, hi))
+        names: set[str] = set()
+        while lo < hi:
+            key = self._keys[lo]
+            if len(key) == len(prefix):
+                # A full name equal to the prefix
+                names.add(key)
+                lo += 1
+                continue
+            longer = key[: len(prefix) + 1]
+            end = bisect.bisect_left(self._keys, longer + "\U0010ffff", lo, hi)
+            names.update(await self._warm(longer, lo, end))
+            lo = end
+        top = self._best(names)
+        if prefix:
+            self._keep(prefix, top)
+            await asyncio.sleep(0)
+        return top
+
+    async def refresh(self) -> None:
+        """Load catalog rows changed since the last pass (all of them the first time)."""
+        query = select(
+            FoodCatalogEntry.normalized_name,
+            FoodCatalogEntry.name,
+            FoodCatalogEntry.pixel_icon_type,
+            FoodCatalogEntry.log_count,
+            FoodCatalogEntry.calorie_sum,
+            FoodCatalogEntry.measured_calories,
+            FoodCatalogEntry.measured_grams,
+            FoodCatalogEntry.updated_at,
+        )
+        if self._watermark is not None:
+            query = query.where(FoodCatalogEntry.updated_at > self._watermark - REFRESH_OVERLAP)
+        newest = self._watermark
+        new_keys: list[str] = []
+        changed: list[str] = []
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.stream(query.execution_options(yield_per=LOAD_BATCH_ROWS))
+                async for rows in result.partitions():
+                    newest = self._apply(rows, newest, new_keys, changed)
+        finally:
+            # Index what was stored even if the read failed; the watermark
+            # stays, so the next pass reads the rest
+            await self._insert(new_keys, changed)
+        self._watermark = newest
+        if not self.ready:
+            await self._warm()
+            self.ready = True
+            # Leave the loaded index out of later full collections, which
+            # would otherwise walk its millions of keys every time
+            gc.freeze()
+
+    async def flush(self) -> None:
+        """Merge the worker's tally into food_catalog."""
+        if not self._pending:
+            return
+        tally, self._pending = self._pending, CatalogTally()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(_merge_statement(), tally.rows())
+                await db.commit()
+        except BaseException:
+            # Keep the observations for the next pass
+            tally.update(self._pending)
+            self._pending = tally
+            raise
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.flush()
+                await self.refresh()
+            except (SQLAlchemyError, OSError) as exc:
+                logger.warning("Food catalog refresh failed: %s", exc)
+            await asyncio.sleep(settings.CATALOG_REFRESH_SECONDS)
+
+    def start(self) -> None:
+        """Load the index in the background, then keep it current.
+
+        The worker serves requests meanwhile; until the load completes (or
+        while it keeps failing) suggestions come from the trigram search.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except (SQLAlchemyError, OSError) as exc:
+            logger.warning(
+                "Food catalog flush failed, %d names dropped: %s", len(self._pending), exc
+            )
+
+
+index = FoodIndex()
+
+
+def observe(items: Iterable) -> None:
+    """Tally committed food items for the catalog."""
+    tally = CatalogTally()
+    tally.add_items(items)
+    index.observe(tally)
+
+
+async def _load_favorites(
+    user_id: uuid.UUID, today: date, db: AsyncSession
+) -> list[FoodSuggestion]:
+    normalized = func.lower(func.regexp_replace(func.btrim(FoodItem.name), r"\s+", " ", "g"))
+    result = await db.execute(
+        select(
+            func.min(FoodItem.name).label("name"),
+            func.avg(FoodItem.calories).label("typical_calories"),
+            func.coalesce(
+                func.sum(FoodItem.calories).filter(FoodItem.amount_g.is_not(None)), 0
+            ).label("measured_calories"),
+            func.sum(FoodItem.amount_g).label("measured_grams"),
+            func.mode().within_group(FoodItem.pixel_icon_type).label("pixel_icon_type"),
+        )
+        .join(FoodRecord, FoodItem.food_record_id == FoodRecord.id)
+        .where(
+            FoodRecord.user_id == user_id,
+            FoodRecord.recorded_date >= today - timedelta(days=FAVORITE_DAYS),
+        )
+        .group_by(normalized)
+        .order_by(func.count().desc(), normalized)
+        .limit(FAVORITES_SIZE)
+    )
+    return [
+        FoodSuggestion(
+            name=" ".join(row.name.split()),
+            typical_calories=round(row.typical_calories),
+            calories_per_100g=(
+                round(row.measured_calories * 100 / row.measured_grams, 1)
+                if row.measured_grams
+                else None
+            ),
+            pixel_icon_type=row.pixel_icon_type,
+            source="history",
+        )
+        for row in result
+    ]
+
+
+async def _fuzzy(query: str, limit: int, db: AsyncSession) -> list[_Entry]:
+    """Trigram and prefix matches from food_catalog, closest first."""
+    name = FoodCatalogEntry.normalized_name
+    result = await db.execute(
+        select(FoodCatalogEntry)
+        .where(or_(name.startswith(query, autoescape=True), name.op("%")(query)))
+        .order_by(func.similarity(name, query).desc(), FoodCatalogEntry.log_count.desc())
+        .limit(limit)
+    )
+    return [_Entry.from_row(row) for row in result.scalars()]
+
+
+async def suggest(
+    user: CachedUser,
+    query: str,
+    limit: int,
+    db: AsyncSession,
+) -> list[FoodSuggestion]:
+    """The user's frequent items matching ``query``, then the catalog's most logged ones."""
+    query = normalize(query)
+    today = date.today()
+    favorites = await cache.cached(
+        user.id,
+        f"food:favorites:{today}",
+        _FAVORITES,
+        lambda: _load_favorites(user.id, today, db),
+        user.data_version,
+    )
+    suggestions = [item for item in favorites if _matches(normalize(item.name), query)][:limit]
+    if not query:
+        return suggestions
+
+    seen = {normalize(item.name) for item in suggestions}
+    entries = index.search(query, limit + len(seen))
+    if len(entries) < limit + len(seen) and len(query) >= MIN_FUZZY_LENGTH:
+        entries += await _fuzzy(query, limit + len(seen), db)
+    for entry in entries:
+        if len(suggestions) >= limit:
+            break
+        if entry.normalized_name not in seen:
+            seen.add(entry.normalized_name)
+            suggestions.append(entry.suggestion())
+    return suggestions
@@ -0,0 +1,155 @@
+"""
+Dashboard Service – the cold-open payload in a single round trip.
+
+Every part of the dashboard (ledger head, 30-day asset history, 30-day
+weight series, today's calories, the streak and the goal forecast's fit) is
+a scalar subquery of one SELECT. The two series and the fit are built as
+JSON in Postgres so their rows come back inside that one result row instead
+of as separate result sets.
+"""
+
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import JSON, ColumnElement, select, func, and_, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from pydantic import TypeAdapter
+
+from app.core import cache
+from app.models.asset_state import AssetState
+from app.models.asset_snapshot import AssetSnapshot
+from app.models.weight_forecast import WeightForecast
+from app.models.weight_record import WeightRecord
+from app.models.daily_nutrition import DailyNutrition
+from app.schemas.user import CachedUser
+from app.schemas.asset import DashboardOut
+from app.schemas.weight import WeightFit
+from app.services import forecast_service, streak_service
+from app.config import settings
+
+DASHBOARD_DAYS = 30
+
+_DASHBOARD = TypeAdapter(DashboardOut)
+
+
+def _json_points(*fields, order_by) -> ColumnElement:
+    """json_agg of json_build_object(*fields) in ``order_by`` order, '[]' when empty."""
+    return func.coalesce(
+        func.json_agg(aggregate_order_by(func.json_build_object(*fields), *order_by), type_=JSON),
+        literal_column("'[]'::json"),
+    )
+
+
+async def get_today_dashboard(
+    user: CachedUser,
+    db: AsyncSession,
+    today: date | None = None,
+) -> DashboardOut:
+    today = today or date.today()
+    return await cache.cached(
+        user.id,
+        f"dashboard:{today}",
+        _DASHBOARD,
+        lambda: _load_dashboard(user, today, db),
+        user.data_version,
+    )
+
+
+async def _load_dashboard(user: CachedUser, today: date, db: AsyncSession) -> DashboardOut:
+    cutoff = today - timedelta(days=DASHBOARD_DAYS)
+
+    current_value = select(AssetState.current_value).where(AssetState.user_id == user.id)
+    previous_value = select(AssetState.previous_value).where(AssetState.user_id == user.id)
+    asset_history = (
+        select(
+            _json_points(
+                "date", AssetSnapshot.snapshot_date,
+                "value", AssetSnapshot.asset_value,
+                "delta", AssetSnapshot.delta,
+                "trigger_type", AssetSnapshot.trigger_type,
+                "event_count", AssetSnapshot.event_count,
+                order_by=(AssetSnapshot.snapshot_date, AssetSnapshot.seq),
+            )
+        )
+        .where(
+            and_(
+                AssetSnapshot.user_id == user.id,
+                AssetSnapshot.snapshot_date >= cutoff,
+            )
+        )
+    )
+    weight_history = (
+        select(
+            _json_points(
+                "date", WeightRecord.recorded_date,
+                "weight_kg", WeightRecord.weight_kg,
+                order_by=(WeightRecord.recorded_date, WeightRecord.created_at),
+            )
+        )
+        .where(
+            and_(
+                WeightRecord.user_id == user.id,
+                WeightRecord.recorded_date >= cutoff,
+            )
+        )
+    )
+    today_calories = (
+        select(func.coalesce(func.sum(DailyNutrition.total_calories), 0))
+        .where(
+            and_(
+                DailyNutrition.user_id == user.id,
+                DailyNutrition.nutrition_date == today,
+            )
+        )
+    )
+
+    weight_fit = (
+        select(
+            func.json_build_object(
+                "fitted_on", WeightForecast.fitted_on,
+                "point_count", WeightForecast.point_count,
+                "slope_kg_per_day", WeightForecast.slope_kg_per_day,
+                "intercept_kg", WeightForecast.intercept_kg,
+                "slope_stderr", WeightForecast.slope_stderr,
+                type_=JSON,
+            )
+        )
+        .where(WeightForecast.user_id == user.id)
+    )
+
+    result = await db.execute(
+        select(
+            current_value.scalar_subquery(),
+            previous_value.scalar_subquery(),
+            asset_history.scalar_subquery(),
+            weight_history.scalar_subquery(),
+            today_calories.scalar_subquery(),
+            streak_service.streak_query(user.id, today).scalar_subquery(),
+            weight_fit.scalar_subquery(),
+        )
+    )
+    (
+        current_asset, previous_asset, asset_points, weight_points, calories, streak, fit,
+    ) = result.one()
+
+    current_asset = current_asset if current_asset is not None else settings.INITIAL_ASSET_VALUE
+    prev_asset = previous_asset or current_asset
+    asset_change_pct = ((current_asset - prev_asset) / prev_asset * 100) if prev_asset else 0.0
+
+    calorie_target = user.daily_calorie_target
+    calorie_pct = min((calories / calorie_target * 100) if calorie_target else 0, 200)
+
+    return DashboardOut(
+        asset_current=current_asset,
+        asset_change_pct=round(asset_change_pct, 2),
+        asset_history=asset_points,
+        weight_current=weight_points[-1]["weight_kg"] if weight_points else None,
+        weight_goal=user.goal_weight,
+        weight_history=weight_points,
+        goal_forecast=forecast_service.project(
+            user.goal_weight, WeightFit.model_validate(fit) if fit else None
+        ),
+        today_calories=calories,
+        calorie_target=calorie_target,
+        calorie_pct=round(calorie_pct, 1),
+        streak_days=streak,
+    )
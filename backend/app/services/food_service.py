@@ -1,76 +1,124 @@
 import uuid
-from datetime import date
+from datetime import date, datetime
+from itertools import groupby
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, insert, func, and_, tuple_
+from sqlalchemy.orm import selectinload
 from fastapi import HTTPException
 
+from app.core.locks import user_write_lock
+from app.core.pagination import encode_cursor, decode_cursor
+from app.models.daily_nutrition import DailyNutrition
 from app.models.food_record import FoodRecord
 from app.models.food_item import FoodItem
-from app.models.user import User
-from app.schemas.food import FoodRecordCreate, FoodItemAdd
-from app.services import asset_engine
+from app.schemas.user import CachedUser
+from app.schemas.food import (
+    FoodRecordCreate,
+    FoodRecordOut,
+    FoodItemAdd,
+    FoodItemOut,
+    DailyFoodSummary,
+    FoodRecordRange,
+)
+from app.services import asset_engine, activity_service, catalog_service, nutrition_service
+
+
+# Longest span one /food/records/range request may cover
+MAX_RANGE_DAYS = 366
 
 
 async def create_food_record(
-    user_id: uuid.UUID,
+    user: CachedUser,
     data: FoodRecordCreate,
     db: AsyncSession,
-) -> FoodRecord:
+) -> FoodRecordOut:
+    """
+    Log a meal with its items, in a fixed number of statements.
+
+    After the request's user lookup, a food log takes four:
+      1. the advisory lock and data version bump (user_write_lock);
+      2. one SELECT of the ledger head, whose CTEs insert the record and its
+         items and upsert the day's activity and nutrition rows, returning
+         the day's calories and meal count;
+      3. the snapshot insert, with the day and week candle upsert as a CTE;
+      4. the head update,
+    plus the streak query and the streak snapshot's insert and head update
+    on the first meal of a day, and the streak push for a past day. The
+    user row is the one the request already loaded, and the response is
+    built from the inputs without reloading anything.
+
+    A meal dated before the ledger's last snapshot re-derives the ledger
+    from its day instead, since later days' streak bonuses count it.
+    """
+    record_id = uuid.uuid4()
     total_calories = sum(item.calories for item in data.items)
+    item_rows = [
+        dict(id=uuid.uuid4(), food_record_id=record_id, **item.model_dump())
+        for item in data.items
+    ]
 
-    record = FoodRecord(
-        user_id=user_id,
-        meal_type=data.meal_type,
-        recorded_date=data.recorded_date,
-        total_calories=total_calories,
-        note=data.note,
+    writes = [
+        insert(FoodRecord)
+        .values(
+            id=record_id,
+            user_id=user.id,
+            meal_type=data.meal_type,
+            recorded_date=data.recorded_date,
+            total_calories=total_calories,
+            note=data.note,
+        )
+        .cte("new_record"),
+        activity_service.activity_upsert(user.id, data.recorded_date, food=1).cte("activity"),
+    ]
+    if item_rows:
+        # The foreign key is checked at the end of the statement, after the record exists
+        writes.append(insert(FoodItem).values(item_rows).cte("new_items"))
+    day = (
+        nutrition_service.nutrition_upsert(
+            user.id, data.recorded_date, calories=total_calories, meals=1, items=len(item_rows)
+        )
+        .returning(DailyNutrition.total_calories, DailyNutrition.meal_count)
+        .cte("day")
     )
-    db.add(record)
-    await db.flush()
+    # now() is the transaction's start time, which the new rows' created_at default to
+    meal = select(
+        day.c.total_calories,
+        day.c.meal_count,
+        func.now(),
+        asset_engine.last_snapshot_date_query(user.id).scalar_subquery(),
+    ).add_cte(*writes)
 
-    for item_data in data.items:
-        item = FoodItem(
-            food_record_id=record.id,
-            name=item_data.name,
-            calories=item_data.calories,
-            amount_g=item_data.amount_g,
-            image_url=item_data.image_url,
-            pixel_icon_type=item_data.pixel_icon_type,
+    async with user_write_lock(user.id, db):
+        state, (day_total, meal_count, created_at, last_date) = (
+            await asset_engine.load_state_with(user.id, meal, db)
         )
-        db.add(item)
 
-    await db.flush()
-
-    # Get user's calorie target for streak calculation
-    user_result = await db.execute(select(User).where(User.id == user_id))
-    user = user_result.scalar_one()
-
-    # Calculate total calories for the day including this record
-    day_total_result = await db.execute(
-        select(func.sum(FoodRecord.total_calories))
-        .where(
-            and_(
-                FoodRecord.user_id == user_id,
-                FoodRecord.recorded_date == data.recorded_date,
+        if last_date is not None and data.recorded_date < last_date:
+            await asset_engine.rederive_from(user.id, data.recorded_date, db)
+        else:
+            await asset_engine.trigger_food(
+                user_id=user.id,
+                recorded_date=data.recorded_date,
+                total_calories=day_total,
+                daily_calorie_target=user.daily_calorie_target,
+                first_meal=meal_count == 1,
+                db=db,
+                state=state,
             )
-        )
-    )
-    day_total = (day_total_result.scalar_one_or_none() or 0) + total_calories
 
-    await asset_engine.trigger_food(
-        user_id=user_id,
+        await db.commit()
+    catalog_service.observe(data.items)
+
+    return FoodRecordOut(
+        id=record_id,
+        meal_type=data.meal_type,
         recorded_date=data.recorded_date,
-        total_calories=day_total,
-        daily_calorie_target=user.daily_calorie_target,
-        db=db,
+        total_calories=total_calories,
+        note=data.note,
+        items=[FoodItemOut(created_at=created_at, **row) for row in item_rows],
+        created_at=created_at,
     )
 
-    await db.commit()
-    await db.refresh(record)
-    # Eager-load items
-    await db.refresh(record, ["items"])
-    return record
-
 
 async def get_daily_food_records(
     user_id: uuid.UUID,
@@ -86,11 +134,74 @@ async def get_daily_food_records(
             )
         )
         .order_by(FoodRecord.created_at.asc())
+        .options(selectinload(FoodRecord.items))
     )
-    records = list(result.scalars().all())
-    for r in records:
-        await db.refresh(r, ["items"])
-    return records
+    return list(result.scalars().all())
+
+
+async def get_food_records_range(
+    user_id: uuid.UUID,
+    date_from: date,
+    date_to: date,
+    cursor: str | None,
+    limit: int,
+    db: AsyncSession,
+) -> FoodRecordRange:
+    """
+    One page of the records in [date_from, date_to], grouped by day.
+
+    Pages follow (recorded_date, created_at, id); a day's total always covers
+    all of its records, including those on other pages.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"A range can span at most {MAX_RANGE_DAYS} days"
+        )
+
+    sort_key = tuple_(FoodRecord.recorded_date, FoodRecord.created_at, FoodRecord.id)
+    query = (
+        select(FoodRecord)
+        .where(
+            and_(
+                FoodRecord.user_id == user_id,
+                FoodRecord.recorded_date >= date_from,
+                FoodRecord.recorded_date <= date_to,
+            )
+        )
+        .order_by(FoodRecord.recorded_date, FoodRecord.created_at, FoodRecord.id)
+        .limit(limit + 1)
+        .options(selectinload(FoodRecord.items))
+    )
+    if cursor is not None:
+        after = decode_cursor(cursor, date.fromisoformat, datetime.fromisoformat, uuid.UUID)
+        query = query.where(sort_key > tuple_(*after))
+    records = list((await db.execute(query)).scalars().all())
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(last.recorded_date, last.created_at, last.id)
+    if not records:
+        return FoodRecordRange(days=[], next_cursor=None)
+
+    totals_result = await db.execute(
+        select(DailyNutrition.nutrition_date, DailyNutrition.total_calories).where(
+            and_(
+                DailyNutrition.user_id == user_id,
+                DailyNutrition.nutrition_date >= records[0].recorded_date,
+                DailyNutrition.nutrition_date <= records[-1].recorded_date,
+            )
+        )
+    )
+    totals = dict(totals_result.all())
+    days = [
+        DailyFoodSummary(date=day, total_calories=totals.get(day, 0), records=list(day_records))
+        for day, day_records in groupby(records, key=lambda r: r.recorded_date)
+    ]
+    return FoodRecordRange(days=days, next_cursor=next_cursor)
 
 
 async def add_food_item(
@@ -98,28 +209,35 @@ async def add_food_item(
     data: FoodItemAdd,
     db: AsyncSession,
 ) -> FoodItem:
-    record_result = await db.execute(
-        select(FoodRecord).where(
-            and_(FoodRecord.id == data.food_record_id, FoodRecord.user_id == user_id)
+    async with user_write_lock(user_id, db):
+        # Read under the lock, so a concurrent add or delete on the record has committed
+        record_result = await db.execute(
+            select(FoodRecord)
+            .where(and_(FoodRecord.id == data.food_record_id, FoodRecord.user_id == user_id))
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
-    )
-    record = record_result.scalar_one_or_none()
-    if not record:
-        raise HTTPException(status_code=404, detail="Food record not found")
-
-    item = FoodItem(
-        food_record_id=record.id,
-        name=data.name,
-        calories=data.calories,
-        amount_g=data.amount_g,
-        image_url=data.image_url,
-        pixel_icon_type=data.pixel_icon_type,
-    )
-    db.add(item)
+        record = record_result.scalar_one_or_none()
+        if not record:
+            raise HTTPException(status_code=404, detail="Food record not found")
 
-    record.total_calories += data.calories
-    await db.commit()
-    await db.refresh(item)
+        item = FoodItem(
+            food_record_id=record.id,
+            name=data.name,
+            calories=data.calories,
+            amount_g=data.amount_g,
+            image_url=data.image_url,
+            pixel_icon_type=data.pixel_icon_type,
+        )
+        db.add(item)
+        record.total_calories += data.calories
+        await db.flush()
+        await nutrition_service.add_nutrition(
+            user_id, record.recorded_date, db, calories=data.calories, items=1
+        )
+        await asset_engine.rederive_from(user_id, record.recorded_date, db)
+        await db.commit()
+    catalog_service.observe([data])
     return item
 
 
@@ -128,20 +246,31 @@ async def delete_food_item(
     item_id: uuid.UUID,
     db: AsyncSession,
 ) -> None:
-    item_result = await db.execute(select(FoodItem).where(FoodItem.id == item_id))
-    item = item_result.scalar_one_or_none()
-    if not item:
-        raise HTTPException(status_code=404, detail="Food item not found")
-
-    record_result = await db.execute(
-        select(FoodRecord).where(
-            and_(FoodRecord.id == item.food_record_id, FoodRecord.user_id == user_id)
+    async with user_write_lock(user_id, db):
+        result = await db.execute(
+            select(FoodItem, FoodRecord)
+            .join(FoodRecord, FoodItem.food_record_id == FoodRecord.id)
+            .where(FoodItem.id == item_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
         )
-    )
-    record = record_result.scalar_one_or_none()
-    if not record:
-        raise HTTPException(status_code=403, detail="Not authorized")
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Food item not found")
+        item, record = row
+        if record.user_id != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized")
 
-    record.total_calories = max(0, record.total_calories - item.calories)
-    await db.delete(item)
-    await db.commit()
+        previous_total = record.total_calories
+        record.total_calories = max(0, previous_total - item.calories)
+        await db.delete(item)
+        await db.flush()
+        await nutrition_service.add_nutrition(
+            user_id,
+            record.recorded_date,
+            db,
+            calories=record.total_calories - previous_total,
+            items=-1,
+        )
+        await asset_engine.rederive_from(user_id, record.recorded_date, db)
+        await db.commit()
@@ -0,0 +1,154 @@
+"""
+Forecast Service – when will the user reach their goal weight?
+
+A straight line is fitted by least squares to the daily readings of the
+last FIT_WINDOW_DAYS before the latest weigh-in, in Postgres with the regr_*
+aggregates. The fit is robust to one-off readings (a scale on a soft rug, a
+salty dinner): readings more than OUTLIER_SPREADS residual standard
+deviations off the first line are dropped and the line is fitted again.
+
+The fit depends on the readings only, so it is stored in weight_forecasts
+and refitted, in one statement, whenever trend_service rewrites the daily
+readings; that is, only when a weigh-in arrives, changes or goes away. The
+projection against the goal is plain arithmetic on the stored line, so
+showing the ETA costs nothing beyond reading one row.
+"""
+
+import math
+import uuid
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import literal, select, func, or_, true
+from sqlalchemy.dialects.postgresql import UUID, Insert, insert
+
+from app.models.weight_forecast import WeightForecast
+from app.models.weight_trend_day import WeightTrendDay
+from app.schemas.user import CachedUser
+from app.schemas.weight import GoalForecast, WeightFit
+
+
+FIT_WINDOW_DAYS = 60
+MIN_FIT_POINTS = 5
+OUTLIER_SPREADS = 2.5
+# Two-sided ~95% band on the slope
+BAND_Z = 1.96
+# Within this distance of the goal counts as reached
+GOAL_TOLERANCE_KG = 0.2
+# ETAs further out than this are reported as not on track
+MAX_FORECAST_DAYS = 3 * 365
+
+_FIT_COLUMNS = ("fitted_on", "point_count", "slope_kg_per_day", "intercept_kg", "slope_stderr")
+
+
+def _residual_variance(y, x):
+    """Residual variance of the least-squares line of y on x; NULL below three points."""
+    residual_sum = func.greatest(
+        func.regr_syy(y, x)
+        - func.power(func.regr_sxy(y, x), 2) / func.nullif(func.regr_sxx(y, x), 0),
+        0,
+    )
+    return residual_sum / func.nullif(func.regr_count(y, x) - 2, 0)
+
+
+def refit_upsert(user_id: uuid.UUID) -> Insert:
+    """Upsert of the user's fit from their current daily readings, for composing."""
+    last_day = (
+        select(func.max(WeightTrendDay.trend_date))
+        .where(WeightTrendDay.user_id == user_id)
+        .scalar_subquery()
+    )
+    readings = (
+        select(
+            (WeightTrendDay.trend_date - last_day).label("x"),
+            WeightTrendDay.weight_kg.label("y"),
+        )
+        .where(
+            WeightTrendDay.user_id == user_id,
+            WeightTrendDay.trend_date > last_day - FIT_WINDOW_DAYS,
+        )
+        .cte("readings")
+    )
+    x, y = readings.c.x, readings.c.y
+    first = select(
+        func.regr_slope(y, x).label("slope"),
+        func.regr_intercept(y, x).label("intercept"),
+        func.sqrt(_residual_variance(y, x)).label("spread"),
+    ).cte("first_fit")
+    fit = (
+        select(
+            literal(uuid.uuid4(), UUID(as_uuid=True)),
+            literal(user_id, UUID(as_uuid=True)),
+            last_day,
+            func.regr_count(y, x),
+            func.regr_slope(y, x),
+            func.regr_intercept(y, x),
+            func.sqrt(_residual_variance(y, x) / func.nullif(func.regr_sxx(y, x), 0)),
+        )
+        .select_from(readings.join(first, true()))
+        .where(
+            or_(
+                func.coalesce(first.c.spread, 0) == 0,
+                func.abs(y - (first.c.intercept + first.c.slope * x))
+                <= OUTLIER_SPREADS * first.c.spread,
+            )
+        )
+    )
+    stmt = insert(WeightForecast).from_select(["id", "user_id", *_FIT_COLUMNS], fit)
+    return stmt.on_conflict_do_update(
+        index_elements=[WeightForecast.user_id],
+        set_={
+            **{name: stmt.excluded[name] for name in _FIT_COLUMNS},
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def refit(user_id: uuid.UUID, db: AsyncSession) -> None:
+    await db.execute(refit_upsert(user_id))
+
+
+def project(goal_weight: float | None, fit: WeightFit | None) -> GoalForecast:
+    """ETA of ``goal_weight`` on the fitted line, with the band from the slope's error."""
+    if goal_weight is None:
+        return GoalForecast(status="no_goal", goal_weight=None)
+    if fit is None or fit.point_count < MIN_FIT_POINTS or fit.slope_kg_per_day is None:
+        return GoalForecast(
+            status="insufficient_data",
+            goal_weight=goal_weight,
+            point_count=fit.point_count if fit else 0,
+        )
+
+    slope = fit.slope_kg_per_day
+    remaining = goal_weight - fit.intercept_kg
+    forecast = GoalForecast(
+        status="off_track",
+        goal_weight=goal_weight,
+        trend_weight_kg=round(fit.intercept_kg, 2),
+        weekly_change_kg=round(slope * 7, 3),
+        fitted_on=fit.fitted_on,
+        point_count=fit.point_count,
+    )
+    if abs(remaining) <= GOAL_TOLERANCE_KG:
+        forecast.status = "reached"
+        return forecast
+
+    def eta(rate: float) -> date | None:
+        if rate == 0 or not 0 < remaining / rate <= MAX_FORECAST_DAYS:
+            return None
+        return fit.fitted_on + timedelta(days=math.ceil(remaining / rate))
+
+    forecast.eta = eta(slope)
+    if forecast.eta is None:
+        return forecast
+    forecast.status = "on_track"
+    # Rates towards the goal at either end of the band
+    margin = math.copysign(BAND_Z * (fit.slope_stderr or 0), remaining)
+    forecast.eta_earliest = eta(slope + margin)
+    forecast.eta_latest = eta(slope - margin)
+    return forecast
+
+
+async def get_goal_forecast(user: CachedUser, db: AsyncSession) -> GoalForecast:
+    result = await db.execute(select(WeightForecast).where(WeightForecast.user_id == user.id))
+    row = result.scalar_one_or_none()
+    return project(user.goal_weight, WeightFit.model_validate(row) if row else None)
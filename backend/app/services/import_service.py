@@ -0,0 +1,322 @@
+"""
+Import Service – bulk historical weight and food records.
+
+Files exported from other trackers arrive as a byte stream of CSV or JSON
+Lines. Every row is first validated with WeightRecordCreate / FoodRecordCreate
+into a spooled temporary file (in memory up to SPOOL_MEMORY_BYTES, on disk
+beyond), without any lock, so a slow upload holds up none of the user's
+writes. Only then is the user's write lock taken, to write the spooled rows
+in batches of IMPORT_BATCH_SIZE with executemany, without the per-record
+asset triggers; the ledger and the weight trend are re-derived once, from
+the earliest imported day, at the end. Only the current batch is held in
+memory, so memory use does not grow with the file.
+
+JSON Lines: one object per line, with "type" set to "weight" or "food" and
+the fields of the matching create schema:
+
+    {"type": "weight", "recorded_date": "2023-01-02", "weight_kg": 81.4}
+    {"type": "food", "recorded_date": "2023-01-02", "meal_type": "lunch",
+     "items": [{"name": "rice", "calories": 350}]}
+
+CSV: a header row naming any of type, recorded_date, weight_kg, meal_type,
+note, name, calories, amount_g and pixel_icon_type. A food row is one item;
+consecutive food rows with the same recorded_date and meal_type form one
+meal.
+
+An import is all-or-nothing: if any row is invalid the file is rejected
+with the first MAX_REPORTED_ERRORS errors and nothing is stored.
+"""
+
+import codecs
+import csv
+import json
+import tempfile
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import IO
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from app.core.locks import user_write_lock
+from app.models.weight_record import WeightRecord
+from app.models.food_record import FoodRecord
+from app.models.food_item import FoodItem
+from app.schemas.data_import import ImportResult, ImportRowError
+from app.schemas.food import FoodRecordCreate
+from app.schemas.weight import WeightRecordCreate
+from app.services import (
+    asset_engine,
+    activity_service,
+    catalog_service,
+    nutrition_service,
+    trend_service,
+)
+
+
+IMPORT_BATCH_SIZE = 1000
+MAX_LINE_BYTES = 64 * 1024
+MAX_MEAL_ITEMS = 100
+MAX_REPORTED_ERRORS = 20
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+_CSV_ITEM_FIELDS = ("name", "calories", "amount_g", "pixel_icon_type")
+
+
+@dataclass
+class _Batch:
+    weights: list[dict] = field(default_factory=list)
+    records: list[dict] = field(default_factory=list)
+    items: list[dict] = field(default_factory=list)
+    activity: dict[date, tuple[int, int]] = field(default_factory=dict)
+    nutrition: dict[date, tuple[int, int, int]] = field(default_factory=dict)
+    catalog: catalog_service.CatalogTally = field(default_factory=catalog_service.CatalogTally)
+
+    def __len__(self) -> int:
+        return len(self.weights) + len(self.records)
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Decoded lines with their 1-based numbers; a UTF-8 byte-order mark is dropped."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    line_no = 0
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            *lines, buffer = buffer.split("\n")
+            for line in lines:
+                line_no += 1
+                yield line_no, line.rstrip("\r")
+            if len(buffer) > MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=413, detail=f"Line {line_no + 1} is longer than {MAX_LINE_BYTES} bytes"
+                )
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"Line {line_no + 1} is not valid UTF-8")
+    if buffer.strip():
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def _jsonl_rows(lines: AsyncIterator[tuple[int, str]]) -> AsyncIterator[tuple[int, dict | str]]:
+    async for line_no, line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_no, f"invalid JSON: {exc}"
+            continue
+        yield line_no, row if isinstance(row, dict) else "expected a JSON object"
+
+
+async def _csv_rows(lines: AsyncIterator[tuple[int, str]]) -> AsyncIterator[tuple[int, dict | str]]:
+    header: list[str] | None = None
+    meal: tuple[int, tuple, dict] | None = None  # (line, (date, meal type), row) being assembled
+    pending, first_line = "", 0
+    async for line_no, line in lines:
+        if pending:
+            text = f"{pending}\n{line}"
+        else:
+            text, first_line = line, line_no
+        # An odd number of quotes means a quoted field continues on the next line
+        if text.count('"') % 2:
+            if len(text) > MAX_LINE_BYTES:
+                raise HTTPException(
+                    status_code=413, detail=f"Row at line {first_line} is longer than {MAX_LINE_BYTES} bytes"
+                )
+            pending = text
+            continue
+        pending = ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        row = {name: value.strip() for name, value in zip(header, values) if value.strip()}
+        kind = row.pop("type", "")
+
+        if kind == "food":
+            key = (row.get("recorded_date"), row.get("meal_type"))
+            item = {name: row.pop(name) for name in _CSV_ITEM_FIELDS if name in row}
+            if meal is not None and meal[1] == key:
+                if len(meal[2]["items"]) >= MAX_MEAL_ITEMS:
+                    yield first_line, f"a meal can have at most {MAX_MEAL_ITEMS} items"
+                elif item:
+                    meal[2]["items"].append(item)
+                continue
+            if meal is not None:
+                yield meal[0], meal[2]
+            meal = (first_line, key, {"type": "food", **row, "items": [item] if item else []})
+            continue
+
+        if meal is not None:
+            yield meal[0], meal[2]
+            meal = None
+        yield first_line, {"type": kind, **row}
+
+    if pending:
+        yield first_line, "unterminated quoted field"
+    if meal is not None:
+        yield meal[0], meal[2]
+
+
+def _validate(row: dict | str) -> WeightRecordCreate | FoodRecordCreate:
+    if isinstance(row, str):
+        raise ValueError(row)
+    kind = row.pop("type", None)
+    if kind == "weight":
+        return WeightRecordCreate.model_validate(row)
+    if kind == "food":
+        return FoodRecordCreate.model_validate(row)
+    raise ValueError('"type" must be "weight" or "food"')
+
+
+def _describe(exc: ValueError) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in exc.errors()
+        )
+    return str(exc)
+
+
+async def _spool(
+    rows: AsyncIterator[tuple[int, dict | str]], spool: IO[bytes]
+) -> list[ImportRowError]:
+    """Validate every row into ``spool``, one tagged JSON line each; returns the errors."""
+    errors: list[ImportRowError] = []
+    async for line_no, row in rows:
+        try:
+            data = _validate(row)
+        except ValueError as exc:
+            errors.append(ImportRowError(line=line_no, error=_describe(exc)))
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+            continue
+        if errors:
+            # Keep reporting problems, but nothing will be written
+            continue
+        tag = b"W" if isinstance(data, WeightRecordCreate) else b"F"
+        spool.write(tag + data.model_dump_json().encode() + b"\n")
+    return errors
+
+
+def _spooled(spool: IO[bytes]) -> Iterator[WeightRecordCreate | FoodRecordCreate]:
+    spool.seek(0)
+    for line in spool:
+        schema = WeightRecordCreate if line.startswith(b"W") else FoodRecordCreate
+        yield schema.model_validate_json(line[1:])
+
+
+def _add(
+    user_id: uuid.UUID,
+    data: WeightRecordCreate | FoodRecordCreate,
+    created_at: datetime,
+    batch: _Batch,
+    result: ImportResult,
+) -> None:
+    weight, food = batch.activity.get(data.recorded_date, (0, 0))
+    if isinstance(data, WeightRecordCreate):
+        batch.weights.append(dict(
+            user_id=user_id,
+            weight_kg=data.weight_kg,
+            recorded_date=data.recorded_date,
+            note=data.note,
+            created_at=created_at,
+        ))
+        batch.activity[data.recorded_date] = (weight + 1, food)
+        result.weight_records += 1
+    else:
+        record_id = uuid.uuid4()
+        total_calories = sum(item.calories for item in data.items)
+        batch.records.append(dict(
+            id=record_id,
+            user_id=user_id,
+            meal_type=data.meal_type,
+            recorded_date=data.recorded_date,
+            total_calories=total_calories,
+            note=data.note,
+            created_at=created_at,
+        ))
+        batch.items.extend(
+            dict(food_record_id=record_id, **item.model_dump()) for item in data.items
+        )
+        batch.catalog.add_items(data.items)
+        batch.activity[data.recorded_date] = (weight, food + 1)
+        calories, meals, items = batch.nutrition.get(data.recorded_date, (0, 0, 0))
+        batch.nutrition[data.recorded_date] = (
+            calories + total_calories, meals + 1, items + len(data.items)
+        )
+        result.food_records += 1
+        result.food_items += len(data.items)
+
+    if result.first_date is None or data.recorded_date < result.first_date:
+        result.first_date = data.recorded_date
+    if result.last_date is None or data.recorded_date > result.last_date:
+        result.last_date = data.recorded_date
+
+
+async def _write(user_id: uuid.UUID, batch: _Batch, db: AsyncSession) -> None:
+    if batch.weights:
+        await db.execute(insert(WeightRecord), batch.weights)
+    if batch.records:
+        await db.execute(insert(FoodRecord), batch.records)
+    if batch.items:
+        await db.execute(insert(FoodItem), batch.items)
+    await activity_service.add_activity_counts(user_id, batch.activity, db)
+    await nutrition_service.add_nutrition_totals(user_id, batch.nutrition, db)
+
+
+async def import_records(
+    user_id: uuid.UUID,
+    chunks: AsyncIterable[bytes],
+    file_format: str,
+    db: AsyncSession,
+) -> ImportResult:
+    """Import a CSV or JSON Lines stream of weight and food records in one transaction."""
+    lines = _lines(chunks)
+    rows = _csv_rows(lines) if file_format == "csv" else _jsonl_rows(lines)
+    result = ImportResult()
+    batch = _Batch()
+    learned = catalog_service.CatalogTally()
+    first_weight_date: date | None = None
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+        errors = await _spool(rows, spool)
+        if errors:
+            raise HTTPException(status_code=422, detail=[error.model_dump() for error in errors])
+
+        # Distinct creation times keep the file's order within a day for the replay
+        started_at = datetime.now(timezone.utc)
+        async with user_write_lock(user_id, db):
+            for data in _spooled(spool):
+                created_at = started_at + timedelta(
+                    microseconds=result.weight_records + result.food_records
+                )
+                _add(user_id, data, created_at, batch, result)
+                if isinstance(data, WeightRecordCreate) and (
+                    first_weight_date is None or data.recorded_date < first_weight_date
+                ):
+                    first_weight_date = data.recorded_date
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await _write(user_id, batch, db)
+                    learned.update(batch.catalog)
+                    batch = _Batch()
+            await _write(user_id, batch, db)
+            learned.update(batch.catalog)
+
+            if first_weight_date is not None:
+                await trend_service.rederive_trend(user_id, first_weight_date, db)
+            if result.first_date is not None:
+                await asset_engine.open_ledger_at(user_id, result.first_date, db)
+                await asset_engine.rederive_from(user_id, result.first_date, db)
+            await db.commit()
+    catalog_service.index.observe(learned)
+    return result
@@ -0,0 +1,135 @@
+"""
+Nutrition Service – per-user daily calorie totals.
+
+``daily_nutrition`` holds one row per (user, day) with the day's calorie
+total and its meal and item counts. Every food write adjusts the row in the
+same transaction, so the asset engine's calorie band, the dashboard and the
+weekly/monthly stats read one row per day instead of summing food records.
+"""
+
+import uuid
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import Insert, insert
+
+from app.models.daily_nutrition import DailyNutrition
+from app.schemas.user import CachedUser
+from app.schemas.food import NutritionDayOut, NutritionStats
+from app.services import asset_engine
+
+
+def _upsert() -> Insert:
+    stmt = insert(DailyNutrition)
+    return stmt.on_conflict_do_update(
+        index_elements=[DailyNutrition.user_id, DailyNutrition.nutrition_date],
+        set_={
+            "total_calories": DailyNutrition.total_calories + stmt.excluded.total_calories,
+            "meal_count": DailyNutrition.meal_count + stmt.excluded.meal_count,
+            "item_count": DailyNutrition.item_count + stmt.excluded.item_count,
+        },
+    )
+
+
+def nutrition_upsert(
+    user_id: uuid.UUID,
+    nutrition_date: date,
+    calories: int = 0,
+    meals: int = 0,
+    items: int = 0,
+) -> Insert:
+    """Upsert adjusting the day's totals by the given deltas, for composing."""
+    return _upsert().values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        nutrition_date=nutrition_date,
+        total_calories=calories,
+        meal_count=meals,
+        item_count=items,
+    )
+
+
+async def add_nutrition(
+    user_id: uuid.UUID,
+    nutrition_date: date,
+    db: AsyncSession,
+    calories: int = 0,
+    meals: int = 0,
+    items: int = 0,
+) -> int:
+    """Adjust the day's totals by the given deltas; returns the day's new calorie total."""
+    result = await db.execute(
+        nutrition_upsert(user_id, nutrition_date, calories, meals, items)
+        .returning(DailyNutrition.total_calories)
+    )
+    return result.scalar_one()
+
+
+async def add_nutrition_totals(
+    user_id: uuid.UUID,
+    totals: dict[date, tuple[int, int, int]],
+    db: AsyncSession,
+) -> None:
+    """Add (calories, meals, items) for many days in one executemany."""
+    if not totals:
+        return
+    await db.execute(
+        _upsert(),
+        [
+            dict(
+                user_id=user_id,
+                nutrition_date=day,
+                total_calories=calories,
+                meal_count=meals,
+                item_count=items,
+            )
+            for day, (calories, meals, items) in totals.items()
+        ],
+    )
+
+
+def period_bounds(period: str, target_date: date) -> tuple[date, date]:
+    """The ISO week (Monday start) or calendar month containing ``target_date``."""
+    if period == "week":
+        start = target_date - timedelta(days=target_date.weekday())
+        return start, start + timedelta(days=6)
+    start = target_date.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+async def get_nutrition_stats(
+    user: CachedUser,
+    period: str,
+    target_date: date,
+    db: AsyncSession,
+) -> NutritionStats:
+    start, end = period_bounds(period, target_date)
+    result = await db.execute(
+        select(DailyNutrition)
+        .where(
+            DailyNutrition.user_id == user.id,
+            DailyNutrition.nutrition_date >= start,
+            DailyNutrition.nutrition_date <= end,
+            DailyNutrition.meal_count > 0,
+        )
+        .order_by(DailyNutrition.nutrition_date.asc())
+    )
+    days = list(result.scalars().all())
+    total_calories = sum(day.total_calories for day in days)
+    return NutritionStats(
+        period=period,
+        start=start,
+        end=end,
+        calorie_target=user.daily_calorie_target,
+        days_logged=len(days),
+        days_in_target=sum(
+            asset_engine.in_calorie_range(day.total_calories, user.daily_calorie_target)
+            for day in days
+        ),
+        total_calories=total_calories,
+        average_calories=round(total_calories / len(days), 1) if days else 0.0,
+        meal_count=sum(day.meal_count for day in days),
+        item_count=sum(day.item_count for day in days),
+        days=[NutritionDayOut.model_validate(day) for day in days],
+    )
@@ -0,0 +1,220 @@
+"""
+Partition Service – monthly partitions of asset_snapshots.
+
+asset_snapshots is range-partitioned on snapshot_date into one table per
+calendar month (asset_snapshots_YYYY_MM) plus a default partition for dates
+no month covers. Queries bounded by snapshot_date only scan the months in
+range, and vacuum and index maintenance work one month at a time.
+
+ensure_partitions() keeps the current and upcoming months in place and moves
+rows that landed in the default partition (e.g. back-dated records) into
+their own month. archive_partitions() compacts months older than
+settings.ASSET_ARCHIVE_AFTER_MONTHS to one row per (user, day, trigger type),
+the form the "daily" snapshot mode writes, keeping the rows that hold each
+day's high and low, so daily closes, the ledger head, the all-time high/low
+and the candles stay as they were. Both run from the ``app.cli`` jobs, never
+from the web workers.
+"""
+
+import re
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text
+
+from app.config import settings
+
+PARENT_TABLE = "asset_snapshots"
+DEFAULT_PARTITION = "asset_snapshots_default"
+MONTHS_AHEAD = 2
+ARCHIVED_COMMENT = "archived"
+
+_PARTITION_LOCK_KEY = 0x61737365745F70  # serializes concurrent partition jobs
+_MONTH_PARTITION = re.compile(r"^asset_snapshots_(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+async def is_partitioned(db: AsyncSession) -> bool:
+    result = await db.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARENT_TABLE},
+    )
+    return bool(result.scalar_one_or_none())
+
+
+async def list_partitions(db: AsyncSession) -> list[tuple[date, str, bool]]:
+    """(month, partition name, archived) for every month partition, oldest first."""
+    result = await db.execute(
+        text(
+            """
+            SELECT c.relname, obj_description(c.oid, 'pg_class')
+            FROM pg_inherits AS i
+            JOIN pg_class AS c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(:parent)
+            """
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    partitions = []
+    for name, comment in result.all():
+        match = _MONTH_PARTITION.match(name)
+        if match:
+            month = date(int(match[1]), int(match[2]), 1)
+            partitions.append((month, name, comment == ARCHIVED_COMMENT))
+    return sorted(partitions)
+
+
+async def _lock(db: AsyncSession) -> None:
+    await db.execute(select(func.pg_advisory_xact_lock(_PARTITION_LOCK_KEY)))
+
+
+async def _create_partition(month: date, db: AsyncSession) -> str:
+    name = partition_name(month)
+    end = add_months(month, 1)
+    await db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+    # The default partition may already hold rows for this month; they have
+    # to move before the range can be attached.
+    await db.execute(
+        text(
+            f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE snapshot_date >= :start AND snapshot_date < :end
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """
+        ),
+        {"start": month, "end": end},
+    )
+    await db.execute(
+        text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
+    return name
+
+
+async def ensure_partitions(db: AsyncSession, today: date | None = None) -> list[str]:
+    """
+    Create month partitions for the current and next MONTHS_AHEAD months and
+    for every month found in the default partition. Returns the new names.
+    """
+    if not await is_partitioned(db):
+        return []
+    await _lock(db)
+
+    current = month_start(today or date.today())
+    wanted = {add_months(current, offset) for offset in range(MONTHS_AHEAD + 1)}
+    stray_result = await db.execute(
+        text(f"SELECT DISTINCT date_trunc('month', snapshot_date)::date FROM {DEFAULT_PARTITION}")
+    )
+    wanted.update(stray_result.scalars().all())
+
+    existing = {month for month, _, _ in await list_partitions(db)}
+    return [await _create_partition(month, db) for month in sorted(wanted - existing)]
+
+
+def _ranked(name: str) -> str:
+    """
+    Rows of a partition marked ``kept`` when they close their (user, day,
+    trigger type) group or hold the day's first high or low. ``segment``
+    ties every row to the next kept row of its group, which absorbs it.
+    """
+    return f"""
+        SELECT id, user_id, snapshot_date, trigger_type, delta, event_count, kept,
+               count(*) FILTER (WHERE kept) OVER (
+                   PARTITION BY user_id, snapshot_date, trigger_type
+                   ORDER BY seq DESC ROWS UNBOUNDED PRECEDING
+               ) AS segment
+        FROM (
+            SELECT id, user_id, snapshot_date, trigger_type, delta, event_count, seq,
+                   row_number() OVER (
+                       PARTITION BY user_id, snapshot_date, trigger_type ORDER BY seq DESC
+                   ) = 1
+                   OR row_number() OVER (
+                       PARTITION BY user_id, snapshot_date ORDER BY asset_value DESC, seq
+                   ) = 1
+                   OR row_number() OVER (
+                       PARTITION BY user_id, snapshot_date ORDER BY asset_value, seq
+                   ) = 1 AS kept
+            FROM {name}
+        ) AS marked
+    """
+
+
+async def _compact_partition(name: str, db: AsyncSession) -> int:
+    """
+    Fold a month down to one row per (user, day, trigger type), plus the rows
+    holding each day's high and low, which the all-time high/low and the
+    candles are rebuilt from; returns rows removed.
+    """
+    await db.execute(
+        text(
+            f"""
+            WITH segments AS (
+                SELECT user_id, snapshot_date, trigger_type, segment,
+                       sum(delta) AS total_delta,
+                       sum(event_count) AS events,
+                       count(*) AS segment_rows
+                FROM ({_ranked(name)}) AS ranked
+                GROUP BY user_id, snapshot_date, trigger_type, segment
+            )
+            UPDATE {name} AS s
+            SET delta = round(g.total_delta::numeric, 4)::float8,
+                event_count = g.events
+            FROM ({_ranked(name)}) AS r
+            JOIN segments AS g USING (user_id, snapshot_date, trigger_type, segment)
+            WHERE s.id = r.id AND r.kept AND g.segment_rows > 1
+            """
+        )
+    )
+    result = await db.execute(
+        text(
+            f"""
+            DELETE FROM {name} AS s
+            USING ({_ranked(name)}) AS ranked
+            WHERE s.id = ranked.id AND NOT ranked.kept
+            """
+        )
+    )
+    return result.rowcount
+
+
+async def archive_partitions(
+    db: AsyncSession,
+    months: int | None = None,
+    today: date | None = None,
+) -> dict[str, int]:
+    """
+    Compact every month partition older than ``months`` full months that has
+    not been archived yet. Returns rows removed per archived partition.
+    """
+    if not await is_partitioned(db):
+        return {}
+    await _lock(db)
+
+    keep_months = settings.ASSET_ARCHIVE_AFTER_MONTHS if months is None else months
+    cutoff = add_months(month_start(today or date.today()), -keep_months)
+
+    archived: dict[str, int] = {}
+    for month, name, is_archived in await list_partitions(db):
+        if month >= cutoff:
+            break
+        if is_archived:
+            continue
+        archived[name] = await _compact_partition(name, db)
+        await db.execute(text(f"COMMENT ON TABLE {name} IS '{ARCHIVED_COMMENT}'"))
+    return archived
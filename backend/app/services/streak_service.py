@@ -0,0 +1,58 @@
+"""
+Streak Service – consecutive-day activity streaks.
+
+A streak is the number of consecutive days with any activity (a weight or a
+food record) ending the day before ``as_of``. The current day never counts,
+so logging today does not change today's streak.
+
+The streak is computed in a single gaps-and-islands query over the
+``user_activity_days`` index: active days are numbered in descending order,
+and every day belonging to the island that ends yesterday satisfies
+``day + row_number = as_of``. Counting those rows gives the streak without
+walking back one day at a time.
+"""
+
+import uuid
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, select, func, cast, Integer
+
+from app.models.user_activity_day import UserActivityDay
+
+
+# Streaks are capped so the activity window stays bounded
+MAX_STREAK_DAYS = 365
+
+
+def streak_query(user_id: uuid.UUID, as_of: date) -> Select:
+    """Single-row SELECT of the streak ending the day before ``as_of``."""
+    window_start = as_of - timedelta(days=MAX_STREAK_DAYS)
+
+    activity_days = (
+        select(UserActivityDay.activity_date.label("day"))
+        .where(
+            UserActivityDay.user_id == user_id,
+            UserActivityDay.activity_date >= window_start,
+            UserActivityDay.activity_date < as_of,
+        )
+        .subquery()
+    )
+
+    ranked = select(
+        activity_days.c.day,
+        cast(
+            func.row_number().over(order_by=activity_days.c.day.desc()), Integer
+        ).label("rn"),
+    ).subquery()
+
+    return select(func.count()).select_from(ranked).where(ranked.c.day + ranked.c.rn == as_of)
+
+
+async def get_streak(
+    user_id: uuid.UUID,
+    db: AsyncSession,
+    as_of: date | None = None,
+) -> int:
+    """Count consecutive activity days ending the day before ``as_of`` (default: today)."""
+    result = await db.execute(streak_query(user_id, as_of or date.today()))
+    return result.scalar_one()
@@ -0,0 +1,311 @@
+"""
+Sync Service – offline write queues applied as one batch.
+
+Mobile clients queue weight and food writes while offline and flush them as
+one ordered batch of ops, each carrying a client-generated idempotency key.
+The batch runs under the user's write lock in a single transaction. Each op
+is applied in a savepoint, so an op that fails (say, on a record deleted
+from another device) is reported without undoing the others, and instead
+of per-op asset triggers the ledger (and the weight trend) is re-derived
+once, from the earliest day the batch touched.
+
+The outcome of every op is stored in sync_keys in the same transaction: a
+retried batch gets the stored outcomes back without anything being applied
+twice, and a batch that failed as a whole leaves no keys behind. Keys are
+kept for SYNC_KEY_RETENTION_DAYS.
+"""
+
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, and_
+from fastapi import HTTPException
+
+from app.config import settings
+from app.core.locks import user_write_lock
+from app.models.food_item import FoodItem
+from app.models.food_record import FoodRecord
+from app.models.sync_key import SyncKey
+from app.models.weight_record import WeightRecord
+from app.schemas.sync import (
+    FoodCreateOp,
+    FoodItemAddOp,
+    FoodItemDeleteOp,
+    SyncOp,
+    SyncOpResult,
+    WeightCreateOp,
+    WeightDeleteOp,
+    WeightUpdateOp,
+)
+from app.services import (
+    asset_engine,
+    activity_service,
+    catalog_service,
+    nutrition_service,
+    trend_service,
+)
+
+# (status, id of the row created or changed, day whose ledger must be re-derived)
+OpOutcome = tuple[int, uuid.UUID, date | None]
+
+
+def _target(op, refs: dict[str, uuid.UUID]) -> uuid.UUID:
+    if op.target_id is not None:
+        return op.target_id
+    target = refs.get(op.target_key)
+    if target is None:
+        raise HTTPException(status_code=404, detail=f"Unknown target_key {op.target_key!r}")
+    return target
+
+
+async def _owned_weight(
+    user_id: uuid.UUID, op, refs: dict[str, uuid.UUID], db: AsyncSession
+) -> WeightRecord:
+    result = await db.execute(
+        select(WeightRecord).where(
+            and_(WeightRecord.id == _target(op, refs), WeightRecord.user_id == user_id)
+        )
+    )
+    record = result.scalar_one_or_none()
+    if not record:
+        raise HTTPException(status_code=404, detail="Weight record not found")
+    return record
+
+
+async def _weight_create(
+    user_id: uuid.UUID,
+    op: WeightCreateOp,
+    refs: dict[str, uuid.UUID],
+    created_at: datetime,
+    db: AsyncSession,
+) -> OpOutcome:
+    record = WeightRecord(
+        user_id=user_id,
+        weight_kg=op.data.weight_kg,
+        recorded_date=op.data.recorded_date,
+        note=op.data.note,
+        created_at=created_at,
+    )
+    db.add(record)
+    await db.flush()
+    await activity_service.add_activity(user_id, op.data.recorded_date, db, weight=1)
+    return 201, record.id, op.data.recorded_date
+
+
+async def _weight_update(
+    user_id: uuid.UUID,
+    op: WeightUpdateOp,
+    refs: dict[str, uuid.UUID],
+    created_at: datetime,
+    db: AsyncSession,
+) -> OpOutcome:
+    record = await _owned_weight(user_id, op, refs, db)
+    weight_changed = op.data.weight_kg is not None and op.data.weight_kg != record.weight_kg
+    if op.data.weight_kg is not None:
+        record.weight_kg = op.data.weight_kg
+    if op.data.note is not None:
+        record.note = op.data.note
+    await db.flush()
+    return 200, record.id, record.recorded_date if weight_changed else None
+
+
+async def _weight_delete(
+    user_id: uuid.UUID,
+    op: WeightDeleteOp,
+    refs: dict[str, uuid.UUID],
+    created_at: datetime,
+    db: AsyncSession,
+) -> OpOutcome:
+    record = await _owned_weight(user_id, op, refs, db)
+    await db.delete(record)
+    await activity_service.remove_activity(user_id, record.recorded_date, db, weight=1)
+    await db.flush()
+    return 204, record.id, record.recorded_date
+
+
+async def _food_create(
+    user_id: uuid.UUID,
+    op: FoodCreateOp,
+    refs: dict[str, uuid.UUID],
+    created_at: datetime,
+    db: AsyncSession,
+) -> OpOutcome:
+    record = FoodRecord(
+        user_id=user_id,
+        meal_type=op.data.meal_type,
+        recorded_date=op.data.recorded_date,
+        total_calories=sum(item.calories for item in op.data.items),
+        note=op.data.note,
+        created_at=created_at,
+    )
+    db.add(record)
+    await db.flush()
+    for item_data in op.data.items:
+        db.add(FoodItem(food_record_id=record.id, **item_data.model_dump()))
+    await db.flush()
+    await activity_service.add_activity(user_id, op.data.recorded_date, db, food=1)
+    await nutrition_service.add_nutrition(
+        user_id,
+        op.data.recorded_date,
+        db,
+        calories=record.total_calories,
+        meals=1,
+        items=len(op.data.items),
+    )
+    return 201, record.id, op.data.recorded_date
+
+
+async def _food_add_item(
+    user_id: uuid.UUID,
+    op: FoodItemAddOp,
+    refs: dict[str, uuid.UUID],
+    created_at: datetime,
+    db: AsyncSession,
+) -> OpOutcome:
+    result = await db.execute(
+        select(FoodRecord).where(
+            and_(FoodRecord.id == _target(op, refs), FoodRecord.user_id == user_id)
+        )
+    )
+    record = result.scalar_one_or_none()
+    if not record:
+        raise HTTPException(status_code=404, detail="Food record not found")
+    item = FoodItem(food_record_id=record.id, **op.data.model_dump())
+    db.add(item)
+    record.total_calories += op.data.calories
+    await db.flush()
+    await nutrition_service.add_nutrition(
+        user_id, record.recorded_date, db, calories=op.data.calories, items=1
+    )
+    return 201, item.id, record.recorded_date
+
+
+async def _food_delete_item(
+    user_id: uuid.UUID,
+    op: FoodItemDeleteOp,
+    refs: dict[str, uuid.UUID],
+    created_at: datetime,
+    db: AsyncSession,
+) -> OpOutcome:
+    result = await db.execute(
+        select(FoodItem, FoodRecord)
+        .join(FoodRecord, FoodItem.food_record_id == FoodRecord.id)
+        .where(and_(FoodItem.id == _target(op, refs), FoodRecord.user_id == user_id))
+    )
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Food item not found")
+    item, record = row
+    previous_total = record.total_calories
+    record.total_calories = max(0, previous_total - item.calories)
+    await db.delete(item)
+    await db.flush()
+    await nutrition_service.add_nutrition(
+        user_id,
+        record.recorded_date,
+        db,
+        calories=record.total_calories - previous_total,
+        items=-1,
+    )
+    return 204, item.id, record.recorded_date
+
+
+_HANDLERS: dict[str, Callable[..., Awaitable[OpOutcome]]] = {
+    "weight.create": _weight_create,
+    "weight.update": _weight_update,
+    "weight.delete": _weight_delete,
+    "food.create": _food_create,
+    "food.add_item": _food_add_item,
+    "food.delete_item": _food_delete_item,
+}
+
+
+async def apply_batch(
+    user_id: uuid.UUID,
+    ops: list[SyncOp],
+    db: AsyncSession,
+) -> list[SyncOpResult]:
+    """Apply an ordered batch of offline ops; one result per op, in order."""
+    started_at = datetime.now(timezone.utc)
+    results: list[SyncOpResult] = []
+    first_date: date | None = None
+    first_weight_date: date | None = None
+
+    async with user_write_lock(user_id, db):
+        await db.execute(
+            delete(SyncKey).where(
+                and_(
+                    SyncKey.user_id == user_id,
+                    SyncKey.created_at
+                    < started_at - timedelta(days=settings.SYNC_KEY_RETENTION_DAYS),
+                )
+            )
+        )
+        keys = {op.key for op in ops} | {
+            op.target_key for op in ops if getattr(op, "target_key", None)
+        }
+        stored = await db.execute(
+            select(SyncKey).where(and_(SyncKey.user_id == user_id, SyncKey.key.in_(keys)))
+        )
+        done = {row.key: row for row in stored.scalars()}
+        refs = {key: row.result_id for key, row in done.items() if row.result_id is not None}
+
+        for index, op in enumerate(ops):
+            previous = done.get(op.key)
+            if previous is not None:
+                results.append(SyncOpResult(
+                    key=op.key,
+                    status=previous.status,
+                    id=previous.result_id,
+                    error=previous.error,
+                    replayed=True,
+                ))
+                continue
+
+            # Distinct creation times keep the batch's order within a day for the replay
+            created_at = started_at + timedelta(microseconds=index)
+            error = None
+            try:
+                async with db.begin_nested():
+                    status, result_id, day = await _HANDLERS[op.op](
+                        user_id, op, refs, created_at, db
+                    )
+            except HTTPException as exc:
+                status, result_id, day = exc.status_code, None, None
+                error = str(exc.detail)[:500]
+
+            row = SyncKey(
+                user_id=user_id, key=op.key, status=status, result_id=result_id, error=error
+            )
+            db.add(row)
+            done[op.key] = row
+            if result_id is not None:
+                refs[op.key] = result_id
+            if day is not None and (first_date is None or day < first_date):
+                first_date = day
+            if (
+                day is not None
+                and op.op.startswith("weight.")
+                and (first_weight_date is None or day < first_weight_date)
+            ):
+                first_weight_date = day
+            results.append(SyncOpResult(key=op.key, status=status, id=result_id, error=error))
+
+        await db.flush()
+        if first_weight_date is not None:
+            await trend_service.rederive_trend(user_id, first_weight_date, db)
+        if first_date is not None:
+            await asset_engine.rederive_from(user_id, first_date, db)
+        await db.commit()
+
+    learned = []
+    for op, result in zip(ops, results):
+        if result.replayed or result.status != 201:
+            continue
+        if op.op == "food.create":
+            learned.extend(op.data.items)
+        elif op.op == "food.add_item":
+            learned.append(op.data)
+    catalog_service.observe(learned)
+    return results
@@ -0,0 +1,165 @@
+"""
+Trend Service – smoothed weight series.
+
+Scale readings swing by a kilogram or more from day to day on water and
+food alone. weight_trend_days keeps, for every day with a weigh-in, the
+day's last reading, an exponentially weighted moving average of the
+readings and the mean of the readings of the last 7 and 30 days. Each
+reading moves the average TREND_ALPHA of the way towards it, compounded
+over the days without a reading.
+
+Rows are written with the weight records: a weigh-in on the latest day
+rewrites that day's row from the row before it and the readings of the 30
+days up to it, however long the history. A reading dated before the latest
+day, or edited or deleted, re-derives the rows from its day forward, as the
+asset ledger does; the readings are streamed, so only the 30-day window is
+held however far back it starts. Rows whose values come out the same are
+left alone, and the goal forecast is refitted only when a row changed.
+"""
+
+import uuid
+from collections import deque
+from datetime import date, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import exists, select, delete, tuple_
+from sqlalchemy.dialects.postgresql import Insert, distinct_on, insert
+
+from app.models.weight_record import WeightRecord
+from app.models.weight_trend_day import WeightTrendDay
+from app.schemas.weight import WeightTrend, WeightTrendDayOut
+from app.services import forecast_service
+
+
+TREND_ALPHA = 0.1
+SHORT_WINDOW_DAYS = 7
+LONG_WINDOW_DAYS = 30
+# Readings per fetch and rows per upsert while re-deriving
+TREND_BATCH_ROWS = 1000
+
+_VALUE_COLUMNS = ("weight_kg", "ewma_kg", "mean_7d_kg", "mean_30d_kg")
+
+
+def ewma_step(
+    previous: float | None,
+    previous_date: date | None,
+    weight: float,
+    day: date,
+) -> float:
+    """The average after ``day``'s reading, given the average as of an earlier day."""
+    if previous is None:
+        return weight
+    keep = (1 - TREND_ALPHA) ** (day - previous_date).days
+    return round(weight + keep * (previous - weight), 4)
+
+
+async def get_trend_before(
+    user_id: uuid.UUID, day: date, db: AsyncSession
+) -> WeightTrendDay | None:
+    result = await db.execute(
+        select(WeightTrendDay)
+        .where(WeightTrendDay.user_id == user_id, WeightTrendDay.trend_date < day)
+        .order_by(WeightTrendDay.trend_date.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _trend_upsert() -> Insert:
+    """Writes days' rows, skipping unchanged ones; returns the dates actually written."""
+    stmt = insert(WeightTrendDay)
+    return stmt.on_conflict_do_update(
+        constraint="uq_weight_trend_user_date",
+        set_={name: stmt.excluded[name] for name in _VALUE_COLUMNS},
+        where=tuple_(*(WeightTrendDay.__table__.c[name] for name in _VALUE_COLUMNS))
+        .is_distinct_from(tuple_(*(stmt.excluded[name] for name in _VALUE_COLUMNS))),
+    ).returning(WeightTrendDay.trend_date)
+
+
+async def rederive_trend(
+    user_id: uuid.UUID,
+    from_date: date,
+    db: AsyncSession,
+) -> tuple[float | None, float | None]:
+    """
+    Rewrite the trend rows from ``from_date`` forward after its readings
+    changed, and refit the goal forecast if any row changed.
+
+    The caller flushes its weight record changes first. Returns the average
+    before ``from_date`` and the average on it (None without a reading that
+    day), which the asset engine scores in "trend" mode.
+    """
+    previous = await get_trend_before(user_id, from_date, db)
+    # Days whose readings are all gone
+    removed = await db.execute(
+        delete(WeightTrendDay).where(
+            WeightTrendDay.user_id == user_id,
+            WeightTrendDay.trend_date >= from_date,
+            ~exists().where(
+                WeightRecord.user_id == user_id,
+                WeightRecord.recorded_date == WeightTrendDay.trend_date,
+            ),
+        )
+    )
+    changed = removed.rowcount > 0
+    readings = await db.stream(
+        select(WeightRecord.recorded_date, WeightRecord.weight_kg)
+        .where(
+            WeightRecord.user_id == user_id,
+            WeightRecord.recorded_date > from_date - timedelta(days=LONG_WINDOW_DAYS),
+        )
+        # The day's last reading
+        .order_by(WeightRecord.recorded_date, WeightRecord.created_at.desc())
+        .ext(distinct_on(WeightRecord.recorded_date))
+        .execution_options(yield_per=TREND_BATCH_ROWS)
+    )
+
+    before = previous.ewma_kg if previous else None
+    ewma, ewma_date = before, previous.trend_date if previous else None
+    on_day = None
+    window: deque[tuple[date, float]] = deque()
+    async for batch in readings.partitions():
+        rows = []
+        for day, weight in batch:
+            window.append((day, weight))
+            while window[0][0] <= day - timedelta(days=LONG_WINDOW_DAYS):
+                window.popleft()
+            if day < from_date:
+                continue
+            ewma, ewma_date = ewma_step(ewma, ewma_date, weight, day), day
+            if day == from_date:
+                on_day = ewma
+            short = [w for d, w in window if d > day - timedelta(days=SHORT_WINDOW_DAYS)]
+            rows.append(dict(
+                id=uuid.uuid4(),
+                user_id=user_id,
+                trend_date=day,
+                weight_kg=weight,
+                ewma_kg=ewma,
+                mean_7d_kg=round(sum(short) / len(short), 4),
+                mean_30d_kg=round(sum(w for _, w in window) / len(window), 4),
+            ))
+        if rows:
+            written = await db.execute(_trend_upsert(), rows)
+            changed = written.first() is not None or changed
+    if changed:
+        await forecast_service.refit(user_id, db)
+    return before, on_day
+
+
+async def get_weight_trend(
+    user_id: uuid.UUID,
+    days: int,
+    db: AsyncSession,
+) -> WeightTrend:
+    cutoff = date.today() - timedelta(days=days)
+    result = await db.execute(
+        select(WeightTrendDay)
+        .where(WeightTrendDay.user_id == user_id, WeightTrendDay.trend_date >= cutoff)
+        .order_by(WeightTrendDay.trend_date.asc())
+    )
+    points = list(result.scalars().all())
+    current = points[-1] if points else await get_trend_before(user_id, cutoff, db)
+    return WeightTrend(
+        current=WeightTrendDayOut.model_validate(current) if current else None,
+        days=[WeightTrendDayOut.model_validate(point) for point in points],
+    )
@@ -1,12 +1,25 @@
 import uuid
+from collections.abc import AsyncIterator
 from datetime import date
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import Select, select, and_, tuple_
 from fastapi import HTTPException
 
+from app.core.locks import user_write_lock
+from app.core.pagination import encode_cursor, decode_cursor
+from app.database import AsyncSessionLocal
 from app.models.weight_record import WeightRecord
-from app.schemas.weight import WeightRecordCreate, WeightRecordUpdate
-from app.services import asset_engine
+from app.schemas.weight import (
+    WeightRecordCreate,
+    WeightRecordUpdate,
+    WeightRecordOut,
+    WeightRecordPage,
+)
+from app.services import asset_engine, activity_service, trend_service
+
+
+# Records fetched per query while streaming the full history
+STREAM_BATCH_ROWS = 1000
 
 
 async def create_weight_record(
@@ -14,22 +27,31 @@ async def create_weight_record(
     data: WeightRecordCreate,
     db: AsyncSession,
 ) -> WeightRecord:
-    record = WeightRecord(
-        user_id=user_id,
-        weight_kg=data.weight_kg,
-        recorded_date=data.recorded_date,
-        note=data.note,
-    )
-    db.add(record)
-    await db.flush()
-
-    await asset_engine.trigger_weight(
-        user_id=user_id,
-        new_weight=data.weight_kg,
-        recorded_date=data.recorded_date,
-        db=db,
-    )
-    await db.commit()
+    async with user_write_lock(user_id, db):
+        record = WeightRecord(
+            user_id=user_id,
+            weight_kg=data.weight_kg,
+            recorded_date=data.recorded_date,
+            note=data.note,
+        )
+        db.add(record)
+        await db.flush()
+        await activity_service.add_activity(user_id, data.recorded_date, db, weight=1)
+        trend = await trend_service.rederive_trend(user_id, data.recorded_date, db)
+
+        last_date = await db.scalar(asset_engine.last_snapshot_date_query(user_id))
+        if last_date is not None and data.recorded_date < last_date:
+            # Later weigh-ins were scored against the reading before this one
+            await asset_engine.rederive_from(user_id, data.recorded_date, db)
+        else:
+            await asset_engine.trigger_weight(
+                user_id=user_id,
+                new_weight=data.weight_kg,
+                recorded_date=data.recorded_date,
+                db=db,
+                trend=trend,
+            )
+        await db.commit()
     await db.refresh(record)
     return record
 
@@ -54,27 +76,101 @@ async def get_weight_history(
     return list(result.scalars().all())
 
 
-async def update_weight_record(
+def _history_page(
+    user_id: uuid.UUID, after: tuple[date, uuid.UUID] | None, limit: int
+) -> Select:
+    """Up to ``limit`` records following ``after`` in (recorded_date, id) order."""
+    query = (
+        select(WeightRecord)
+        .where(WeightRecord.user_id == user_id)
+        .order_by(WeightRecord.recorded_date, WeightRecord.id)
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(tuple_(WeightRecord.recorded_date, WeightRecord.id) > tuple_(*after))
+    return query
+
+
+async def get_weight_page(
     user_id: uuid.UUID,
-    record_id: uuid.UUID,
-    data: WeightRecordUpdate,
+    cursor: str | None,
+    limit: int,
     db: AsyncSession,
+) -> WeightRecordPage:
+    """
+    One page of the user's whole weight history, oldest first.
+
+    Pages follow (recorded_date, id), so a page deep in a multi-year history
+    is one index range scan like the first.
+    """
+    after = decode_cursor(cursor, date.fromisoformat, uuid.UUID) if cursor else None
+    result = await db.execute(_history_page(user_id, after, limit + 1))
+    records = list(result.scalars().all())
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_cursor(records[-1].recorded_date, records[-1].id)
+    return WeightRecordPage(records=records, next_cursor=next_cursor)
+
+
+async def stream_weight_history(user_id: uuid.UUID) -> AsyncIterator[bytes]:
+    """
+    NDJSON body with every weight record of the user, oldest first.
+
+    The history is read in keyset batches of STREAM_BATCH_ROWS, each in a
+    short session of its own, so a slow client holds neither a pooled
+    connection nor more than one batch in memory.
+    """
+    after = None
+    while True:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(_history_page(user_id, after, STREAM_BATCH_ROWS))
+            records = list(result.scalars().all())
+        if records:
+            yield b"".join(
+                WeightRecordOut.model_validate(record).model_dump_json().encode() + b"\n"
+                for record in records
+            )
+        if len(records) < STREAM_BATCH_ROWS:
+            return
+        after = (records[-1].recorded_date, records[-1].id)
+
+
+async def _locked_record(
+    user_id: uuid.UUID, record_id: uuid.UUID, db: AsyncSession
 ) -> WeightRecord:
+    """The user's record, read and row-locked under the caller's write lock."""
     result = await db.execute(
-        select(WeightRecord).where(
-            and_(WeightRecord.id == record_id, WeightRecord.user_id == user_id)
-        )
+        select(WeightRecord)
+        .where(and_(WeightRecord.id == record_id, WeightRecord.user_id == user_id))
+        .with_for_update()
+        .execution_options(populate_existing=True)
     )
     record = result.scalar_one_or_none()
     if not record:
         raise HTTPException(status_code=404, detail="Weight record not found")
+    return record
 
-    if data.weight_kg is not None:
-        record.weight_kg = data.weight_kg
-    if data.note is not None:
-        record.note = data.note
 
-    await db.commit()
+async def update_weight_record(
+    user_id: uuid.UUID,
+    record_id: uuid.UUID,
+    data: WeightRecordUpdate,
+    db: AsyncSession,
+) -> WeightRecord:
+    async with user_write_lock(user_id, db):
+        record = await _locked_record(user_id, record_id, db)
+        weight_changed = data.weight_kg is not None and data.weight_kg != record.weight_kg
+        if data.weight_kg is not None:
+            record.weight_kg = data.weight_kg
+        if data.note is not None:
+            record.note = data.note
+        await db.flush()
+        if weight_changed:
+            await trend_service.rederive_trend(user_id, record.recorded_date, db)
+            await asset_engine.rederive_from(user_id, record.recorded_date, db)
+        await db.commit()
     await db.refresh(record)
     return record
 
@@ -84,13 +180,11 @@ async def delete_weight_record(
     record_id: uuid.UUID,
     db: AsyncSession,
 ) -> None:
-    result = await db.execute(
-        select(WeightRecord).where(
-            and_(WeightRecord.id == record_id, WeightRecord.user_id == user_id)
-        )
-    )
-    record = result.scalar_one_or_none()
-    if not record:
-        raise HTTPException(status_code=404, detail="Weight record not found")
-    await db.delete(record)
-    await db.commit()
+    async with user_write_lock(user_id, db):
+        record = await _locked_record(user_id, record_id, db)
+        await db.delete(record)
+        await activity_service.remove_activity(user_id, record.recorded_date, db, weight=1)
+        await db.flush()
+        await trend_service.rederive_trend(user_id, record.recorded_date, db)
+        await asset_engine.rederive_from(user_id, record.recorded_date, db)
+        await db.commit()
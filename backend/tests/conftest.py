@@ -0,0 +1,117 @@
+"""
+Shared fixtures.
+
+Tests that touch the database run against the throwaway Postgres named by
+TEST_DATABASE_URL, whose schema is dropped and re-created once per session;
+they are skipped when it is unset or unreachable. The app's DATABASE_URL is
+never used, so the suite cannot write to a real database. Each test works on
+users of its own, so tests do not clean up after themselves.
+
+Redis points at a closed port: the app falls back to the database, as it
+does during an outage.
+"""
+
+import os
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# Before app.config is imported, so the app's engine is the test database's
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["REDIS_URL"] = "redis://127.0.0.1:1"
+os.environ["DEBUG"] = "false"
+
+import uuid  # noqa: E402
+from collections.abc import AsyncIterator, Iterator  # noqa: E402
+from contextlib import contextmanager  # noqa: E402
+
+import pytest  # noqa: E402
+from sqlalchemy import MetaData, event, text  # noqa: E402
+from sqlalchemy.exc import SQLAlchemyError  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession  # noqa: E402
+
+import app.models  # noqa: E402, F401
+from app.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models.food_catalog import FoodCatalogEntry  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.schemas.user import UserRegister  # noqa: E402
+from app.services import auth_service  # noqa: E402
+
+_state = {"trgm": False}
+
+
+async def _create_schema(conn: AsyncConnection) -> bool:
+    """Create every table; returns whether pg_trgm (and so the fuzzy search) is available."""
+    await conn.run_sync(Base.metadata.drop_all)
+    trgm = bool(await conn.scalar(
+        text("SELECT count(*) FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ))
+    catalog = FoodCatalogEntry.__table__
+    await conn.run_sync(
+        Base.metadata.create_all,
+        tables=[table for table in Base.metadata.sorted_tables if trgm or table is not catalog],
+    )
+    if not trgm:
+        # The same table without its trigram index, which needs the extension
+        bare = catalog.to_metadata(MetaData())
+        for index in list(bare.indexes):
+            if index.name == "ix_food_catalog_name_trgm":
+                bare.indexes.discard(index)
+        await conn.run_sync(bare.create)
+    return trgm
+
+
+@pytest.fixture(scope="session")
+async def database() -> AsyncIterator[None]:
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    try:
+        async with engine.begin() as conn:
+            _state["trgm"] = await _create_schema(conn)
+    except (OSError, SQLAlchemyError) as exc:
+        pytest.skip(f"test database unavailable: {exc}")
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+def trgm(database) -> None:
+    """Skip the test unless the test database has pg_trgm."""
+    if not _state["trgm"]:
+        pytest.skip("pg_trgm is not available in the test database")
+
+
+@pytest.fixture
+async def db(database) -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def user(db: AsyncSession) -> User:
+    return await make_user(db)
+
+
+async def make_user(db: AsyncSession, **fields) -> User:
+    """Register a user with a unique email, as POST /auth/register does."""
+    data = UserRegister(
+        email=f"{uuid.uuid4().hex}@example.com",
+        password="password1",
+        username="tester",
+        **fields,
+    )
+    return await auth_service.register_user(data, db)
+
+
+@contextmanager
+def count_statements() -> Iterator[list[str]]:
+    """Collects every statement the app's engine sends while the block runs."""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
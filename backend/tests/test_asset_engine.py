@@ -0,0 +1,198 @@
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.asset_snapshot import AssetSnapshot, TriggerType
+from app.schemas.food import FoodRecordCreate
+from app.schemas.weight import WeightRecordCreate, WeightRecordUpdate
+from app.services import asset_engine, asset_service, food_service, weight_service
+
+
+async def _ledger(user_id, db) -> list[tuple[date, float, str]]:
+    result = await db.execute(
+        select(AssetSnapshot.snapshot_date, AssetSnapshot.asset_value, AssetSnapshot.trigger_type)
+        .where(AssetSnapshot.user_id == user_id)
+        .order_by(AssetSnapshot.snapshot_date, AssetSnapshot.seq)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def test_backdated_meal_matches_replay(db, user):
+    """A meal logged for a past day earns the streak of that day, as a re-derive gives it."""
+    today = date.today()
+    for offset in range(10, 4, -1):
+        await weight_service.create_weight_record(
+            user.id,
+            WeightRecordCreate(weight_kg=80 - offset / 10, recorded_date=today - timedelta(days=offset)),
+            db,
+        )
+    # Six active days before it, none since: a streak as of its day, none as of today
+    await food_service.create_food_record(
+        user,
+        FoodRecordCreate(
+            recorded_date=today - timedelta(days=4), items=[{"name": "rice", "calories": 600}]
+        ),
+        db,
+    )
+    live = await _ledger(user.id, db)
+    assert (today - timedelta(days=4), TriggerType.streak_bonus) in {
+        (day, trigger) for day, _, trigger in live
+    }
+
+    await asset_engine.rederive_from(user.id, today - timedelta(days=30), db)
+    await db.commit()
+    assert await _ledger(user.id, db) == live
+
+
+async def _replayed(user_id, db) -> list[tuple[date, float, str]]:
+    """The ledger as re-deriving it from scratch gives it."""
+    await asset_engine.rederive_from(user_id, date.today() - timedelta(days=30), db)
+    await db.commit()
+    return await _ledger(user_id, db)
+
+
+async def test_backdated_weight_matches_replay(db, user):
+    """A weigh-in slotted between two others rescores the one after it."""
+    today = date.today()
+    for offset, weight in ((3, 80.0), (1, 79.0), (0, 79.5)):
+        await weight_service.create_weight_record(
+            user.id, WeightRecordCreate(weight_kg=weight, recorded_date=today - timedelta(days=offset)), db
+        )
+    await weight_service.create_weight_record(
+        user.id, WeightRecordCreate(weight_kg=78.5, recorded_date=today - timedelta(days=2)), db
+    )
+    live = await _ledger(user.id, db)
+    # 79.0 after 78.5 is a gain, where it was a loss after 80.0
+    assert (today - timedelta(days=1), TriggerType.weight_up) in {
+        (day, trigger) for day, _, trigger in live
+    }
+    assert await _replayed(user.id, db) == live
+
+
+async def test_backdated_meal_rescores_later_streaks(db, user):
+    """A meal filling a gap in the log earns the later days their streak bonus."""
+    today = date.today()
+    for offset in (6, 5, 3, 2, 1):
+        await food_service.create_food_record(
+            user,
+            FoodRecordCreate(
+                recorded_date=today - timedelta(days=offset), items=[{"name": "rice", "calories": 600}]
+            ),
+            db,
+        )
+    assert TriggerType.streak_bonus not in {trigger for _, _, trigger in await _ledger(user.id, db)}
+
+    await food_service.create_food_record(
+        user,
+        FoodRecordCreate(
+            recorded_date=today - timedelta(days=4), items=[{"name": "soup", "calories": 300}]
+        ),
+        db,
+    )
+    live = await _ledger(user.id, db)
+    assert (today - timedelta(days=1), TriggerType.streak_bonus) in {
+        (day, trigger) for day, _, trigger in live
+    }
+    assert await _replayed(user.id, db) == live
+
+
+async def _open_ledger(user_id, day: date, db) -> None:
+    """Start the ledger on ``day``, so records from then on are scored live."""
+    await asset_engine.open_ledger_at(user_id, day, db)
+    await asset_engine.rederive_from(user_id, day, db)
+    await db.commit()
+
+
+async def test_daily_mode_keeps_a_row_per_day_and_trigger(db, user, monkeypatch):
+    monkeypatch.setattr(settings, "ASSET_SNAPSHOT_MODE", "daily")
+    start = date.today() - timedelta(days=5)
+    first, second = start + timedelta(days=1), start + timedelta(days=2)
+    await _open_ledger(user.id, start, db)
+
+    async def weigh(day: date, weight_kg: float) -> None:
+        await weight_service.create_weight_record(
+            user.id, WeightRecordCreate(weight_kg=weight_kg, recorded_date=day), db
+        )
+
+    async def eat(day: date, calories: int) -> None:
+        await food_service.create_food_record(
+            user, FoodRecordCreate(recorded_date=day, items=[{"name": "rice", "calories": calories}]), db
+        )
+
+    await weigh(first, 80)
+    await eat(first, 500)
+    await eat(first, 700)
+    await weigh(second, 79)
+    # Measured from the last reading before the day, like the first one of the day
+    await weigh(second, 78.5)
+    await eat(second, 600)
+
+    result = await db.execute(
+        select(
+            AssetSnapshot.snapshot_date,
+            AssetSnapshot.trigger_type,
+            AssetSnapshot.event_count,
+            AssetSnapshot.delta,
+            AssetSnapshot.asset_value,
+        )
+        .where(AssetSnapshot.user_id == user.id)
+        .order_by(AssetSnapshot.snapshot_date, AssetSnapshot.seq)
+    )
+    rows = result.all()
+    assert [(row[0], row[1], row[2]) for row in rows] == [
+        (start, TriggerType.initial, 1),
+        (first, TriggerType.weight_initial, 1),
+        (first, TriggerType.food_logged, 2),
+        (second, TriggerType.weight_down, 2),
+        (second, TriggerType.food_logged, 1),
+    ]
+    # A day's row holds its latest value and the sum of its events' deltas
+    before, weight_down = rows[2].asset_value, rows[3]
+    rate = asset_engine.WEIGHT_DOWN_RATE
+    assert weight_down.asset_value == round(round(before * (1 + 10 * rate), 4) * (1 + 15 * rate), 4)
+    assert weight_down.delta == pytest.approx(weight_down.asset_value - before, abs=1e-3)
+
+    live = await _ledger(user.id, db)
+    assert await _replayed(user.id, db) == live
+
+
+def _first_extremes(ledger: list[tuple[date, float, str]]) -> tuple[tuple, tuple]:
+    """(value, first date reached) of the ledger's high and of its low."""
+    high = max(ledger, key=lambda row: (row[1], -row[0].toordinal()))
+    low = min(ledger, key=lambda row: (row[1], row[0].toordinal()))
+    return (high[1], high[0]), (low[1], low[0])
+
+
+async def test_all_time_high_and_low_keep_the_day_first_reached(db, user):
+    start = date.today() - timedelta(days=6)
+    await _open_ledger(user.id, start, db)
+    records = []
+    for offset, weight_kg in enumerate([80, 79, 81, 80.5], start=1):
+        records.append(await weight_service.create_weight_record(
+            user.id,
+            WeightRecordCreate(weight_kg=weight_kg, recorded_date=start + timedelta(days=offset)),
+            db,
+        ))
+
+    async def extremes() -> tuple[tuple, tuple]:
+        current = await asset_service.get_current_asset(user, db)
+        return (
+            (current.all_time_high, current.all_time_high_date),
+            (current.all_time_low, current.all_time_low_date),
+        )
+
+    # Up on the second weigh-in, down below the start on the third
+    high, low = await extremes()
+    assert (high[1], low[1]) == (start + timedelta(days=2), start + timedelta(days=3))
+    assert (high, low) == _first_extremes(await _ledger(user.id, db))
+
+    # Without that gain the high is the opening value, reached again on the first
+    # weigh-in's day but first on the ledger's
+    await weight_service.update_weight_record(
+        user.id, records[1].id, WeightRecordUpdate(weight_kg=80), db
+    )
+    high, low = await extremes()
+    assert (high, low[1]) == ((settings.INITIAL_ASSET_VALUE, start), start + timedelta(days=3))
+    assert (high, low) == _first_extremes(await _ledger(user.id, db))
@@ -0,0 +1,94 @@
+import asyncio
+import uuid
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+from pydantic import TypeAdapter
+
+from app.core import cache, redis_client
+
+_INT = TypeAdapter(int)
+
+
+@pytest.fixture
+def server(monkeypatch) -> fakeredis.FakeServer:
+    """A fresh in-memory Redis behind the shared client, breaker closed."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_client, "_client", aioredis.FakeRedis(server=server))
+    monkeypatch.setattr(redis_client, "_down_until", 0.0)
+    return server
+
+
+class Loads:
+    """A load counting its calls; each returns the next number."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.calls
+
+
+async def test_miss_then_hit(server):
+    user_id, load = uuid.uuid4(), Loads()
+    assert await cache.cached(user_id, "view", _INT, load) == 1
+    assert await cache.cached(user_id, "view", _INT, load) == 1
+    assert load.calls == 1
+
+
+async def test_invalidate_drops_every_view(server):
+    user_id, load = uuid.uuid4(), Loads()
+    await cache.cached(user_id, "a", _INT, load)
+    await cache.cached(user_id, "b", _INT, load)
+    await cache.invalidate_user(user_id)
+    assert await cache.cached(user_id, "a", _INT, load) == 3
+    assert await cache.cached(user_id, "b", _INT, load) == 4
+
+
+async def test_fill_racing_a_write_is_not_stored(server):
+    user_id = uuid.uuid4()
+
+    async def load_then_write() -> int:
+        await cache.invalidate_user(user_id)
+        return 1
+
+    assert await cache.cached(user_id, "view", _INT, load_then_write) == 1
+    load = Loads()
+    assert await cache.cached(user_id, "view", _INT, load) == 1
+    assert load.calls == 1
+
+
+async def test_concurrent_misses_share_one_load(server):
+    user_id, load = uuid.uuid4(), Loads(delay=0.05)
+    values = await asyncio.gather(*[
+        cache.cached(user_id, "view", _INT, load, 7) for _ in range(5)
+    ])
+    assert values == [1] * 5
+    assert load.calls == 1
+
+
+async def test_newer_version_does_not_join_older_load(server):
+    user_id, load = uuid.uuid4(), Loads(delay=0.05)
+    before = asyncio.create_task(cache.cached(user_id, "view", _INT, load, 7))
+    await asyncio.sleep(0)
+    # A write lands and bumps the version while the first load runs
+    await cache.invalidate_user(user_id)
+    after = await cache.cached(user_id, "view", _INT, load, 8)
+    assert (await before, after) == (1, 2)
+
+
+async def test_breaker_opens_on_error_and_falls_back(server):
+    user_id, load = uuid.uuid4(), Loads()
+    server.connected = False
+    errors = cache.metrics()["errors"]
+    assert await cache.cached(user_id, "view", _INT, load) == 1
+    assert cache.metrics()["errors"] == errors + 1
+    assert redis_client.get_client() is None
+
+    bypassed = cache.metrics()["bypassed"]
+    assert await cache.cached(user_id, "view", _INT, load) == 2
+    assert cache.metrics()["bypassed"] == bypassed + 1
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+
+from sqlalchemy import select
+
+from app.models.asset_candle import CandleGranularity
+from app.models.asset_snapshot import AssetSnapshot
+from app.schemas.food import FoodRecordCreate
+from app.schemas.weight import WeightRecordCreate
+from app.services import asset_engine, candle_service, food_service, weight_service
+from tests.test_asset_engine import _open_ledger
+
+
+async def _candles(user_id, granularity, since: date, db) -> list[tuple]:
+    candles = await candle_service.get_candles(user_id, granularity, since, db)
+    return [(c.period_start, c.open, c.high, c.low, c.close, c.volume) for c in candles]
+
+
+async def _expected(user_id, granularity, db) -> list[tuple]:
+    """The candles of ``granularity`` folded by hand from the ledger."""
+    result = await db.execute(
+        select(AssetSnapshot.snapshot_date, AssetSnapshot.asset_value, AssetSnapshot.event_count)
+        .where(AssetSnapshot.user_id == user_id)
+        .order_by(AssetSnapshot.snapshot_date, AssetSnapshot.seq)
+    )
+    candles: list[list] = []
+    previous = None
+    for day, value, events in result.all():
+        start = candle_service.period_start(day, granularity)
+        if not candles or candles[-1][0] != start:
+            opened = previous if previous is not None else value
+            candles.append([start, opened, max(opened, value), min(opened, value), value, events])
+        else:
+            candle = candles[-1]
+            candle[2], candle[3] = max(candle[2], value), min(candle[3], value)
+            candle[4] = value
+            candle[5] += events
+        previous = value
+    return [tuple(candle) for candle in candles]
+
+
+async def test_candles_across_a_week_boundary(db, user):
+    today = date.today()
+    # Saturday to Tuesday, with the week starting on the Monday in between
+    saturday = today - timedelta(days=today.weekday() + 9)
+    await _open_ledger(user.id, saturday, db)
+    for offset, weight_kg in enumerate([80, 79, 81, 80]):
+        day = saturday + timedelta(days=offset)
+        await weight_service.create_weight_record(
+            user.id, WeightRecordCreate(weight_kg=weight_kg, recorded_date=day), db
+        )
+        await food_service.create_food_record(
+            user, FoodRecordCreate(recorded_date=day, items=[{"name": "rice", "calories": 600}]), db
+        )
+
+    days = await _candles(user.id, CandleGranularity.day, saturday, db)
+    weeks = await _candles(user.id, CandleGranularity.week, saturday, db)
+    assert days == await _expected(user.id, CandleGranularity.day, db)
+    assert weeks == await _expected(user.id, CandleGranularity.week, db)
+    assert [candle[0] for candle in days] == [saturday + timedelta(days=n) for n in range(4)]
+    monday = saturday + timedelta(days=2)
+    assert [candle[0] for candle in weeks] == [monday - timedelta(days=7), monday]
+    # Each period opens where the one before it closed
+    assert weeks[1][1] == weeks[0][4]
+    assert all(later[1] == earlier[4] for earlier, later in zip(days, days[1:]))
+    # The weekend's initial snapshot, two weigh-ins and two meals
+    assert weeks[0][5] == 5
+
+    # Rebuilding from the snapshots gives the candles the live upserts kept
+    await asset_engine.rederive_from(user.id, saturday, db)
+    await db.commit()
+    assert await _candles(user.id, CandleGranularity.day, saturday, db) == days
+    assert await _candles(user.id, CandleGranularity.week, saturday, db) == weeks
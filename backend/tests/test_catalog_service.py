@@ -0,0 +1,153 @@
+import asyncio
+import bisect
+import random
+import statistics
+import time
+import uuid
+
+import pytest
+from sqlalchemy import insert, text
+
+from app.models.food_catalog import FoodCatalogEntry
+from app.services import catalog_service
+
+BENCHMARK_NAMES = 1_000_000
+TIMED_SEARCHES = 2000
+
+# Three words of two out of 20 syllables per name, unique for i below 1,120,000
+_SYLLABLES = "'bakorinesutamilopegudafihojavewuzecasara'"
+_WORD = (
+    f"substr({_SYLLABLES}, 1 + 2 * (({{n}}) % 20), 2) || "
+    f"substr({_SYLLABLES}, 1 + 2 * (({{n}}) / 20 % 20), 2)"
+)
+_BENCHMARK_NAME = " || ' ' || ".join([
+    _WORD.format(n="i % 400"),
+    _WORD.format(n="i / 400 % 400"),
+    _WORD.format(n="i / 160000 + 3 * (i % 7)"),
+])
+
+
+async def _seed(db, counts: dict[str, int]) -> None:
+    await db.execute(insert(FoodCatalogEntry), [
+        dict(normalized_name=name, name=name, log_count=count, calorie_sum=100 * count)
+        for name, count in counts.items()
+    ])
+    await db.commit()
+
+
+def _tag() -> str:
+    """A word no other test's names start with."""
+    return "t" + uuid.uuid4().hex[:8]
+
+
+def _scanned(index: catalog_service.FoodIndex, prefix: str) -> list[str]:
+    lo = bisect.bisect_left(index._keys, prefix)
+    hi = bisect.bisect_left(index._keys, prefix + "\U0010ffff")
+    return index._best(index._names(lo, hi))
+
+
+async def test_search_waits_for_the_first_load(db):
+    tag = _tag()
+    await _seed(db, {f"{tag} soup": 5, f"{tag} salad": 9, f"green {tag}": 7})
+    index = catalog_service.FoodIndex()
+    index.start()
+    try:
+        assert not index.ready
+        assert index.search(tag, 5) == []
+        async with asyncio.timeout(10):
+            while not index.ready:
+                await asyncio.sleep(0.01)
+        assert [entry.name for entry in index.search(tag, 5)] == [
+            f"{tag} salad", f"green {tag}", f"{tag} soup"
+        ]
+    finally:
+        await index.close()
+
+
+async def test_top_lists_match_a_scan(db):
+    tag = _tag()
+    rng = random.Random(7)
+    await _seed(db, {
+        f"{tag}{n:03d} {rng.choice(['soup', 'rice'])}": rng.randint(1, 100) for n in range(600)
+    })
+    index = catalog_service.FoodIndex()
+    await index.refresh()
+    kept = [prefix for prefix in index._top if prefix.startswith(tag[:1])]
+    assert tag in kept
+    for prefix in kept:
+        assert index._top[prefix] == _scanned(index, prefix), prefix
+
+    # A merged name overtaking the rest is promoted into the kept lists
+    tally = catalog_service.CatalogTally()
+    for _ in range(200):
+        tally.add(f"{tag}999 pie", 300, None, "other")
+    index.observe(tally)
+    await index.flush()
+    await index.refresh()
+    assert index.search(tag, 1)[0].name == f"{tag}999 pie"
+    for prefix in kept:
+        assert index._top[prefix] == _scanned(index, prefix), prefix
+
+
+async def test_suggest_falls_back_while_loading(db, user, trgm, monkeypatch):
+    tag = _tag()
+    await _seed(db, {f"{tag} soup": 3, f"{tag} stew": 2})
+    monkeypatch.setattr(catalog_service, "index", catalog_service.FoodIndex())
+    suggestions = await catalog_service.suggest(user, tag, 10, db)
+    assert {item.name for item in suggestions} == {f"{tag} soup", f"{tag} stew"}
+    assert {item.source for item in suggestions} == {"catalog"}
+
+
+@pytest.mark.benchmark
+async def test_search_latency_at_a_million_names(db):
+    """Load time, longest event loop stall while loading, and search p50/p99."""
+    await db.execute(text(
+        "INSERT INTO food_catalog (id, normalized_name, name, pixel_icon_type, log_count, "
+        "calorie_sum, measured_calories, measured_grams) "
+        f"SELECT gen_random_uuid(), name, name, 'other', 1 + i % 1009 * 7919 % 1000, 0, 0, 0 "
+        f"FROM (SELECT i, {_BENCHMARK_NAME} AS name "
+        f"FROM generate_series(0, {BENCHMARK_NAMES - 1}) AS i) AS names"
+    ))
+    await db.commit()
+    try:
+        index = catalog_service.FoodIndex()
+        stalls = []
+
+        async def probe() -> None:
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0)
+                stalls.append(time.perf_counter() - started)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await index.refresh()
+        load = time.perf_counter() - started
+        prober.cancel()
+        assert len(index) >= BENCHMARK_NAMES
+
+        rng = random.Random(1)
+        names = rng.sample(sorted(index._entries), TIMED_SEARCHES)
+        queries = []
+        for name in names:
+            words = name.split(" ")
+            tail = " ".join(words[rng.randrange(len(words)):])
+            queries.append(tail[: rng.randint(1, 10)])
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, catalog_service.MAX_SUGGESTIONS)
+            timings.append(time.perf_counter() - started)
+        p50 = statistics.median(timings)
+        p99 = statistics.quantiles(timings, n=100)[98]
+        print(
+            f"load {load:.1f} s, longest stall {max(stalls) * 1000:.0f} ms, "
+            f"search p50 {p50 * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms"
+        )
+        assert p99 < 0.005
+    finally:
+        await db.execute(text(
+            f"DELETE FROM food_catalog WHERE normalized_name IN (SELECT {_BENCHMARK_NAME} "
+            f"FROM generate_series(0, {BENCHMARK_NAMES - 1}) AS i)"
+        ))
+        await db.commit()
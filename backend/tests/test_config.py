@@ -0,0 +1,25 @@
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("ASSET_SNAPSHOT_MODE", "dialy"),
+        ("ASSET_WEIGHT_SIGNAL", "smoothed"),
+        ("ASSET_ARCHIVE_AFTER_MONTHS", "0"),
+    ],
+)
+def test_bad_values_are_rejected_at_startup(monkeypatch, name, value):
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValidationError, match=name):
+        Settings(_env_file=None)
+
+
+def test_mode_settings_accept_their_values(monkeypatch):
+    monkeypatch.setenv("ASSET_SNAPSHOT_MODE", "daily")
+    monkeypatch.setenv("ASSET_WEIGHT_SIGNAL", "trend")
+    settings = Settings(_env_file=None)
+    assert (settings.ASSET_SNAPSHOT_MODE, settings.ASSET_WEIGHT_SIGNAL) == ("daily", "trend")
@@ -0,0 +1,67 @@
+from collections.abc import AsyncIterator
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from app.core.security import create_access_token
+from app.main import API_PREFIX, app
+
+
+@pytest.fixture
+async def client(user) -> AsyncIterator[httpx.AsyncClient]:
+    """The app, without its lifespan, signed in as ``user``."""
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=f"http://test{API_PREFIX}",
+        headers={"Authorization": f"Bearer {create_access_token(str(user.id))}"},
+    ) as client:
+        yield client
+
+
+async def test_matching_etag_is_answered_with_304(client):
+    url = f"/food/records?target_date={date.today()}"
+    first = await client.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    # Weak comparison: the strong form and a list containing it match too
+    for if_none_match in (etag, etag.removeprefix("W/"), f'W/"other", {etag}', "*"):
+        response = await client.get(url, headers={"If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+    response = await client.get(url, headers={"If-None-Match": 'W/"other"'})
+    assert response.status_code == 200
+    # Another URL of the same user has a tag of its own
+    other = await client.get(f"/food/records?target_date={date.today() - timedelta(days=1)}")
+    assert other.headers["ETag"] != etag
+
+
+async def test_past_days_are_revalidated(client):
+    day = date.today() - timedelta(days=3)
+    urls = [
+        f"/food/records?target_date={day}",
+        f"/dashboard/calendar?start={day - timedelta(days=7)}&end={day}",
+    ]
+    before = {}
+    for url in urls:
+        response = await client.get(url)
+        assert response.headers["Cache-Control"] == "private, no-cache"
+        before[url] = response
+
+    # A meal logged for the day afterwards shows up on the next revalidation
+    meal = await client.post(
+        "/food/record",
+        json={"recorded_date": str(day), "items": [{"name": "rice", "calories": 400}]},
+    )
+    assert meal.status_code == 201
+    for url in urls:
+        response = await client.get(url, headers={"If-None-Match": before[url].headers["ETag"]})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != before[url].headers["ETag"]
+        assert response.json() != before[url].json()
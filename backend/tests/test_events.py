@@ -0,0 +1,79 @@
+import asyncio
+from datetime import date
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+
+from app.core import events, redis_client
+from app.database import AsyncSessionLocal, engine
+from app.routers import dashboard
+from app.schemas.food import FoodRecordCreate
+from app.services import food_service
+from tests.conftest import make_user
+
+SSE_CLIENTS = 200
+USERS = 10
+
+
+@pytest.fixture
+async def server(monkeypatch) -> fakeredis.FakeServer:
+    """One in-memory Redis for publishing and for the broker's subscription."""
+    server = fakeredis.FakeServer()
+
+    class FakeRedis(aioredis.FakeRedis):
+        @classmethod
+        def from_url(cls, url, **kwargs):
+            return cls(server=server)
+
+    monkeypatch.setattr(events, "Redis", FakeRedis)
+    monkeypatch.setattr(redis_client, "_client", FakeRedis(server=server))
+    monkeypatch.setattr(redis_client, "_down_until", 0.0)
+    yield server
+    # Let the reader go idle first: on Python 3.11 a cancel landing inside
+    # fakeredis's timed read can be swallowed
+    await asyncio.sleep(events.READ_TIMEOUT_SECONDS + 0.1)
+    await events.broker.close()
+
+
+async def _open_stream(user):
+    # As the route runs it: the session used to authenticate is still checked out
+    session = AsyncSessionLocal()
+    await session.connection()
+    response = await dashboard.stream_dashboard(current_user=user, db=session)
+    body = response.body_iterator
+    assert (await anext(body)).startswith(b"event: ready")
+    return body
+
+
+async def test_streams_share_one_subscription_and_no_database_connection(db, server):
+    users = [await make_user(db) for _ in range(USERS)]
+    await db.close()
+    client = redis_client.get_client()
+    channels = [events._channel(user.id) for user in users]
+
+    streams = [await _open_stream(users[n % USERS]) for n in range(SSE_CLIENTS)]
+    try:
+        assert engine.pool.checkedout() == 0
+        assert events.broker.connection_count() == SSE_CLIENTS
+        # One subscription per user on the worker's single pub/sub connection
+        async with asyncio.timeout(5):
+            while dict(await client.pubsub_numsub(*channels)) != {
+                channel.encode(): 1 for channel in channels
+            }:
+                await asyncio.sleep(0.01)
+        assert await client.pubsub_numpat() == 0
+
+        async with AsyncSessionLocal() as session:
+            await food_service.create_food_record(
+                users[0],
+                FoodRecordCreate(recorded_date=date.today(), items=[{"name": "rice", "calories": 500}]),
+                session,
+            )
+        for body in streams[::USERS]:
+            frames = await asyncio.wait_for(anext(body), timeout=5)
+            assert b"event: calories" in frames
+    finally:
+        for body in streams:
+            await body.aclose()
+    assert events.broker.connection_count() == 0
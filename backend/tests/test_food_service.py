@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+
+from app.config import settings
+from app.models.food_record import FoodRecord
+from app.schemas.food import FoodRecordCreate
+from app.services import food_service, nutrition_service
+from tests.conftest import count_statements
+
+# Statements per food log, after the request's user lookup (see create_food_record)
+FOOD_LOG_STATEMENTS = 4
+
+
+def _meal(day: date) -> FoodRecordCreate:
+    return FoodRecordCreate(
+        recorded_date=day, items=[{"name": "rice", "calories": 350}, {"name": "egg", "calories": 80}]
+    )
+
+
+async def test_food_log_statement_budget(db, user, monkeypatch):
+    # "daily" snapshot mode also reads the day's snapshot row and upserts the candles apart
+    monkeypatch.setattr(settings, "ASSET_SNAPSHOT_MODE", "event")
+    today = date.today()
+    await food_service.create_food_record(user, _meal(today), db)
+    with count_statements() as statements:
+        record = await food_service.create_food_record(user, _meal(today), db)
+    assert len(statements) == FOOD_LOG_STATEMENTS
+
+    stored = await food_service.get_daily_food_records(user.id, today, db)
+    assert [(meal.id, meal.total_calories, len(meal.items)) for meal in stored][-1] == (
+        record.id, 430, 2
+    )
+    assert stored[-1].created_at == record.created_at
+
+
+async def test_range_pages_split_days_and_keep_their_totals(db, user):
+    today = date.today()
+    first = today - timedelta(days=3)
+    for offset, calories in ((0, 300), (0, 400), (1, 500), (2, 600), (2, 700), (2, 800)):
+        await food_service.create_food_record(
+            user,
+            FoodRecordCreate(
+                recorded_date=first + timedelta(days=offset),
+                items=[{"name": "rice", "calories": calories}],
+            ),
+            db,
+        )
+    # Two records of a day logged at the same instant, ordered by id
+    tied = datetime.now(timezone.utc)
+    await db.execute(insert(FoodRecord), [
+        dict(user_id=user.id, recorded_date=first + timedelta(days=1), total_calories=calories,
+             created_at=tied)
+        for calories in (100, 200)
+    ])
+    await nutrition_service.add_nutrition(
+        user.id, first + timedelta(days=1), db, calories=300, meals=2
+    )
+    await db.commit()
+
+    result = await db.execute(
+        select(FoodRecord.id, FoodRecord.recorded_date, FoodRecord.total_calories)
+        .where(FoodRecord.user_id == user.id)
+        .order_by(FoodRecord.recorded_date, FoodRecord.created_at, FoodRecord.id)
+    )
+    expected = result.all()
+    day_totals = {}
+    for _, day, calories in expected:
+        day_totals[day] = day_totals.get(day, 0) + calories
+
+    pages, cursor = [], None
+    while True:
+        page = await food_service.get_food_records_range(user.id, first, today, cursor, 2, db)
+        pages.append(page)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert len(pages) == 4
+    assert [
+        (record.id, day.date) for page in pages for day in page.days for record in day.records
+    ] == [(record_id, day) for record_id, day, _ in expected]
+    # A day split over pages carries its whole total on each of them
+    for page in pages:
+        assert all(day.total_calories == day_totals[day.date] for day in page.days)
+    assert [day.date for day in pages[1].days] == [first + timedelta(days=1)]
+    assert [day.date for day in pages[2].days] == [first + timedelta(days=1), first + timedelta(days=2)]
@@ -0,0 +1,98 @@
+import math
+import statistics
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from app.models.weight_forecast import WeightForecast
+from app.models.weight_record import WeightRecord
+from app.schemas.weight import WeightFit, WeightRecordCreate
+from app.services import forecast_service, trend_service, weight_service
+from tests.conftest import make_user
+
+DAYS = 30
+SLOPE = -0.1
+
+
+def _line(offset: int) -> float:
+    """A reading on the line, a little above or below it on alternate days."""
+    return 90 + SLOPE * offset + (0.05 if offset % 2 else -0.05)
+
+
+async def _log(db, user, weights: list[float]) -> list[date]:
+    """One reading a day up to yesterday; the trend rewrite refits."""
+    start = date.today() - timedelta(days=len(weights))
+    days = [start + timedelta(days=offset) for offset in range(len(weights))]
+    await db.execute(insert(WeightRecord), [
+        dict(user_id=user.id, weight_kg=weight, recorded_date=day)
+        for day, weight in zip(days, weights)
+    ])
+    await trend_service.rederive_trend(user.id, start, db)
+    await db.commit()
+    return days
+
+
+async def _fit(user_id, db) -> WeightFit:
+    row = await db.scalar(select(WeightForecast).where(WeightForecast.user_id == user_id))
+    return WeightFit.model_validate(row)
+
+
+async def test_fit_drops_an_outlier(db, user):
+    weights = [_line(offset) for offset in range(DAYS)]
+    outlier = 10
+    weights[outlier] += 5
+    days = await _log(db, user, weights)
+
+    fit = await _fit(user.id, db)
+    assert (fit.fitted_on, fit.point_count) == (days[-1], DAYS - 1)
+    # The same line fitted by hand without the outlier, x counted back from the last day
+    kept = [offset for offset in range(DAYS) if offset != outlier]
+    slope, intercept = statistics.linear_regression(
+        [offset - (DAYS - 1) for offset in kept], [weights[offset] for offset in kept]
+    )
+    assert fit.slope_kg_per_day == pytest.approx(slope)
+    assert fit.intercept_kg == pytest.approx(intercept)
+    assert fit.slope_kg_per_day == pytest.approx(SLOPE, abs=0.01)
+    assert 0 < fit.slope_stderr < 0.01
+
+
+async def test_too_few_readings_give_no_eta(db):
+    user = await make_user(db, goal_weight=80)
+    days = await _log(
+        db, user, [_line(offset) for offset in range(forecast_service.MIN_FIT_POINTS - 1)]
+    )
+    forecast = await forecast_service.get_goal_forecast(user, db)
+    assert (forecast.status, forecast.point_count, forecast.eta) == (
+        "insufficient_data", forecast_service.MIN_FIT_POINTS - 1, None
+    )
+
+    # A fifth, earlier, reading is enough
+    await weight_service.create_weight_record(
+        user.id, WeightRecordCreate(weight_kg=_line(-1), recorded_date=days[0] - timedelta(days=1)), db
+    )
+    forecast = await forecast_service.get_goal_forecast(user, db)
+    assert (forecast.status, forecast.point_count) == ("on_track", forecast_service.MIN_FIT_POINTS)
+
+
+def test_eta_band_follows_the_slope_error():
+    fitted_on = date(2026, 1, 1)
+    fit = WeightFit(
+        fitted_on=fitted_on,
+        point_count=20,
+        slope_kg_per_day=-0.1,
+        intercept_kg=80.0,
+        slope_stderr=0.01,
+    )
+    forecast = forecast_service.project(75.0, fit)
+    margin = forecast_service.BAND_Z * 0.01
+    assert forecast.status == "on_track"
+    assert forecast.eta == fitted_on + timedelta(days=50)
+    assert forecast.eta_earliest == fitted_on + timedelta(days=math.ceil(5 / (0.1 + margin)))
+    assert forecast.eta_latest == fitted_on + timedelta(days=math.ceil(5 / (0.1 - margin)))
+    assert forecast.eta_earliest < forecast.eta < forecast.eta_latest
+    assert forecast.weekly_change_kg == -0.7
+
+    # Moving away from the goal never gets there
+    assert forecast_service.project(85.0, fit).status == "off_track"
+    assert forecast_service.project(80.1, fit).status == "reached"
@@ -0,0 +1,73 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.weight_record import WeightRecord
+from app.schemas.food import FoodRecordCreate
+from app.services import asset_engine, food_service, import_service
+from tests.test_write_concurrency import _ledger
+
+DAYS = 40
+
+
+def _history_jsonl(days: int) -> list[bytes]:
+    start = date.today() - timedelta(days=days)
+    lines = []
+    for offset in range(days):
+        day = (start + timedelta(days=offset)).isoformat()
+        lines.append(f'{{"type": "weight", "recorded_date": "{day}", "weight_kg": {90 - offset / 10}}}\n')
+        lines.append(
+            f'{{"type": "food", "recorded_date": "{day}", "meal_type": "lunch", '
+            f'"items": [{{"name": "rice", "calories": 600}}]}}\n'
+        )
+    return [line.encode() for line in lines]
+
+
+async def _chunks(lines: list[bytes], gate: asyncio.Event | None = None):
+    for n, line in enumerate(lines):
+        if gate is not None and n == len(lines) // 2:
+            await gate.wait()
+        yield line
+
+
+async def _in_session_import(user_id, chunks):
+    async with AsyncSessionLocal() as session:
+        return await import_service.import_records(user_id, chunks, "jsonl", session)
+
+
+async def test_import_matches_replay(db, user):
+    result = await import_service.import_records(user.id, _chunks(_history_jsonl(DAYS)), "jsonl", db)
+    assert (result.weight_records, result.food_records, result.food_items) == (DAYS, DAYS, DAYS)
+
+    live = await _ledger(user.id, db)
+    async with AsyncSessionLocal() as replay:
+        await asset_engine.rederive_from(user.id, date.today() - timedelta(days=DAYS + 1), replay)
+        await replay.commit()
+    assert await _ledger(user.id, db) == live
+
+
+async def test_invalid_rows_store_nothing(db, user):
+    lines = _history_jsonl(3) + [b'{"type": "weight", "recorded_date": "soon"}\n', b"[]\n"]
+    with pytest.raises(HTTPException) as raised:
+        await import_service.import_records(user.id, _chunks(lines), "jsonl", db)
+    assert raised.value.status_code == 422
+    assert [error["line"] for error in raised.value.detail] == [7, 8]
+    assert await db.scalar(select(func.count()).where(WeightRecord.user_id == user.id)) == 0
+
+
+async def test_upload_does_not_hold_the_write_lock(db, user):
+    """The user's writes go ahead while their import is still being uploaded."""
+    gate = asyncio.Event()
+    upload = asyncio.create_task(_in_session_import(user.id, _chunks(_history_jsonl(DAYS), gate)))
+    await asyncio.sleep(0.1)
+    async with AsyncSessionLocal() as session:
+        meal = FoodRecordCreate(recorded_date=date.today(), items=[{"name": "tea", "calories": 5}])
+        await asyncio.wait_for(food_service.create_food_record(user, meal, session), timeout=5)
+    assert not upload.done()
+    gate.set()
+    result = await asyncio.wait_for(upload, timeout=30)
+    assert result.weight_records == DAYS
@@ -0,0 +1,55 @@
+import calendar
+from datetime import date, timedelta
+
+from app.schemas.food import FoodItemAdd, FoodRecordCreate
+from app.services import food_service, nutrition_service
+
+
+async def _meal(db, user, day: date, *calories: int):
+    return await food_service.create_food_record(
+        user,
+        FoodRecordCreate(
+            recorded_date=day, items=[{"name": "rice", "calories": c} for c in calories]
+        ),
+        db,
+    )
+
+
+async def test_week_stats_split_at_monday(db, user):
+    today = date.today()
+    monday = today - timedelta(days=today.weekday())
+    sunday = monday - timedelta(days=1)
+    sunday_meal = await _meal(db, user, sunday, 1000, 800)
+    monday_meal = await _meal(db, user, monday, 500)
+    await _meal(db, user, monday, 700)
+    # Item edits move the day totals in and out of the 1600-2200 target band
+    await food_service.add_food_item(
+        user.id, FoodItemAdd(food_record_id=monday_meal.id, name="bread", calories=900), db
+    )
+    await food_service.delete_food_item(user.id, sunday_meal.items[1].id, db)
+
+    last_week = await nutrition_service.get_nutrition_stats(user, "week", sunday, db)
+    assert (last_week.start, last_week.end) == (sunday - timedelta(days=6), sunday)
+    assert [(day.nutrition_date, day.total_calories) for day in last_week.days] == [(sunday, 1000)]
+    assert (
+        last_week.days_logged, last_week.days_in_target, last_week.meal_count, last_week.item_count
+    ) == (1, 0, 1, 1)
+
+    this_week = await nutrition_service.get_nutrition_stats(user, "week", today, db)
+    assert (this_week.start, this_week.end) == (monday, monday + timedelta(days=6))
+    assert [(day.nutrition_date, day.total_calories) for day in this_week.days] == [(monday, 2100)]
+    assert (
+        this_week.days_logged, this_week.days_in_target, this_week.meal_count, this_week.item_count
+    ) == (1, 1, 2, 3)
+    assert (this_week.total_calories, this_week.average_calories) == (2100, 2100.0)
+
+    # The month holds whichever of the two days fall in it, as the records add up
+    month = await nutrition_service.get_nutrition_stats(user, "month", monday, db)
+    last_day = calendar.monthrange(monday.year, monday.month)[1]
+    assert (month.start, month.end) == (monday.replace(day=1), monday.replace(day=last_day))
+    totals = {}
+    for day in (sunday, monday):
+        if month.start <= day:
+            records = await food_service.get_daily_food_records(user.id, day, db)
+            totals[day] = sum(record.total_calories for record in records)
+    assert {day.nutrition_date: day.total_calories for day in month.days} == totals
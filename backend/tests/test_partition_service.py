@@ -0,0 +1,54 @@
+from datetime import date
+
+from sqlalchemy import func, insert, select
+
+from app.models.asset_snapshot import AssetSnapshot, TriggerType
+from app.services import partition_service
+
+# Far enough back that no other test writes into it
+MONTH = date(2001, 3, 1)
+
+
+async def test_archive_keeps_daily_high_and_low(db, user):
+    day = MONTH.replace(day=14)
+    values = [
+        (1000.0, TriggerType.food_logged),
+        (1080.0, TriggerType.weight_down),  # the day's high
+        (1020.0, TriggerType.food_logged),
+        (950.0, TriggerType.weight_up),  # the day's low
+        (990.0, TriggerType.food_logged),
+        (1010.0, TriggerType.weight_down),
+    ]
+    previous = 1000.0
+    rows = []
+    for seq, (value, trigger) in enumerate(values, start=1):
+        rows.append(dict(
+            user_id=user.id, asset_value=value, delta=value - previous,
+            trigger_type=trigger, snapshot_date=day, seq=seq,
+        ))
+        previous = value
+    await db.execute(insert(AssetSnapshot), rows)
+    await partition_service.ensure_partitions(db, today=MONTH)
+    await db.commit()
+
+    archived = await partition_service.archive_partitions(db, months=1, today=date(2001, 6, 1))
+    await db.commit()
+    assert archived[partition_service.partition_name(MONTH)] == 2
+
+    result = await db.execute(
+        select(AssetSnapshot.asset_value, AssetSnapshot.trigger_type)
+        .where(AssetSnapshot.user_id == user.id, AssetSnapshot.snapshot_date == day)
+        .order_by(AssetSnapshot.seq)
+    )
+    # The groups' last rows (990, 1010) plus the high and the low
+    assert result.all() == [
+        (1080.0, TriggerType.weight_down),
+        (950.0, TriggerType.weight_up),
+        (990.0, TriggerType.food_logged),
+        (1010.0, TriggerType.weight_down),
+    ]
+    totals = await db.execute(
+        select(func.sum(AssetSnapshot.delta), func.sum(AssetSnapshot.event_count))
+        .where(AssetSnapshot.user_id == user.id, AssetSnapshot.snapshot_date == day)
+    )
+    assert tuple(totals.one()) == (10.0, len(values))
@@ -0,0 +1,221 @@
+"""
+Plan regression check for the app's queries.
+
+A workload runs through the services: a user logs, edits, syncs and
+imports weight and food records and then reads every view. Every statement
+it sends is recorded, and each distinct one is EXPLAINed with the
+parameters it was first sent with.
+
+Sequential scans and sorts are priced out before explaining
+(enable_seqscan and enable_sort off), so a Seq Scan or Sort still left in
+a plan means no index can serve the query, however few rows the test
+tables hold. So does an index scan that reads the whole index (no index
+condition) or other users' rows (user_id in its filter, other than on a
+primary key lookup). Only scans of
+the app's own tables count; CTE, VALUES and function scans read no table.
+Likewise only sorts on a column count: a ranking by an aggregate or a
+similarity score has no index to come from, and an incremental sort only
+orders within the groups an index returns in order.
+"""
+
+import json
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import date, timedelta
+
+from pydantic import TypeAdapter
+from sqlalchemy import event, select
+
+from app.database import AsyncSessionLocal, Base, engine
+from app.models.user import User
+from app.schemas.food import FoodItemAdd, FoodRecordCreate
+from app.schemas.sync import SyncOp
+from app.schemas.weight import WeightRecordCreate, WeightRecordUpdate
+from app.services import (
+    activity_service,
+    asset_engine,
+    asset_service,
+    auth_service,
+    catalog_service,
+    dashboard_service,
+    food_service,
+    forecast_service,
+    import_service,
+    nutrition_service,
+    streak_service,
+    sync_service,
+    trend_service,
+    weight_service,
+)
+from tests.conftest import make_user
+
+# Days of weigh-ins and meals the workload logs
+WORKLOAD_DAYS = 45
+# INSERT ... VALUES reads no table; INSERT ... SELECT is caught by the SELECT
+_PLANNED = ("select", "with", "update", "delete")
+_SYNC_OPS = TypeAdapter(list[SyncOp])
+_INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+# A sort key naming a column, as opposed to an expression
+_COLUMN_KEY = re.compile(r"^[\w.]+( DESC)?( NULLS (FIRST|LAST))?$")
+
+
+def _is_app_table(name: str | None) -> bool:
+    if name is None:
+        return False
+    # Month partitions of asset_snapshots are created at run time
+    return name in Base.metadata.tables or name.startswith("asset_snapshots_")
+
+
+def _findings(node: dict) -> list[str]:
+    found = []
+    node_type, table = node["Node Type"], node.get("Relation Name")
+    if node_type == "Seq Scan" and _is_app_table(table):
+        found.append(f"Seq Scan on {table}")
+    elif node_type in _INDEX_SCANS and _is_app_table(table):
+        # Checking the owner of a row looked up by its key reads no one else's rows
+        by_key = node.get("Index Name", "").endswith("_pkey")
+        if "Index Cond" not in node and "Recheck Cond" not in node:
+            found.append(f"{node_type} of all of {node['Index Name']}")
+        elif "user_id" in node.get("Filter", "") and not by_key:
+            found.append(f"{node_type} on {table} filtering by user_id")
+    elif node_type == "Sort":
+        keys = node.get("Sort Key", [])
+        if any(_COLUMN_KEY.match(key) for key in keys):
+            found.append(f"Sort by {', '.join(keys)}")
+    for child in node.get("Plans", []):
+        found.extend(_findings(child))
+    return found
+
+
+async def _plan_problems(workload: Callable[[], Awaitable[None]]) -> list[str]:
+    """Run ``workload`` and explain what it sent; a line per plan that scans or sorts."""
+    sent: dict[str, object] = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        lowered = statement.lstrip().lower()
+        planned = lowered.startswith(_PLANNED) or (
+            lowered.startswith("insert") and " select " in lowered
+        )
+        if planned and statement not in sent:
+            sent[statement] = parameters[0] if executemany else parameters
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await workload()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+    assert sent
+
+    problems = []
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        await conn.exec_driver_sql("SET enable_sort = off")
+        for statement, parameters in sent.items():
+            result = await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)
+            plan = result.scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            findings = _findings(plan[0]["Plan"])
+            if findings:
+                problems.append(f"{', '.join(findings)}: {' '.join(statement.split())}")
+        await conn.rollback()
+    return problems
+
+
+async def _rows(lines: list[str]) -> AsyncIterator[bytes]:
+    yield "".join(line + "\n" for line in lines).encode()
+
+
+async def _writes(user: User, today: date) -> None:
+    user_id = user.id
+    first = today - timedelta(days=WORKLOAD_DAYS)
+    async with AsyncSessionLocal() as db:
+        await auth_service.authenticate_user(user.email, "password1", db)
+        # As get_current_user loads it
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+        weights = []
+        for offset in range(WORKLOAD_DAYS):
+            day = first + timedelta(days=offset)
+            weights.append(await weight_service.create_weight_record(
+                user_id, WeightRecordCreate(weight_kg=85 - offset * 0.1, recorded_date=day), db
+            ))
+            meal = await food_service.create_food_record(
+                user,
+                FoodRecordCreate(recorded_date=day, items=[{"name": "rice", "calories": 350}]),
+                db,
+            )
+        item = await food_service.add_food_item(
+            user_id, FoodItemAdd(food_record_id=meal.id, name="tea", calories=5), db
+        )
+        await food_service.delete_food_item(user_id, item.id, db)
+        await weight_service.update_weight_record(
+            user_id, weights[5].id, WeightRecordUpdate(weight_kg=90), db
+        )
+        await weight_service.delete_weight_record(user_id, weights[6].id, db)
+        await weight_service.create_weight_record(
+            user_id, WeightRecordCreate(weight_kg=88, recorded_date=first), db
+        )
+        await sync_service.apply_batch(user_id, _SYNC_OPS.validate_python([
+            {"op": "weight.create", "key": "w", "data": {
+                "weight_kg": 84, "recorded_date": str(today)}},
+            {"op": "weight.update", "key": "u", "target_key": "w", "data": {"weight_kg": 83}},
+            {"op": "food.create", "key": "f", "data": {
+                "recorded_date": str(today), "items": [{"name": "soup", "calories": 120}]}},
+            {"op": "food.add_item", "key": "i", "target_key": "f", "data": {
+                "name": "bread", "calories": 90}},
+            {"op": "food.delete_item", "key": "d", "target_key": "i"},
+            {"op": "weight.delete", "key": "x", "target_key": "w"},
+        ]), db)
+        await import_service.import_records(user_id, _rows([
+            json.dumps({"type": "weight", "recorded_date": str(first - timedelta(days=1)),
+                        "weight_kg": 86}),
+            json.dumps({"type": "food", "recorded_date": str(first - timedelta(days=1)),
+                        "items": [{"name": "rice", "calories": 300}]}),
+        ]), "jsonl", db)
+
+
+async def _reads(user_id, today: date) -> None:
+    first = today - timedelta(days=WORKLOAD_DAYS)
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+        await weight_service.get_weight_history(user_id, 30, db)
+        page = await weight_service.get_weight_page(user_id, None, 10, db)
+        await weight_service.get_weight_page(user_id, page.next_cursor, 10, db)
+        await trend_service.get_weight_trend(user_id, 30, db)
+        await forecast_service.get_goal_forecast(user, db)
+        await food_service.get_daily_food_records(user_id, today - timedelta(days=1), db)
+        food_page = await food_service.get_food_records_range(user_id, first, today, None, 10, db)
+        await food_service.get_food_records_range(
+            user_id, first, today, food_page.next_cursor, 10, db
+        )
+        for period in ("week", "month"):
+            await nutrition_service.get_nutrition_stats(user, period, today, db)
+        await activity_service.get_activity_days(user_id, first, today, db)
+        await streak_service.get_streak(user_id, db)
+        await asset_service.get_current_asset(user, db)
+        for granularity in ("raw", "day", "week"):
+            await asset_service.get_asset_history(user, 30, db, granularity)
+        await dashboard_service.get_today_dashboard(user, db)
+        # Too short for the trigram search, which needs pg_trgm
+        await catalog_service.suggest(user, "ri", 10, db)
+        await asset_engine.replay_user_history(user_id, db)
+    async for _ in weight_service.stream_weight_history(user_id):
+        pass
+
+
+async def test_queries_use_indexes(db):
+    user = await make_user(db, goal_weight=70)
+    today = date.today()
+
+    async def workload() -> None:
+        await _writes(user, today)
+        await _reads(user.id, today)
+
+    problems = await _plan_problems(workload)
+    assert not problems, "\n".join(problems)
+
+
+async def test_fuzzy_suggest_uses_indexes(db, user, trgm):
+    # While the catalog index loads, every suggestion goes to the trigram search
+    problems = await _plan_problems(lambda: catalog_service.suggest(user, "ric", 10, db))
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,56 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app.services import activity_service, streak_service
+from tests.conftest import make_user
+
+TIMED_RUNS = 25
+
+
+async def _active_days(db, user, days: list[date]) -> None:
+    await activity_service.add_activity_counts(user.id, {day: (1, 0) for day in days}, db)
+    await db.commit()
+
+
+async def test_streak_counts_days_before_today(db, user):
+    today = date.today()
+    await _active_days(db, user, [today - timedelta(days=n) for n in (0, 1, 2, 3, 5, 6)])
+    assert await streak_service.get_streak(user.id, db) == 3
+    # As of an earlier day, only the days before it count
+    assert await streak_service.get_streak(user.id, db, as_of=today - timedelta(days=4)) == 2
+
+
+async def test_streak_is_zero_without_yesterday(db, user):
+    today = date.today()
+    await _active_days(db, user, [today, today - timedelta(days=2)])
+    assert await streak_service.get_streak(user.id, db) == 0
+
+
+async def test_streak_is_capped(db, user):
+    today = date.today()
+    days = streak_service.MAX_STREAK_DAYS + 30
+    await _active_days(db, user, [today - timedelta(days=n) for n in range(1, days + 1)])
+    assert await streak_service.get_streak(user.id, db) == streak_service.MAX_STREAK_DAYS
+
+
+@pytest.mark.benchmark
+async def test_streak_latency_is_flat(db):
+    """A 365-day streak costs about what a 1-day streak does: one query either way."""
+    today = date.today()
+    medians = {}
+    for length in (1, 30, streak_service.MAX_STREAK_DAYS):
+        user = await make_user(db)
+        await _active_days(db, user, [today - timedelta(days=n) for n in range(1, length + 1)])
+        assert await streak_service.get_streak(user.id, db) == length
+        timings = []
+        for _ in range(TIMED_RUNS):
+            started = time.perf_counter()
+            await streak_service.get_streak(user.id, db)
+            timings.append(time.perf_counter() - started)
+        medians[length] = statistics.median(timings)
+    print({length: f"{median * 1000:.2f} ms" for length, median in medians.items()})
+    # The day-by-day walk it replaced took two queries per day, ~700x at 365 days
+    assert medians[streak_service.MAX_STREAK_DAYS] < 3 * medians[1] + 0.002
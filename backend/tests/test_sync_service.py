@@ -0,0 +1,143 @@
+from datetime import date, timedelta
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+
+from app.models.food_record import FoodRecord
+from app.models.sync_key import SyncKey
+from app.models.user_activity_day import UserActivityDay
+from app.models.weight_record import WeightRecord
+from app.schemas.sync import SyncOp
+from app.services import activity_service, asset_engine, sync_service, trend_service
+from tests.test_asset_engine import _ledger, _replayed
+
+_OPS = TypeAdapter(list[SyncOp])
+
+
+def _ops(*ops: dict) -> list:
+    return _OPS.validate_python(ops)
+
+
+def _weight(key: str, day: date, weight_kg: float) -> dict:
+    return {"op": "weight.create", "key": key,
+            "data": {"weight_kg": weight_kg, "recorded_date": str(day)}}
+
+
+def _meal(key: str, day: date, calories: int) -> dict:
+    return {"op": "food.create", "key": key,
+            "data": {"recorded_date": str(day), "items": [{"name": "rice", "calories": calories}]}}
+
+
+async def _weights(user_id, db) -> list[tuple[date, float]]:
+    result = await db.execute(
+        select(WeightRecord.recorded_date, WeightRecord.weight_kg)
+        .where(WeightRecord.user_id == user_id)
+        .order_by(WeightRecord.recorded_date)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def test_replayed_batch_applies_nothing(db, user):
+    today = date.today()
+    ops = _ops(_weight("w1", today - timedelta(days=1), 80), _meal("f1", today, 500))
+    first = await sync_service.apply_batch(user.id, ops, db)
+    assert [(result.status, result.replayed) for result in first] == [(201, False), (201, False)]
+    ledger = await _ledger(user.id, db)
+
+    again = await sync_service.apply_batch(user.id, ops, db)
+    assert [(result.status, result.id, result.replayed) for result in again] == [
+        (201, result.id, True) for result in first
+    ]
+    assert await _weights(user.id, db) == [(today - timedelta(days=1), 80)]
+    assert await db.scalar(
+        select(func.count()).select_from(FoodRecord).where(FoodRecord.user_id == user.id)
+    ) == 1
+    assert await _ledger(user.id, db) == ledger
+
+
+async def test_ops_refer_to_rows_created_earlier_in_the_batch(db, user):
+    day = date.today() - timedelta(days=2)
+    results = await sync_service.apply_batch(user.id, _ops(
+        _weight("w", day, 82),
+        {"op": "weight.update", "key": "u", "target_key": "w", "data": {"weight_kg": 81.5}},
+        _meal("f", day, 400),
+        {"op": "food.add_item", "key": "i", "target_key": "f",
+         "data": {"name": "tea", "calories": 20}},
+    ), db)
+    assert [result.status for result in results] == [201, 200, 201, 201]
+    assert results[1].id == results[0].id
+    assert await _weights(user.id, db) == [(day, 81.5)]
+    record = await db.get(FoodRecord, results[2].id)
+    assert record.total_calories == 420
+
+    # A later batch names them by the keys too
+    results = await sync_service.apply_batch(user.id, _ops(
+        {"op": "food.delete_item", "key": "d", "target_key": "i"},
+        {"op": "weight.delete", "key": "x", "target_key": "w"},
+    ), db)
+    assert [result.status for result in results] == [204, 204]
+    assert await _weights(user.id, db) == []
+
+
+async def test_failing_op_rolls_back_only_itself(db, user, monkeypatch):
+    today = date.today()
+    failing_day = today - timedelta(days=3)
+    add_activity = activity_service.add_activity
+
+    async def fail_after_writing(user_id, day, db, **counts) -> None:
+        await add_activity(user_id, day, db, **counts)
+        if day == failing_day:
+            raise HTTPException(status_code=409, detail="conflict")
+
+    monkeypatch.setattr(activity_service, "add_activity", fail_after_writing)
+    results = await sync_service.apply_batch(user.id, _ops(
+        _weight("a", today - timedelta(days=4), 80),
+        _weight("b", failing_day, 79),
+        {"op": "weight.delete", "key": "c", "target_id": str(user.id)},
+        _weight("d", today - timedelta(days=2), 78),
+    ), db)
+    assert [(result.status, result.error) for result in results] == [
+        (201, None), (409, "conflict"), (404, "Weight record not found"), (201, None)
+    ]
+    assert await _weights(user.id, db) == [
+        (today - timedelta(days=4), 80), (today - timedelta(days=2), 78)
+    ]
+    # The failed op's record and activity row went with its savepoint
+    activity = await db.scalars(
+        select(UserActivityDay.activity_date).where(UserActivityDay.user_id == user.id)
+    )
+    assert failing_day not in set(activity)
+    stored = await db.scalars(
+        select(SyncKey.status).where(SyncKey.user_id == user.id).order_by(SyncKey.key)
+    )
+    assert list(stored) == [201, 409, 404, 201]
+
+
+async def test_ledger_and_trend_rederive_once_from_the_earliest_day(db, user, monkeypatch):
+    today = date.today()
+    calls = []
+    rederive_trend, rederive_from = trend_service.rederive_trend, asset_engine.rederive_from
+
+    async def trend_spy(user_id, from_date, db):
+        calls.append(("trend", from_date))
+        return await rederive_trend(user_id, from_date, db)
+
+    async def ledger_spy(user_id, from_date, db):
+        calls.append(("ledger", from_date))
+        return await rederive_from(user_id, from_date, db)
+
+    monkeypatch.setattr(trend_service, "rederive_trend", trend_spy)
+    monkeypatch.setattr(asset_engine, "rederive_from", ledger_spy)
+    await sync_service.apply_batch(user.id, _ops(
+        _weight("w1", today - timedelta(days=1), 80),
+        _meal("f1", today - timedelta(days=6), 500),
+        _weight("w2", today - timedelta(days=4), 81),
+        _meal("f2", today, 700),
+    ), db)
+    # The trend only moves from the earliest weigh-in, the ledger from the earliest record
+    assert calls == [("trend", today - timedelta(days=4)), ("ledger", today - timedelta(days=6))]
+
+    monkeypatch.setattr(asset_engine, "rederive_from", rederive_from)
+    live = await _ledger(user.id, db)
+    assert await _replayed(user.id, db) == live
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+
+from app.models.weight_record import WeightRecord
+from app.models.weight_trend_day import WeightTrendDay
+from app.schemas.weight import WeightRecordCreate
+from app.services import trend_service, weight_service
+from tests.conftest import count_statements
+
+DAYS = 250
+
+
+async def _trend(user_id, db) -> list[tuple]:
+    result = await db.execute(
+        select(
+            WeightTrendDay.id,
+            WeightTrendDay.trend_date,
+            WeightTrendDay.ewma_kg,
+            WeightTrendDay.mean_7d_kg,
+            WeightTrendDay.mean_30d_kg,
+        )
+        .where(WeightTrendDay.user_id == user_id)
+        .order_by(WeightTrendDay.trend_date)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def _history(db, user, monkeypatch) -> tuple[list[date], list[float]]:
+    """DAYS daily readings, re-derived from the first in several batches."""
+    monkeypatch.setattr(trend_service, "TREND_BATCH_ROWS", 40)
+    start = date.today() - timedelta(days=DAYS)
+    days = [start + timedelta(days=offset) for offset in range(DAYS)]
+    weights = [90 - offset / 20 + (offset % 3) / 10 for offset in range(DAYS)]
+    await db.execute(insert(WeightRecord), [
+        dict(user_id=user.id, weight_kg=weight, recorded_date=day)
+        for day, weight in zip(days, weights)
+    ])
+    await trend_service.rederive_trend(user.id, start, db)
+    await db.commit()
+    return days, weights
+
+
+async def test_rederive_streams_the_whole_history(db, user, monkeypatch):
+    days, weights = await _history(db, user, monkeypatch)
+    trend = await _trend(user.id, db)
+    assert [row[1] for row in trend] == days
+
+    ewma, ewma_date = None, None
+    for day, weight in zip(days, weights):
+        ewma, ewma_date = trend_service.ewma_step(ewma, ewma_date, weight, day), day
+    assert trend[-1][2:] == (
+        ewma,
+        round(sum(weights[-7:]) / 7, 4),
+        round(sum(weights[-30:]) / 30, 4),
+    )
+
+
+async def test_unchanged_days_are_not_rewritten(db, user, monkeypatch):
+    days, _ = await _history(db, user, monkeypatch)
+    trend = await _trend(user.id, db)
+    day = days[DAYS // 2]
+    # A later reading on the day replaces its value from there on
+    record = await weight_service.create_weight_record(
+        user.id, WeightRecordCreate(weight_kg=95, recorded_date=day), db
+    )
+    changed = await _trend(user.id, db)
+    assert changed[: DAYS // 2] == trend[: DAYS // 2]
+    assert all(new[2] != old[2] for new, old in zip(changed[DAYS // 2 :], trend[DAYS // 2 :]))
+
+    # The day's earlier reading going leaves every row, and the fit, as they are
+    earlier = await db.scalar(
+        select(WeightRecord.id).where(
+            WeightRecord.user_id == user.id,
+            WeightRecord.recorded_date == day,
+            WeightRecord.id != record.id,
+        )
+    )
+    with count_statements() as statements:
+        await weight_service.delete_weight_record(user.id, earlier, db)
+    assert await _trend(user.id, db) == changed
+    assert not [statement for statement in statements if "weight_forecasts" in statement]
+
+    # Its last reading going drops the day
+    with count_statements() as statements:
+        await weight_service.delete_weight_record(user.id, record.id, db)
+    assert day not in [row[1] for row in await _trend(user.id, db)]
+    assert [statement for statement in statements if "weight_forecasts" in statement]
@@ -0,0 +1,141 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.config import settings
+from app.core import cache, redis_client, user_cache
+from app.core.dependencies import get_current_user
+from app.core.security import create_access_token
+from app.schemas.user import CachedUser
+from tests.conftest import count_statements
+
+
+@pytest.fixture
+async def server(monkeypatch) -> fakeredis.FakeServer:
+    """One in-memory Redis, and a fresh LRU subscribed to its invalidations."""
+    server = fakeredis.FakeServer()
+
+    class FakeRedis(aioredis.FakeRedis):
+        @classmethod
+        def from_url(cls, url, **kwargs):
+            return cls(server=server)
+
+    monkeypatch.setattr(user_cache, "Redis", FakeRedis)
+    monkeypatch.setattr(user_cache, "READ_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(user_cache, "RECONNECT_SECONDS", 0.05)
+    monkeypatch.setattr(user_cache, "lru", user_cache.UserLRU())
+    monkeypatch.setattr(redis_client, "_client", FakeRedis(server=server))
+    monkeypatch.setattr(redis_client, "_down_until", 0.0)
+    await user_cache.lru.start()
+    await _until(lambda: user_cache.lru._subscribed)
+    yield server
+    # Let the reader go idle first: on Python 3.11 a cancel landing inside
+    # fakeredis's timed read can be swallowed
+    await asyncio.sleep(user_cache.READ_TIMEOUT_SECONDS + 0.05)
+    await user_cache.lru.close()
+
+
+async def _until(condition) -> None:
+    async with asyncio.timeout(5):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+class Loads:
+    """A load of one user counting its calls, optionally running ``during`` first."""
+
+    def __init__(self, user_id: uuid.UUID, during=None) -> None:
+        self.user_id = user_id
+        self.calls = 0
+        self.during = during
+
+    async def __call__(self) -> CachedUser:
+        self.calls += 1
+        if self.during is not None:
+            await self.during()
+        return CachedUser(
+            id=self.user_id,
+            email=f"{self.user_id.hex}@example.com",
+            username="tester",
+            region=None,
+            goal_weight=None,
+            daily_calorie_target=2000,
+            data_version=self.calls,
+            created_at=datetime.now(timezone.utc),
+        )
+
+
+async def test_least_recently_used_is_evicted(server, monkeypatch):
+    monkeypatch.setattr(settings, "USER_CACHE_SIZE", 2)
+    lru = user_cache.lru
+    first, second, third = (Loads(uuid.uuid4()) for _ in range(3))
+    await lru.get(first.user_id, first)
+    await lru.get(second.user_id, second)
+    # Using the first makes the second the oldest
+    await lru.get(first.user_id, first)
+    await lru.get(third.user_id, third)
+    assert lru.metrics()["size"] == 2
+
+    await lru.get(first.user_id, first)
+    await lru.get(second.user_id, second)
+    assert (first.calls, second.calls, third.calls) == (1, 2, 1)
+
+
+async def test_invalidation_reaches_every_worker(server):
+    load = Loads(uuid.uuid4())
+    assert (await user_cache.get_user(load.user_id, load)).data_version == 1
+    # Published by another worker's write, so only the channel tells this one
+    await cache.invalidate_user(load.user_id)
+    await _until(lambda: user_cache.lru.metrics()["invalidations"] == 1)
+    assert (await user_cache.get_user(load.user_id, load)).data_version == 2
+    assert (await user_cache.get_user(load.user_id, load)).data_version == 2
+    assert load.calls == 2
+
+
+async def test_fill_racing_an_invalidation_is_not_stored(server):
+    user_id = uuid.uuid4()
+    racing = Loads(user_id, during=lambda: user_cache.invalidate(user_id))
+    assert (await user_cache.get_user(user_id, racing)).data_version == 1
+    assert user_cache.lru.metrics()["size"] == 0
+
+    load = Loads(user_id)
+    await user_cache.get_user(user_id, load)
+    await user_cache.get_user(user_id, load)
+    assert load.calls == 1
+
+
+async def test_reconnecting_clears_the_lru(server):
+    lru = user_cache.lru
+    load = Loads(uuid.uuid4())
+    await lru.get(load.user_id, load)
+
+    server.connected = False
+    await _until(lambda: not lru._subscribed)
+    # Invalidations may be missed meanwhile, so the LRU is neither read nor filled
+    await lru.get(load.user_id, load)
+    await lru.get(load.user_id, load)
+    assert load.calls == 3
+    assert lru.metrics()["size"] == 0
+
+    server.connected = True
+    await _until(lambda: lru._subscribed)
+    await lru.get(load.user_id, load)
+    await lru.get(load.user_id, load)
+    assert load.calls == 4
+
+
+async def test_current_user_is_a_cached_copy(db, user, server):
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token(str(user.id))
+    )
+    current = await get_current_user(credentials, db)
+    assert isinstance(current, CachedUser)
+    assert (current.id, current.data_version) == (user.id, user.data_version)
+    with count_statements() as statements:
+        assert await get_current_user(credentials, db) == current
+    assert statements == []
@@ -0,0 +1,38 @@
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+
+from app.models.weight_record import WeightRecord
+from app.services import weight_service
+
+
+async def test_pages_and_stream_follow_date_then_id(db, user, monkeypatch):
+    start = date.today() - timedelta(days=3)
+    # Three readings a day, so pages of two split days and ties fall to the id
+    await db.execute(insert(WeightRecord), [
+        dict(user_id=user.id, weight_kg=80 - n / 10, recorded_date=start + timedelta(days=n // 3))
+        for n in range(9)
+    ])
+    await db.commit()
+    result = await db.execute(select(WeightRecord.recorded_date, WeightRecord.id).where(
+        WeightRecord.user_id == user.id
+    ))
+    expected = sorted(tuple(row) for row in result.all())
+
+    paged, cursor = [], None
+    while True:
+        page = await weight_service.get_weight_page(user.id, cursor, 2, db)
+        assert len(page.records) <= 2
+        paged += [(record.recorded_date, record.id) for record in page.records]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert paged == expected
+
+    monkeypatch.setattr(weight_service, "STREAM_BATCH_ROWS", 2)
+    lines = b"".join([chunk async for chunk in weight_service.stream_weight_history(user.id)])
+    streamed = [json.loads(line) for line in lines.splitlines()]
+    assert [(date.fromisoformat(r["recorded_date"]), r["id"]) for r in streamed] == [
+        (day, str(record_id)) for day, record_id in expected
+    ]
@@ -0,0 +1,195 @@
+"""
+Concurrent writes for one user are serialized by user_write_lock; writes for
+different users are not. Every task uses a session of its own, as concurrent
+requests do.
+"""
+
+import asyncio
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.locks import advisory_key, user_write_lock
+from app.database import AsyncSessionLocal, engine
+from app.models.asset_snapshot import AssetSnapshot, TriggerType
+from app.models.daily_nutrition import DailyNutrition
+from app.models.food_item import FoodItem
+from app.models.food_record import FoodRecord
+from app.schemas.food import FoodItemAdd, FoodRecordCreate
+from app.schemas.weight import WeightRecordCreate, WeightRecordUpdate
+from app.services import asset_engine, food_service, weight_service
+from tests.conftest import make_user
+
+CONCURRENT_WRITES = 20
+
+
+async def _in_session(write, *args):
+    async with AsyncSessionLocal() as db:
+        return await write(*args, db)
+
+
+def _meal(day: date, calories: int = 300) -> FoodRecordCreate:
+    return FoodRecordCreate(recorded_date=day, items=[{"name": "rice", "calories": calories}])
+
+
+async def _ledger(user_id, db) -> list[tuple]:
+    result = await db.execute(
+        select(AssetSnapshot.snapshot_date, AssetSnapshot.asset_value, AssetSnapshot.trigger_type)
+        .where(AssetSnapshot.user_id == user_id)
+        .order_by(AssetSnapshot.snapshot_date, AssetSnapshot.seq)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def _assert_ledger_matches_replay(user_id, db) -> None:
+    live = await _ledger(user_id, db)
+    # A session of its own: this one still holds the records as first written
+    async with AsyncSessionLocal() as replay:
+        await asset_engine.rederive_from(user_id, date.today() - timedelta(days=30), replay)
+        await replay.commit()
+    assert await _ledger(user_id, db) == live
+
+
+async def test_concurrent_meals_lose_no_bonus(db, user):
+    today = date.today()
+    await asyncio.gather(*[
+        _in_session(food_service.create_food_record, user, _meal(today))
+        for _ in range(CONCURRENT_WRITES)
+    ])
+
+    foods = await db.execute(
+        select(AssetSnapshot.asset_value)
+        .where(
+            AssetSnapshot.user_id == user.id,
+            AssetSnapshot.trigger_type == TriggerType.food_logged,
+        )
+        .order_by(AssetSnapshot.seq)
+    )
+    values = list(foods.scalars().all())
+    assert len(values) == CONCURRENT_WRITES
+    # Each meal compounds off the one before it
+    assert values == sorted(values) and len(set(values)) == CONCURRENT_WRITES
+    await _assert_ledger_matches_replay(user.id, db)
+
+
+async def test_concurrent_item_adds_and_deletes_keep_totals(db, user):
+    day = date.today() - timedelta(days=1)
+    record = await food_service.create_food_record(user, _meal(day, 500), db)
+
+    added = await asyncio.gather(*[
+        _in_session(
+            food_service.add_food_item,
+            user.id,
+            FoodItemAdd(food_record_id=record.id, name=f"side {n}", calories=10 + n),
+        )
+        for n in range(CONCURRENT_WRITES)
+    ])
+    await asyncio.gather(*[
+        _in_session(food_service.delete_food_item, user.id, item.id)
+        for item in added[: CONCURRENT_WRITES // 2]
+    ])
+
+    kept = sum(10 + n for n in range(CONCURRENT_WRITES // 2, CONCURRENT_WRITES))
+    total = await db.scalar(
+        select(FoodRecord.total_calories)
+        .where(FoodRecord.id == record.id)
+        .execution_options(populate_existing=True)
+    )
+    items = await db.scalar(
+        select(func.count()).where(FoodItem.food_record_id == record.id)
+    )
+    nutrition = await db.scalar(
+        select(DailyNutrition.total_calories).where(
+            DailyNutrition.user_id == user.id, DailyNutrition.nutrition_date == day
+        )
+    )
+    assert total == nutrition == 500 + kept
+    assert items == 1 + CONCURRENT_WRITES - CONCURRENT_WRITES // 2
+    await _assert_ledger_matches_replay(user.id, db)
+
+
+async def test_concurrent_weight_edits_end_consistent(db, user):
+    today = date.today()
+    records = [
+        await weight_service.create_weight_record(
+            user.id,
+            WeightRecordCreate(weight_kg=80, recorded_date=today - timedelta(days=offset)),
+            db,
+        )
+        for offset in (3, 2, 1)
+    ]
+    edits = [
+        _in_session(
+            weight_service.update_weight_record,
+            user.id,
+            records[n % 2].id,
+            WeightRecordUpdate(weight_kg=79 + n / 10) if n % 3 else WeightRecordUpdate(note=f"n{n}"),
+        )
+        for n in range(CONCURRENT_WRITES)
+    ]
+    await asyncio.gather(*edits, _in_session(weight_service.delete_weight_record, user.id, records[2].id))
+    await _assert_ledger_matches_replay(user.id, db)
+
+
+async def test_held_lock_blocks_only_its_user(db, user):
+    """A user's write waits for their lock, held here or by another worker; others go ahead."""
+    other = await make_user(db)
+    today = date.today()
+    released = asyncio.Event()
+
+    async def hold_in_worker():
+        async with AsyncSessionLocal() as session:
+            async with user_write_lock(user.id, session):
+                await released.wait()
+                await session.commit()
+
+    async def hold_in_other_worker():
+        # Another worker only shares the Postgres advisory lock
+        async with engine.begin() as conn:
+            await conn.execute(select(func.pg_advisory_xact_lock(advisory_key(user.id))))
+            await released.wait()
+
+    for hold in (hold_in_worker, hold_in_other_worker):
+        released.clear()
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.1)
+        blocked = asyncio.create_task(
+            _in_session(food_service.create_food_record, user, _meal(today))
+        )
+        await asyncio.wait_for(
+            _in_session(food_service.create_food_record, other, _meal(today)), timeout=5
+        )
+        await asyncio.sleep(0.1)
+        assert not blocked.done()
+        released.set()
+        await holder
+        await asyncio.wait_for(blocked, timeout=5)
+
+
+@pytest.mark.benchmark
+async def test_write_throughput(db):
+    """Meals per second, all for one user (queued on the lock) and one per user."""
+    today = date.today()
+    users = [await make_user(db) for _ in range(CONCURRENT_WRITES)]
+    rates = {}
+    for label, owners in (("one user", [users[0]] * CONCURRENT_WRITES), ("many users", users)):
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _in_session(food_service.create_food_record, owner, _meal(today)) for owner in owners
+        ])
+        rates[label] = CONCURRENT_WRITES / (time.perf_counter() - started)
+    print({label: f"{rate:.0f} meals/s" for label, rate in rates.items()})
+
+    ledgers = await db.execute(
+        select(AssetSnapshot.user_id, func.count())
+        .where(
+            AssetSnapshot.user_id.in_([user.id for user in users]),
+            AssetSnapshot.trigger_type == TriggerType.food_logged,
+        )
+        .group_by(AssetSnapshot.user_id)
+    )
+    counts = dict(ledgers.all())
+    assert counts.pop(users[0].id) == CONCURRENT_WRITES + 1
+    assert set(counts.values()) == {1}
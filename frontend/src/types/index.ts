@@ -71,6 +71,8 @@ export interface AssetCurrentOut {
   change_24h_pct: number;
   all_time_high: number;
   all_time_low: number;
+  all_time_high_date: string | null;
+  all_time_low_date: string | null;
 }
 
 export interface AssetHistoryPoint {